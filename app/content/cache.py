@@ -0,0 +1,239 @@
+"""
+Cache of content payloads.
+
+Content (announcements, FAQ, services, slider, footer, flat pages, site
+preset) is public and rarely edited, but requested on every page view
+of the marketing site. Serialized payloads of content views are stored
+per origin (scheme and host, media URLs are absolute), language, path
+and query parameters, under the current content version.
+
+Saving or deleting any content model bumps the version after commit and
+rebuilds payloads in background (see `content.signals`). Changes saved
+within `CONTENT_WARM_UP_DELAY` are rebuilt by one task. The
+`warm_up_content_cache` command rebuilds them on demand.
+
+Cache hits and misses are counted, see `get_content_cache_stats`.
+"""
+import json
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.test import RequestFactory
+from django.urls import (
+    get_resolver,
+    resolve,
+    reverse,
+    NoReverseMatch,
+    URLResolver,
+)
+from django.utils import translation
+from django.views import View
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+CONTENT_CACHE_TIMEOUT = 24 * 60 * 60  # seconds
+CONTENT_CACHE_KEY = "content_cache:%s"
+CONTENT_VERSION_KEY = "content_cache:version"
+CONTENT_ORIGINS_KEY = "content_cache:origins"
+CONTENT_HITS_KEY = "content_cache:hits"
+CONTENT_MISSES_KEY = "content_cache:misses"
+CONTENT_WARM_UP_KEY = "content_cache:warm_up"
+CONTENT_WARM_UP_DELAY = 30  # seconds
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:  # key does not exist
+        cache.set(key, 1, None)
+
+
+def _get_origin(request):
+    return "%s://%s" % (request.scheme, request.get_host())
+
+
+def get_content_cache_key(request, params):
+    parts = [
+        cache.get(CONTENT_VERSION_KEY, 0),
+        _get_origin(request),
+        translation.get_language(),
+        request.path,
+        params,
+    ]
+    return CONTENT_CACHE_KEY % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _remember_origin(request):
+    origins = cache.get(CONTENT_ORIGINS_KEY, [])
+    origin = _get_origin(request)
+
+    if origin not in origins:
+        cache.set(CONTENT_ORIGINS_KEY, sorted(origins + [origin]), None)
+
+
+def cache_content(params=(), skip_params=("search",)):
+    """
+    Caches serialized payload of a content view (GET handler of view
+    class or function view below `@api_view`). Only query parameters
+    listed in `params` make different payloads, requests with any of
+    `skip_params` are not cached.
+    """
+
+    def decorator(view):
+        if isinstance(view, type):
+            view.get = decorator(view.get)
+            return view
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[1] if isinstance(args[0], View) else args[0]
+
+            if any(param in request.query_params for param in skip_params):
+                return view(*args, **kwargs)
+
+            key = get_content_cache_key(
+                request, [(param, request.query_params.get(param)) for param in params]
+            )
+            data = cache.get(key)
+            is_warm_up = getattr(request, "is_content_warm_up", False)
+
+            if data is not None:
+                if not is_warm_up:
+                    _incr(CONTENT_HITS_KEY)
+                return Response(data)
+
+            if not is_warm_up:
+                _incr(CONTENT_MISSES_KEY)
+
+            response = view(*args, **kwargs)
+
+            if response.status_code == 200:
+                # Plain data, serializer lists and dicts are not cached
+                data = json.loads(json.dumps(response.data, cls=JSONEncoder))
+                cache.set(key, data, CONTENT_CACHE_TIMEOUT)
+                _remember_origin(request)
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_content_cache():
+    """
+    Invalidates all cached content payloads and rebuilds them after commit.
+    """
+
+    def invalidate():
+        from content.tasks import warm_up_content_cache_task
+
+        _incr(CONTENT_VERSION_KEY)
+
+        # Only one warm-up is pending, it rebuilds the latest version.
+        # The key expires if the task is lost
+        if cache.add(CONTENT_WARM_UP_KEY, True, CONTENT_WARM_UP_DELAY * 10):
+            warm_up_content_cache_task.apply_async(countdown=CONTENT_WARM_UP_DELAY)
+
+    db_transaction.on_commit(invalidate)
+
+
+CLIENT_URLCONF = "content.urls.client"
+
+
+def _reverse_client_url(name, **kwargs):
+    # Admin content urls have the same names, so client urls
+    # are reversed in their own urlconf and prefixed
+    for pattern in get_resolver().url_patterns:
+        if (
+            isinstance(pattern, URLResolver)
+            and getattr(pattern.urlconf_module, "__name__", None) == CLIENT_URLCONF
+        ):
+            prefix = "/%s" % pattern.pattern
+            break
+    else:
+        raise NoReverseMatch("%s is not included" % CLIENT_URLCONF)
+
+    path = reverse(name, urlconf=CLIENT_URLCONF, kwargs=kwargs)
+    return prefix + path.lstrip("/")
+
+
+def _get_warm_up_paths():
+    from content.models import Announcement, Service, FlatPage
+
+    paths = [
+        _reverse_client_url(name)
+        for name in [
+            "announcement-list",
+            "faq-category-list",
+            "faq-list",
+            "service-list",
+            "slider",
+            "footer-list",
+            "site-info",
+            "public-offer-text",
+            "terms-conditions-text",
+        ]
+    ]
+
+    for name, model in [
+        ("announcement-retrieve", Announcement),
+        ("service-retrieve", Service),
+        ("flat-page-detail", FlatPage),
+    ]:
+        slug_fields = ["slug_%s" % lang_code for lang_code, _ in settings.LANGUAGES]
+
+        for slugs in model.objects.values_list(*slug_fields):
+            for slug in set(filter(None, slugs)):
+                try:
+                    paths.append(_reverse_client_url(name, slug=slug))
+                except NoReverseMatch:  # unicode slugs are not routed
+                    pass
+
+    return paths
+
+
+def warm_up_content_cache(origins=None):
+    """
+    Builds payloads of content views without query parameters for every
+    language and origin (by default, origins content was requested from).
+    Returns number of cached payloads.
+    """
+    origins = origins or cache.get(CONTENT_ORIGINS_KEY, [])
+    paths = _get_warm_up_paths()
+    factory = RequestFactory()
+    count = 0
+
+    for origin in origins:
+        scheme, host = origin.split("://", 1)
+
+        for path in paths:
+            match = resolve(path)
+            # Warm-up requests are not throttled
+            view = match.func.cls.as_view(throttle_classes=[], **match.func.initkwargs)
+
+            for lang_code, _ in settings.LANGUAGES:
+                request = factory.get(path, HTTP_HOST=host, secure=scheme == "https")
+                request.is_content_warm_up = True
+
+                with translation.override(lang_code):
+                    response = view(request, *match.args, **match.kwargs)
+
+                count += response.status_code == 200
+
+    return count
+
+
+def get_content_cache_stats():
+    hits = cache.get(CONTENT_HITS_KEY, 0)
+    misses = cache.get(CONTENT_MISSES_KEY, 0)
+    total = hits + misses
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else None,
+    }
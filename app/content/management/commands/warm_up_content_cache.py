@@ -0,0 +1,38 @@
+from django.core.management import BaseCommand
+
+from content.cache import warm_up_content_cache, get_content_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Builds cached payloads of content views and prints cache hit ratio."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--origin",
+            action="append",
+            dest="origins",
+            help=(
+                "Origin to build payloads for, like https://core.ontime.az "
+                "(by default, origins content was requested from)."
+            ),
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Only print cache hits, misses and hit ratio.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["stats"]:
+            count = warm_up_content_cache(options["origins"])
+            self.stdout.write("Warmed up %s payloads" % count)
+
+        stats = get_content_cache_stats()
+        self.stdout.write(
+            "Hits: %s, misses: %s, hit ratio: %s"
+            % (
+                stats["hits"],
+                stats["misses"],
+                "-" if stats["hit_ratio"] is None else "%.2f" % stats["hit_ratio"],
+            )
+        )
@@ -0,0 +1,143 @@
+# Generated by Django 3.1.6 on 2026-10-19 06:47
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Search vectors of the existing rows, as computed on save at the time
+# of this migration. Frozen, later changes of content.search must not
+# change what this migration does.
+POPULATE_SEARCH_VECTORS_SQL = """
+UPDATE announcement SET
+    search_vector_az =
+        setweight(to_tsvector('simple', unaccent(COALESCE(title_az, ''))), 'A')
+        || setweight(to_tsvector('simple', unaccent(COALESCE(preview_az, ''))), 'B')
+        || setweight(to_tsvector('simple', unaccent(COALESCE(body_az, ''))), 'C'),
+    search_vector_en =
+        setweight(to_tsvector('english', unaccent(COALESCE(title_en, ''))), 'A')
+        || setweight(to_tsvector('english', unaccent(COALESCE(preview_en, ''))), 'B')
+        || setweight(to_tsvector('english', unaccent(COALESCE(body_en, ''))), 'C'),
+    search_vector_ru =
+        setweight(to_tsvector('russian', unaccent(COALESCE(title_ru, ''))), 'A')
+        || setweight(to_tsvector('russian', unaccent(COALESCE(preview_ru, ''))), 'B')
+        || setweight(to_tsvector('russian', unaccent(COALESCE(body_ru, ''))), 'C');
+
+UPDATE faq SET
+    search_vector_az =
+        setweight(to_tsvector('simple', unaccent(COALESCE(question_az, ''))), 'A')
+        || setweight(to_tsvector('simple', unaccent(COALESCE(answer_az, ''))), 'B'),
+    search_vector_en =
+        setweight(to_tsvector('english', unaccent(COALESCE(question_en, ''))), 'A')
+        || setweight(to_tsvector('english', unaccent(COALESCE(answer_en, ''))), 'B'),
+    search_vector_ru =
+        setweight(to_tsvector('russian', unaccent(COALESCE(question_ru, ''))), 'A')
+        || setweight(to_tsvector('russian', unaccent(COALESCE(answer_ru, ''))), 'B');
+
+UPDATE our_service SET
+    search_vector_az =
+        setweight(to_tsvector('simple', unaccent(COALESCE(title_az, ''))), 'A')
+        || setweight(to_tsvector('simple', unaccent(COALESCE(preview_az, ''))), 'B')
+        || setweight(to_tsvector('simple', unaccent(COALESCE(description_az, ''))), 'C'),
+    search_vector_en =
+        setweight(to_tsvector('english', unaccent(COALESCE(title_en, ''))), 'A')
+        || setweight(to_tsvector('english', unaccent(COALESCE(preview_en, ''))), 'B')
+        || setweight(to_tsvector('english', unaccent(COALESCE(description_en, ''))), 'C'),
+    search_vector_ru =
+        setweight(to_tsvector('russian', unaccent(COALESCE(title_ru, ''))), 'A')
+        || setweight(to_tsvector('russian', unaccent(COALESCE(preview_ru, ''))), 'B')
+        || setweight(to_tsvector('russian', unaccent(COALESCE(description_ru, ''))), 'C');
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0033_auto_20210216_1457'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='search_vector_az',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='search_vector_en',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='search_vector_ru',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='search_vector_az',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='search_vector_en',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='faq',
+            name='search_vector_ru',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='search_vector_az',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='search_vector_en',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='search_vector_ru',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_az'], name='announcement_search_az_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_en'], name='announcement_search_en_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_ru'], name='announcement_search_ru_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_az'], name='faq_search_az_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_en'], name='faq_search_en_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_ru'], name='faq_search_ru_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_az'], name='service_search_az_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_en'], name='service_search_en_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector_ru'], name='service_search_ru_idx'),
+        ),
+        migrations.RunSQL(
+            POPULATE_SEARCH_VECTORS_SQL, reverse_sql=migrations.RunSQL.noop
+        ),
+    ]
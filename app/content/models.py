@@ -1,13 +1,43 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone, translation
 
 from ontime.utils import smart_slugify
 from content.utils import slugify_translated_fields
+from content.search import get_search_vectors
 from ckeditor.fields import RichTextField
 from ckeditor_uploader.fields import RichTextUploadingField
 
 
+class SearchableModel(models.Model):
+    """
+    Content searchable using `content.search.search`.
+    `search_fields` are translated fields with their weights.
+    """
+
+    search_fields = []
+
+    search_vector_az = SearchVectorField(null=True, editable=False)
+    search_vector_en = SearchVectorField(null=True, editable=False)
+    search_vector_ru = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        abstract = True
+        indexes = [
+            GinIndex(fields=["search_vector_az"], name="%(class)s_search_az_idx"),
+            GinIndex(fields=["search_vector_en"], name="%(class)s_search_en_idx"),
+            GinIndex(fields=["search_vector_ru"], name="%(class)s_search_ru_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        type(self)._base_manager.filter(pk=self.pk).update(
+            **get_search_vectors(self.search_fields)
+        )
+
+
 def get_announcement_image(instance, filename):
     return "content/announcements/%s/%s/%s" % (
         smart_slugify(instance.slug),
@@ -16,9 +46,11 @@ def get_announcement_image(instance, filename):
     )
 
 
-class Announcement(models.Model):
+class Announcement(SearchableModel):
     """Model for News. Just named it more formally"""
 
+    search_fields = [("title", "A"), ("preview", "B"), ("body", "C")]
+
     slug = models.SlugField(max_length=100, unique=True, allow_unicode=True)
     title = models.CharField(max_length=100, unique=True)
     image = models.ImageField(upload_to=get_announcement_image)
@@ -28,7 +60,7 @@ class Announcement(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
-    class Meta:
+    class Meta(SearchableModel.Meta):
         db_table = "announcement"
 
     def __str__(self):
@@ -57,7 +89,9 @@ class FAQCategory(models.Model):
         return super().save(*args, **kwargs)
 
 
-class FAQ(models.Model):
+class FAQ(SearchableModel):
+    search_fields = [("question", "A"), ("answer", "B")]
+
     category = models.ForeignKey(
         "content.FAQCategory", on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -65,7 +99,7 @@ class FAQ(models.Model):
     answer = RichTextUploadingField()
     display_order = models.IntegerField(default=0)
 
-    class Meta:
+    class Meta(SearchableModel.Meta):
         db_table = "faq"
         verbose_name = "FAQ"
         verbose_name_plural = "FAQs"
@@ -78,7 +112,9 @@ def get_service_image(instance, filename):
     return "content/services/%s_%s" % (instance.title, filename)
 
 
-class Service(models.Model):
+class Service(SearchableModel):
+    search_fields = [("title", "A"), ("preview", "B"), ("description", "C")]
+
     title = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(unique=True)
     description = RichTextUploadingField()
@@ -86,7 +122,7 @@ class Service(models.Model):
 
     image = models.ImageField(upload_to=get_service_image)
 
-    class Meta:
+    class Meta(SearchableModel.Meta):
         db_table = "our_service"
 
     def __str__(self):
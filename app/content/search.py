@@ -0,0 +1,128 @@
+"""
+Full-text search of content.
+
+Searchable content keeps a search vector per language
+(`search_vector_<lang>`, GIN indexed), computed on save from translated
+fields of the language with their weights. Texts and queries are
+unaccented before parsing with text search configuration of the
+language, so "catdirilma" finds "çatdırılma".
+
+Search terms are matched by prefix, results are ranked and come with
+a highlighted snippet (`search_headline`).
+"""
+import re
+from functools import reduce
+from operator import add
+
+from django.contrib.postgres.search import (
+    SearchVector,
+    SearchQuery,
+    SearchRank,
+    SearchHeadline,
+)
+from django.db.models import F, Func, Value
+from django.db.models.functions import Coalesce
+from modeltranslation.utils import get_language
+
+# There is no Azerbaijani stemmer, its words are not stemmed
+SEARCH_CONFIGS = {
+    "az": "simple",
+    "en": "english",
+    "ru": "russian",
+}
+
+HEADLINE_OPTIONS = {
+    "start_sel": "<mark>",
+    "stop_sel": "</mark>",
+    "max_words": 30,
+    "min_words": 10,
+    "max_fragments": 2,
+}
+
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+def unaccent(expression):
+    return Func(expression, function="unaccent")
+
+
+def get_search_vectors(search_fields):
+    """
+    Returns {"search_vector_<lang>": expression} computing vectors from
+    `search_fields`, list of (translated field name, weight).
+    """
+    return {
+        "search_vector_%s"
+        % lang_code: reduce(
+            add,
+            [
+                SearchVector(
+                    unaccent(Coalesce("%s_%s" % (field, lang_code), Value(""))),
+                    weight=weight,
+                    config=config,
+                )
+                for field, weight in search_fields
+            ],
+        )
+        for lang_code, config in SEARCH_CONFIGS.items()
+    }
+
+
+def strip_tags(expression):
+    return Func(
+        expression,
+        Value("<[^>]*>"),
+        Value(" "),
+        Value("g"),
+        function="regexp_replace",
+    )
+
+
+def get_search_query(text, config, accents=False):
+    terms = _TERM_PATTERN.findall(text)
+
+    if not terms:
+        return None
+
+    # Every term is matched by prefix, so results come while typing
+    value = Value(" & ".join("%s:*" % term for term in terms))
+    return SearchQuery(
+        value if accents else unaccent(value), search_type="raw", config=config
+    )
+
+
+def search(queryset, text, headline_field):
+    """
+    Filters queryset by the text in current language and orders
+    results by rank. Annotates `search_headline`, highlighted snippet
+    of `headline_field` (translated field name, may contain HTML).
+    """
+    lang_code = get_language()
+
+    if lang_code not in SEARCH_CONFIGS:
+        lang_code = "az"
+
+    config = SEARCH_CONFIGS[lang_code]
+    query = get_search_query(text, config)
+
+    if query is None:
+        return queryset.none()
+
+    vector_field = "search_vector_%s" % lang_code
+
+    # Snippets keep accents, terms are highlighted as typed and unaccented
+    headline_query = query | get_search_query(text, config, accents=True)
+
+    return (
+        queryset.filter(**{vector_field: query})
+        .annotate(
+            search_rank=SearchRank(F(vector_field), query),
+            search_headline=SearchHeadline(
+                strip_tags(Coalesce("%s_%s" % (headline_field, lang_code), Value(""))),
+                headline_query,
+                config=config,
+                **HEADLINE_OPTIONS,
+            ),
+        )
+        .order_by("-search_rank", "-pk")
+    )
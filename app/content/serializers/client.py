@@ -14,10 +14,26 @@ from content.models import (
 )
 
 
-class AnnouncementCompactSerializer(serializers.ModelSerializer):
+class SearchHeadlineMixin(serializers.Serializer):
+    headline = serializers.SerializerMethodField()
+
+    def get_headline(self, obj):
+        # Highlighted snippet of search results
+        return getattr(obj, "search_headline", None)
+
+
+class AnnouncementCompactSerializer(SearchHeadlineMixin, serializers.ModelSerializer):
     class Meta:
         model = Announcement
-        fields = ["slug", "title", "image", "preview", "created_at", "pinned"]
+        fields = [
+            "slug",
+            "title",
+            "image",
+            "preview",
+            "created_at",
+            "pinned",
+            "headline",
+        ]
 
 
 class AnnouncementSerializer(serializers.ModelSerializer):
@@ -31,10 +47,10 @@ class AnnouncementSerializer(serializers.ModelSerializer):
         return fix_rich_text_image_url(self.context["request"], announcement.body)
 
 
-class FAQSerializer(serializers.ModelSerializer):
+class FAQSerializer(SearchHeadlineMixin, serializers.ModelSerializer):
     class Meta:
         model = FAQ
-        fields = ["id", "question", "answer"]
+        fields = ["id", "question", "answer", "headline"]
 
 
 class FAQCategorySerializer(serializers.ModelSerializer):
@@ -54,10 +70,10 @@ class ServiceSerializer(serializers.ModelSerializer):
         return fix_rich_text_image_url(self.context["request"], service.description)
 
 
-class ServiceCompactSerializer(serializers.ModelSerializer):
+class ServiceCompactSerializer(SearchHeadlineMixin, serializers.ModelSerializer):
     class Meta:
         model = Service
-        fields = ["id", "slug", "preview", "title", "image", "preview"]
+        fields = ["id", "slug", "preview", "title", "image", "preview", "headline"]
 
 
 class SliderItemSerializer(serializers.ModelSerializer):
@@ -0,0 +1,21 @@
+from django.apps import apps
+from django.db.models import signals
+
+from content.cache import invalidate_content_cache
+
+
+def content_invalidate_cache(sender, **kwargs):
+    invalidate_content_cache()
+
+
+for model in apps.get_app_config("content").get_models():
+    signals.post_save.connect(
+        content_invalidate_cache,
+        sender=model,
+        dispatch_uid="%s_invalidate_content_cache_uid" % model._meta.model_name,
+    )
+    signals.post_delete.connect(
+        content_invalidate_cache,
+        sender=model,
+        dispatch_uid="%s_invalidate_content_cache_uid" % model._meta.model_name,
+    )
@@ -0,0 +1,11 @@
+from celery import shared_task
+from django.core.cache import cache
+
+from content.cache import CONTENT_WARM_UP_KEY, warm_up_content_cache
+
+
+@shared_task
+def warm_up_content_cache_task():
+    # Changes saved from now on schedule another warm-up
+    cache.delete(CONTENT_WARM_UP_KEY)
+    return warm_up_content_cache()
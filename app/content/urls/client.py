@@ -1,5 +1,4 @@
 from django.urls import path
-from django.views.decorators.cache import cache_page
 
 from content.views import client as views
 
@@ -11,15 +10,15 @@ urlpatterns = [
     ),
     path(
         "announcements/<slug:slug>/",
-        cache_page(30 * 60)(views.AnnouncementRetrieveApiView.as_view()),
+        views.AnnouncementRetrieveApiView.as_view(),
         name="announcement-retrieve",
     ),
     path(
         "faq-categories/",
-        cache_page(5 * 60)(views.FAQCategoryListApiView.as_view()),
+        views.FAQCategoryListApiView.as_view(),
         name="faq-category-list",
     ),
-    path("faqs/", cache_page(5 * 60)(views.FAQListApiView.as_view()), name="faq-list"),
+    path("faqs/", views.FAQListApiView.as_view(), name="faq-list"),
     path("services/", views.ServiceListApiView.as_view(), name="service-list"),
     path(
         "services/<slug:slug>/",
@@ -39,7 +38,7 @@ urlpatterns = [
     ),
     path(
         "site-info/",
-        cache_page(60 * 60)(views.SitePresetApiView.as_view()),
+        views.SitePresetApiView.as_view(),
         name="site-info",
     ),
     path("public-offer-text/", views.public_offer_view, name="public-offer-text"),
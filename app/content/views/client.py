@@ -11,6 +11,8 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 
 from ontime.utils import parse_int
+from content.cache import cache_content
+from content.search import search as search_content
 from content.models import (
     Announcement,
     FAQ,
@@ -36,6 +38,7 @@ from content.serializers.client import (
 )
 
 
+@cache_content(params=["pinned", "limit", "page"])
 class AnnouncementListApiView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
@@ -46,10 +49,7 @@ class AnnouncementListApiView(generics.ListAPIView):
 
         search = self.request.query_params.get("search")
         if search:
-            announcements = announcements.filter(
-                Q(title__unaccent__trigram_similar=search)
-                | Q(title__unaccent__icontains=search),
-            )
+            announcements = search_content(announcements, search, "preview")
 
         pinned = self.request.query_params.get("pinned", None)
         if pinned in ["1", "true", "false", "0"]:
@@ -82,6 +82,7 @@ def get_slug_query(value, field="slug", prepend_lookup=""):
     return Q(**{field: value})
 
 
+@cache_content()
 class AnnouncementRetrieveApiView(generics.RetrieveAPIView):
     queryset = Announcement.objects.all()
     permission_classes = [permissions.AllowAny]
@@ -94,6 +95,7 @@ class AnnouncementRetrieveApiView(generics.RetrieveAPIView):
         )
 
 
+@cache_content(params=["category", "limit", "page"])
 class FAQListApiView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
@@ -108,10 +110,7 @@ class FAQListApiView(generics.ListAPIView):
 
         search = self.request.query_params.get("search")
         if search:
-            faqs = faqs.filter(
-                Q(question__unaccent__trigram_similar=search)
-                | Q(question__unaccent__icontains=search),
-            )
+            faqs = search_content(faqs, search, "answer")
 
         limit = parse_int(self.request.query_params.get("limit"))
         if limit and limit > -1:
@@ -120,6 +119,7 @@ class FAQListApiView(generics.ListAPIView):
         return faqs
 
 
+@cache_content()
 class FAQCategoryListApiView(generics.ListAPIView):
     pagination_class = None
     authentication_classes = []
@@ -128,6 +128,7 @@ class FAQCategoryListApiView(generics.ListAPIView):
     queryset = FAQCategory.objects.all().order_by("display_order")
 
 
+@cache_content(params=["page"])
 class ServiceListApiView(generics.ListAPIView):
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
@@ -139,14 +140,12 @@ class ServiceListApiView(generics.ListAPIView):
 
         search = self.request.query_params.get("search")
         if search:
-            services = services.filter(
-                Q(title__unaccent__trigram_similar=search)
-                | Q(title__unaccent__icontains=search),
-            )
+            services = search_content(services, search, "preview")
 
         return services
 
 
+@cache_content()
 class ServiceRetrieveApiView(generics.RetrieveAPIView):
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
@@ -156,6 +155,7 @@ class ServiceRetrieveApiView(generics.RetrieveAPIView):
         return get_object_or_404(Service, get_slug_query(self.kwargs.get("slug")))
 
 
+@cache_content(params=["limit"])
 class SliderItemListApiView(generics.ListAPIView):
     pagination_class = None
     authentication_classes = []
@@ -172,6 +172,7 @@ class SliderItemListApiView(generics.ListAPIView):
         return slider_items[:5]
 
 
+@cache_content()
 class FooterApiView(generics.ListAPIView):
     authentication_classes = []
     pagination_class = None
@@ -182,6 +183,7 @@ class FooterApiView(generics.ListAPIView):
     )
 
 
+@cache_content()
 class FlatPageRetrieveApiView(generics.RetrieveAPIView):
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
@@ -194,6 +196,7 @@ class FlatPageRetrieveApiView(generics.RetrieveAPIView):
         )
 
 
+@cache_content()
 class SitePresetApiView(generics.RetrieveAPIView):
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
@@ -208,6 +211,7 @@ class SitePresetApiView(generics.RetrieveAPIView):
 
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
+@cache_content()
 def public_offer_view(request):
     offers_text = FlatPage.objects.filter(type=FlatPage.OFFER_TYPE).first()
 
@@ -219,6 +223,7 @@ def public_offer_view(request):
 
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
+@cache_content()
 def terms_and_conditions_view(request):
     conditions_text = FlatPage.objects.filter(type=FlatPage.CONDITIONS_TYPE).first()
 
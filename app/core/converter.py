@@ -28,12 +28,15 @@ class Converter:
         convert it to int, float, or Decimal manually.
         Although usually you will not pass value as string.
         """
+        from domain.utils.identity_map import get_identity_map
+
         value = round(Decimal(value), 2)
+        identity_map = get_identity_map()
 
         try:
-            currency_from = Currency.objects.get(code=from_)
-            currency_to = Currency.objects.get(code=to)
-            base_currency = Currency.objects.filter(rate=1).first()
+            currency_from = identity_map.get(Currency, code=from_)
+            currency_to = identity_map.get(Currency, code=to)
+            base_currency = identity_map.first(Currency, rate=1)
         except Currency.DoesNotExist:
             if ignore_missing_currency:
                 return None
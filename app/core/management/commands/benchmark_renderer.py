@@ -0,0 +1,62 @@
+import json
+import timeit
+
+from django.core.management import CommandError, BaseCommand
+from djangorestframework_camel_case.render import (
+    CamelCaseJSONRenderer as LibraryCamelCaseJSONRenderer,
+)
+from djangorestframework_camel_case.util import underscoreize
+
+from ontime.renderers import CamelCaseJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares rendering time of djangorestframework_camel_case renderer "
+        "and ontime.renderers.CamelCaseJSONRenderer on recorded payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "files",
+            nargs="+",
+            help="JSON files with recorded API responses (camel case, as sent).",
+        )
+        parser.add_argument(
+            "--number",
+            type=int,
+            default=100,
+            help="Number of renders of every payload.",
+        )
+
+    def handle(self, *args, **options):
+        renderers = [
+            ("djangorestframework_camel_case", LibraryCamelCaseJSONRenderer()),
+            ("ontime.renderers", CamelCaseJSONRenderer()),
+        ]
+
+        for path in options["files"]:
+            try:
+                with open(path) as payload_file:
+                    # Renderers get snake case data from serializers
+                    data = underscoreize(json.load(payload_file))
+            except (OSError, ValueError) as exc:
+                raise CommandError("Can't read %s: %s" % (path, exc))
+
+            rendered = [renderer.render(data) for _, renderer in renderers]
+            if json.loads(rendered[0]) != json.loads(rendered[1]):
+                raise CommandError("Renderers output differs for %s" % path)
+
+            self.stdout.write("%s (%s bytes)" % (path, len(rendered[1])))
+            timings = []
+
+            for name, renderer in renderers:
+                seconds = timeit.timeit(
+                    lambda: renderer.render(data), number=options["number"]
+                )
+                timings.append(seconds)
+                self.stdout.write(
+                    "  %s: %.3f ms" % (name, seconds * 1000 / options["number"])
+                )
+
+            self.stdout.write("  speedup: %.2fx" % (timings[0] / timings[1]))
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.6 on 2026-10-19 06:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0051_configuration_smart_customs_declarations_window_in_days'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='currencyratelog',
+            index=models.Index(fields=['currency', 'created_at'], name='currency_ra_currenc_a4c940_idx'),
+        ),
+    ]
@@ -49,6 +49,7 @@ class CurrencyRateLog(models.Model):
 
     class Meta:
         db_table = "currency_rate_log"
+        indexes = [models.Index(fields=["currency", "created_at"])]
 
     def __str__(self):
         return "%s [%s]" % (self.rate, self.currency)
@@ -58,6 +59,16 @@ def get_map_image(instance, filename):
     return "countries/%s/%s" % (instance.code, filename)
 
 
+def get_local_datetime(timezone_name=None):
+    if timezone_name:
+        return datetime.now(tz=pytz.timezone(timezone_name))
+    return timezone.localtime(timezone.now())
+
+
+def get_local_time(timezone_name=None):
+    return get_local_datetime(timezone_name).strftime("%H:%M")
+
+
 def get_flag_image(instance, filename):
     return "country-flags/%s/%s" % (instance.code, filename)
 
@@ -116,13 +127,11 @@ class Country(models.Model):
 
     @property
     def local_datetime(self):
-        if self.timezone:
-            return datetime.now(tz=pytz.timezone(self.timezone))
-        return timezone.localtime(timezone.now())
+        return get_local_datetime(self.timezone)
 
     @property
     def local_time(self):
-        return self.local_datetime.strftime("%H:%M")
+        return get_local_time(self.timezone)
 
 
 class OnlineShoppingDomain(models.Model):
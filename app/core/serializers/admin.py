@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from ontime.utils import get_expanded_extra_kwargs, get_expanded_fields
+from ontime.serializers import ValuesSerializer
 from core.translation import (
     CurrencyTranslationOptions,
     CountryTranslationOptions,
@@ -116,6 +117,14 @@ class CountryCompactSerializer(serializers.ModelSerializer):
         ]
 
 
+class CountryCompactValuesSerializer(ValuesSerializer):
+    """Values version of CountryCompactSerializer."""
+
+    class Meta:
+        model = Country
+        fields = CountryCompactSerializer.Meta.fields
+
+
 class MobileOperatorReadSerializer(serializers.ModelSerializer):
     country = CountryCompactSerializer(read_only=True)
 
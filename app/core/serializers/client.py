@@ -1,7 +1,15 @@
 from rest_framework import serializers
 
+from django.db.models import Exists, OuterRef
+
+from ontime.serializers import (
+    ValuesSerializer,
+    ExpressionField,
+    ComputedField,
+)
 from domain.services import is_consolidation_enabled_for_country
-from core.models import Country, Currency, City
+from core.models import Country, Currency, City, get_local_time
+from fulfillment.models import Warehouse
 
 
 class PhoneCodeSerializer(serializers.ModelSerializer):
@@ -54,6 +62,35 @@ class CountrySerializer(serializers.ModelSerializer):
         )
 
 
+def get_consolidation_enabled_expression(ref):
+    return Exists(
+        Warehouse.objects.filter(
+            country=OuterRef(ref("pk")), is_consolidation_enabled=True
+        )
+    )
+
+
+def get_toggle_representation(enabled, disabled_message):
+    return {"enabled": enabled, "disabled_message": disabled_message}
+
+
+class CountryValuesSerializer(ValuesSerializer):
+    """Values version of CountrySerializer."""
+
+    local_time = ComputedField(get_local_time, "timezone")
+    is_consolidation_enabled = ExpressionField(get_consolidation_enabled_expression)
+    ordering = ComputedField(
+        get_toggle_representation, "is_ordering_enabled", "ordering_disabled_message"
+    )
+    packaging = ComputedField(
+        get_toggle_representation, "is_packages_enabled", "packages_disabled_message"
+    )
+
+    class Meta:
+        model = Country
+        fields = CountrySerializer.Meta.fields
+
+
 class CountryCompactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Country
@@ -66,6 +103,16 @@ class CurrencySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "code", "symbol", "rate", "is_base"]
 
 
+class CurrencyValuesSerializer(ValuesSerializer):
+    """Values version of CurrencySerializer."""
+
+    is_base = ComputedField(lambda rate: rate == 1, "rate")
+
+    class Meta:
+        model = Currency
+        fields = CurrencySerializer.Meta.fields
+
+
 class CountryCompactWithCurrencySerializer(CountryCompactSerializer):
     currency = CurrencySerializer()
 
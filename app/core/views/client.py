@@ -8,6 +8,7 @@ from rest_framework.decorators import (
 from django.utils.translation import get_language
 
 from domain.conf import Configuration
+from domain.utils.response_cache import cache_response
 from core.models import Country, Currency, MobileOperator
 from core.serializers.client import (
     PhoneCodeSerializer,
@@ -27,6 +28,7 @@ def phone_prefixes_view(request):
     )
 
 
+@cache_response(Currency)
 class CurrencyApiView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
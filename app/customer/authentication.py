@@ -0,0 +1,123 @@
+"""
+Knox token authentication with cached verification.
+
+Knox looks auth token up by its prefix, deletes expired tokens of the
+user, hashes the token with its salt and loads the user on every
+request. Clients fire many parallel requests per screen with the same
+token, so verified tokens are cached (digest, user id and expiry) in
+redis and, for a few seconds, in process. Cached requests load only the
+user with their role.
+
+Cached tokens are revoked when auth tokens are deleted (logout,
+logout-all, expiry cleanup, user deletion) by replacing their entries
+with a tombstone. Verified tokens are cached only when there is no entry,
+so a request verified just before logout does not cache revoked token
+again. Process caches of other workers keep revoked tokens for at most
+LOCAL_CACHE_TIMEOUT seconds.
+"""
+import hashlib
+import hmac
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+from knox.auth import TokenAuthentication
+from knox.models import AuthToken
+from knox.settings import CONSTANTS, knox_settings
+from rest_framework import exceptions
+
+CACHE_KEY_PREFIX = "auth_token:"
+CACHE_TIMEOUT = 5 * 60  # seconds
+LOCAL_CACHE_TIMEOUT = 5  # seconds
+LOCAL_CACHE_MAX_ENTRIES = 10000
+REVOKED = "revoked"
+
+local_cache = LocMemCache(
+    "auth_tokens",
+    {
+        "TIMEOUT": LOCAL_CACHE_TIMEOUT,
+        "OPTIONS": {"MAX_ENTRIES": LOCAL_CACHE_MAX_ENTRIES},
+    },
+)
+
+
+def get_cache_key(token_key):
+    return CACHE_KEY_PREFIX + token_key
+
+
+def revoke_cached_token(token_key):
+    key = get_cache_key(token_key)
+    local_cache.delete(key)
+    # Tombstone outlives any entry cached by requests verified meanwhile
+    cache.set(key, REVOKED, CACHE_TIMEOUT)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, token):
+        # Refreshed expiry must be saved by knox
+        if knox_settings.AUTO_REFRESH:
+            return super().authenticate_credentials(token)
+
+        try:
+            token = token.decode("utf-8")
+        except UnicodeDecodeError:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        token_key = token[: CONSTANTS.TOKEN_KEY_LENGTH]
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        key = get_cache_key(token_key)
+        entry = local_cache.get(key)
+
+        if entry is None:
+            entry = cache.get(key)
+
+            if entry is not None and entry != REVOKED:
+                local_cache.set(key, entry)
+
+        if (
+            entry is not None
+            and entry != REVOKED
+            and hmac.compare_digest(entry[0], token_hash)
+        ):
+            credentials = self.get_cached_credentials(token_key, *entry[1:])
+
+            if credentials is not None:
+                return credentials
+
+        user, auth_token = super().authenticate_credentials(token.encode())
+        entry = (token_hash, auth_token.digest, user.pk, auth_token.expiry)
+        timeout = CACHE_TIMEOUT
+
+        if auth_token.expiry is not None:
+            timeout = min(timeout, (auth_token.expiry - timezone.now()).total_seconds())
+
+        # Not cached when the token is revoked meanwhile
+        if cache.add(key, entry, timeout):
+            local_cache.set(key, entry, min(timeout, LOCAL_CACHE_TIMEOUT))
+
+        return user, auth_token
+
+    def get_cached_credentials(self, token_key, digest, user_id, expiry):
+        """
+        Returns (user, auth token) of cached token or None when it must be
+        verified by knox again.
+        """
+        if expiry is not None and expiry < timezone.now():
+            return None
+
+        try:
+            user = (
+                get_user_model()
+                .objects.select_related("role")
+                .get(pk=user_id, is_active=True)
+            )
+        except get_user_model().DoesNotExist:
+            return None
+
+        # Not saved, deleted by logout view
+        auth_token = AuthToken(
+            digest=digest, token_key=token_key, user=user, expiry=expiry
+        )
+        return user, auth_token
@@ -0,0 +1,45 @@
+# Generated by Django 3.1.6 on 2026-10-19 05:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fulfillment', '0307_queueditem_created_at'),
+        ('customer', '0048_auto_20210213_1512'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=9)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('balance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', related_query_name='snapshot', to='customer.balance')),
+            ],
+            options={
+                'db_table': 'balance_snapshot',
+            },
+        ),
+        migrations.CreateModel(
+            name='BalanceEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=9)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('balance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', related_query_name='entry', to='customer.balance')),
+                ('snapshot', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='entries', related_query_name='entry', to='customer.balancesnapshot')),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='balance_entries', related_query_name='balance_entry', to='fulfillment.transaction')),
+            ],
+            options={
+                'db_table': 'balance_entry',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='balanceentry',
+            index=models.Index(condition=models.Q(snapshot__isnull=True), fields=['balance'], name='balance_entry_pending_idx'),
+        ),
+    ]
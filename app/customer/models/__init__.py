@@ -1,5 +1,5 @@
 from customer.models.user import User, Role
-from customer.models.balance import Balance
+from customer.models.balance import Balance, BalanceSnapshot, BalanceEntry
 from customer.models.customer import Customer
 from customer.models.recipient import Recipient, FrozenRecipient
 from customer.models.common_password import CommonPassword
@@ -1,8 +1,20 @@
-from django.db import models
+from django.db import models, transaction as db_transaction
 from django.contrib.postgres.fields import JSONField
 
 
 class Balance(models.Model):
+    """
+    User's balance in some currency.
+
+    Balance changes are appended to the ledger as `BalanceEntry` rows.
+    `amount` column holds materialized amount of rolled up entries only,
+    entries that are not rolled up yet are added to it when balance
+    is loaded through balance resolver or refreshed from db.
+
+    Rows loaded directly (querysets, admin, `AdminBalanceUpdateForm`
+    choices) show materialized amount, which is stale until the roll-up.
+    """
+
     user = models.ForeignKey(
         "customer.User",
         on_delete=models.CASCADE,
@@ -27,3 +39,115 @@ class Balance(models.Model):
             self.currency.code,
             self.user.full_phone_number,
         )
+
+    def get_pending_amount(self):
+        return (
+            self.entries.filter(snapshot__isnull=True).aggregate(
+                total=models.Sum("amount")
+            )["total"]
+            or 0
+        )
+
+    def apply_pending_amount(self, pending_amount=None):
+        if pending_amount is None:
+            pending_amount = self.get_pending_amount()
+
+        self._pending_amount = getattr(self, "_pending_amount", 0) + pending_amount
+        self.amount += pending_amount
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+
+        if fields is None or "amount" in fields:
+            self._pending_amount = 0
+            self.apply_pending_amount()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+
+        if update_fields is not None and "amount" not in update_fields:
+            return super().save(*args, **kwargs)
+
+        with db_transaction.atomic(using=kwargs.get("using")):
+            if not self._state.adding and hasattr(self, "_pending_amount"):
+                # Lock the row against the roll-up and subtract entries
+                # pending now, those pending when the balance was loaded
+                # may be rolled up already
+                list(
+                    type(self)
+                    ._default_manager.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("pk")
+                )
+                self._pending_amount = self.get_pending_amount()
+
+            # Never write pending entries into materialized amount,
+            # they will be added by the roll-up
+            pending_amount = getattr(self, "_pending_amount", 0)
+            self.amount -= pending_amount
+            try:
+                super().save(*args, **kwargs)
+            finally:
+                self.amount += pending_amount
+
+
+class BalanceSnapshot(models.Model):
+    """Materialized amount of the balance after a roll-up."""
+
+    balance = models.ForeignKey(
+        "customer.Balance",
+        on_delete=models.CASCADE,
+        related_name="snapshots",
+        related_query_name="snapshot",
+    )
+    amount = models.DecimalField(max_digits=9, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = "balance_snapshot"
+
+    def __str__(self):
+        return "%s at %s [balance=%s]" % (self.amount, self.created_at, self.balance_id)
+
+
+class BalanceEntry(models.Model):
+    """Append-only ledger entry. Amount is negative for withdrawals."""
+
+    balance = models.ForeignKey(
+        "customer.Balance",
+        on_delete=models.CASCADE,
+        related_name="entries",
+        related_query_name="entry",
+    )
+    amount = models.DecimalField(max_digits=9, decimal_places=2)
+    transaction = models.ForeignKey(
+        "fulfillment.Transaction",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="balance_entries",
+        related_query_name="balance_entry",
+    )
+    # Snapshot this entry was rolled up into
+    snapshot = models.ForeignKey(
+        "customer.BalanceSnapshot",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="entries",
+        related_query_name="entry",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = "balance_entry"
+        indexes = [
+            models.Index(
+                fields=["balance"],
+                name="balance_entry_pending_idx",
+                condition=models.Q(snapshot__isnull=True),
+            )
+        ]
+
+    def __str__(self):
+        return "%s [balance=%s]" % (self.amount, self.balance_id)
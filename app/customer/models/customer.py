@@ -1,12 +1,11 @@
 from decimal import Decimal
 
 from django.db import transaction as db_transaction
-from django.db.models import F, Sum
+from django.db.models import Sum
 from django.conf import settings
 
 from domain.exceptions.customer import InsufficientBalanceError
 from domain.exceptions.logic import InvalidActionError, DifferentPackageSourceError
-from core.models import Currency
 from core.converter import Converter
 from core.serializers.client import CurrencySerializer
 from customer.models.user import User
@@ -19,19 +18,21 @@ class Customer(User):
 
     @property
     def active_balance(self):
-        currency = Currency.objects.filter(country__is_base=True).first()
-        if currency:
-            return self.get_balance(currency)
-        return None
+        from domain.utils.balance import get_balance_resolver
+
+        return get_balance_resolver().get_active_balance(self, country__is_base=True)
 
     def get_balance(self, currency):
         """Will create balance if necessary."""
-        balance, created = self.balances.get_or_create(currency=currency)
-        return balance
+        from domain.utils.balance import get_balance_resolver
+
+        return get_balance_resolver().get_balance(self, currency)
 
     @db_transaction.atomic
     def increase_balance(self, amount, currency, type):
         """Adds amount to balance and creates transaction."""
+        from domain.utils.balance import get_balance_resolver
+
         if amount < 0:
             raise ValueError("Amount can't be less than 0 when adding balance")
 
@@ -40,7 +41,7 @@ class Customer(User):
             amount, currency.code, balance.currency.code
         )
 
-        self.transactions.create(
+        transaction = self.transactions.create(
             currency=balance.currency,
             amount=converted_amount,
             purpose=Transaction.BALANCE_INCREASE,
@@ -53,14 +54,15 @@ class Customer(User):
         )
 
         balance = self.get_balance(currency)
-        balance.amount = F("amount") + amount
-        balance.save(update_fields=["amount"])
+        get_balance_resolver().change_amount(balance, amount, transaction)
 
         return balance
 
     @db_transaction.atomic
     def decrease_balance(self, amount, currency):
         """Decreases balance and creates transaction."""
+        from domain.utils.balance import get_balance_resolver
+
         if amount < 0:
             raise ValueError("Amount can't be less than 0 when decreasing balance")
 
@@ -69,7 +71,7 @@ class Customer(User):
             amount, currency.code, balance.currency.code
         )
 
-        self.transactions.create(
+        transaction = self.transactions.create(
             currency=balance.currency,
             amount=converted_amount,
             purpose=Transaction.BALANCE_DECREASE,
@@ -82,8 +84,7 @@ class Customer(User):
         )
 
         balance = self.get_balance(currency)
-        balance.amount = F("amount") - amount
-        balance.save(update_fields=["amount"])
+        get_balance_resolver().change_amount(balance, -amount, transaction)
 
         return balance
 
@@ -75,6 +75,8 @@ class Role(models.Model):
 
 class UserManager(BaseUserManager):
     def create_user(self, full_phone_number, email=None, password=None, commit=True):
+        from domain.utils.identity_map import get_identity_map
+
         if not full_phone_number:
             raise ValueError(_("Phone number cannot be blank"))
 
@@ -84,7 +86,7 @@ class UserManager(BaseUserManager):
         )
         user.set_password(password)
 
-        user.role = Role.objects.get(type=Role.USER)
+        user.role = get_identity_map().get(Role, type=Role.USER)
 
         if commit:
             user.save(using=self._db)
@@ -106,9 +108,11 @@ class UserManager(BaseUserManager):
     def create_superuser(
         self, full_phone_number, email=None, password=None, commit=True
     ):
+        from domain.utils.identity_map import get_identity_map
+
         user = self.create_staff_user(full_phone_number, email, password, commit=False)
         user.is_superuser = True
-        user.role = Role.objects.get(type=Role.ADMIN)
+        user.role = get_identity_map().get(Role, type=Role.ADMIN)
 
         if commit:
             user.save(using=self._db)
@@ -225,14 +229,11 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     @property
     def active_balance(self):
-        from core.models import Currency
+        from domain.utils.balance import get_balance_resolver
 
-        currency = Currency.objects.filter(
-            code=settings.USER_BALANCE_CURRENCY_CODE
-        ).first()
-        if currency:
-            return self.get_balance(currency)
-        return None
+        return get_balance_resolver().get_active_balance(
+            self, code=settings.USER_BALANCE_CURRENCY_CODE
+        )
 
     @property
     def identifier(self):
@@ -248,8 +249,9 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def get_balance(self, currency):
         """Will create balance if necessary."""
-        balance, created = self.balances.get_or_create(currency=currency)
-        return balance
+        from domain.utils.balance import get_balance_resolver
+
+        return get_balance_resolver().get_balance(self, currency)
 
     def save(self, *args, **kwargs):
         if not self.client_code:
@@ -453,13 +455,17 @@ class User(AbstractBaseUser, PermissionsMixin):
         """
         Generates client code based on phone number
         """
+        from domain.utils.identity_map import get_identity_map
+
         phone_number = self.full_phone_number
 
         # Try to remove country code
         code = phone_number
         stripped_phone_code = False
 
-        for country_phone_code in Country.objects.values_list("phone_code", flat=True):
+        for country in get_identity_map().all(Country):
+            country_phone_code = country.phone_code
+
             if phone_number.startswith(country_phone_code):
                 stripped_phone_code = True
                 code = prefix + phone_number.replace(country_phone_code, "")
@@ -1,6 +1,9 @@
+from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from django_rest_resetpassword.signals import reset_password_token_created
+from knox.models import AuthToken
 
+from customer.authentication import revoke_cached_token
 from customer.tasks import send_reset_password_email
 
 
@@ -13,3 +16,8 @@ def password_reset_token_created(
     send_reset_password_email.delay(
         reset_password_token.user.id, reset_password_token.key
     )
+
+
+@receiver(post_delete, sender=AuthToken)
+def auth_token_deleted(sender, instance, *args, **kwargs):
+    revoke_cached_token(instance.token_key)
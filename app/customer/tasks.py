@@ -61,3 +61,10 @@ def fetch_user_data_from_government_resource(recipient_id):
     from domain.services import fetch_citizen_data
 
     fetch_citizen_data(recipient_id, save_to_user=True)
+
+
+@shared_task
+def roll_up_balances_task(balance_ids=None):
+    from domain.services import roll_up_balances
+
+    return roll_up_balances(balance_ids)
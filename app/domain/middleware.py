@@ -1,7 +1,11 @@
 import pytz
+from django.conf import settings
 from django.utils import timezone as django_timezone
 from django.utils import translation
 
+from domain.utils.balance import balance_resolver_scope
+from domain.utils.identity_map import identity_map_scope
+
 
 def country_timezone_middleware(get_response):
     def middleware(request):
@@ -27,6 +31,29 @@ def country_timezone_middleware(get_response):
     return middleware
 
 
+def balance_resolver_middleware(get_response):
+    def middleware(request):
+        # Cache balances of users until response is returned
+        with balance_resolver_scope():
+            return get_response(request)
+
+    return middleware
+
+
+def identity_map_middleware(get_response):
+    def middleware(request):
+        # Keep loaded reference rows until response is returned
+        with identity_map_scope() as identity_map:
+            response = get_response(request)
+
+        if settings.DEBUG and identity_map.stats:
+            response["X-Identity-Map"] = identity_map.get_stats_display()
+
+        return response
+
+    return middleware
+
+
 class AdminLocaleMiddleware:
     """
     Forces Django admin app to be displayed only in `_lang`.
@@ -1,5 +1,6 @@
 from typing import List, Union, TYPE_CHECKING, Optional, Iterable
 import datetime
+import heapq
 from collections import namedtuple
 from decimal import Decimal, InvalidOperation
 from itertools import groupby
@@ -12,7 +13,18 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.admin.models import LogEntry, CHANGE, DELETION, ContentType
 from django.db import transaction as db_transaction
-from django.db.models import F, Count, Q, Exists, Subquery, OuterRef, Prefetch, Sum
+from django.db.models import (
+    F,
+    Count,
+    Q,
+    Exists,
+    Subquery,
+    OuterRef,
+    Prefetch,
+    Sum,
+    QuerySet,
+    prefetch_related_objects,
+)
 from django.utils import timezone, translation
 from django.utils.translation import ugettext_lazy as _
 
@@ -42,6 +54,15 @@ from domain.utils import (
     NotificationEvent,
 )
 from domain.utils.cashback import Cashback
+from domain.utils.balance import get_balance_resolver, balance_resolver_scope
+from domain.utils.identity_map import get_identity_map
+from domain.utils.invoice_cache import (
+    get_cached_invoice,
+    invalidate_invoice,
+    invalidate_related_object_invoices,
+)
+from domain.utils.monthly_spendings import get_monthly_spendings_amounts
+from domain.utils.prefetch import prefetch_generic_related_objects
 from domain.exceptions.payment import PaymentError
 from domain.exceptions.customer import CantTopUpBalanceError
 from cybersource.secure_acceptance import SecureAcceptanceClient
@@ -86,6 +107,7 @@ from fulfillment.models import (
     PromoCode,
     PromoCodeBenefit,
 )
+from fulfillment.models.abc import DiscountableModelMixin
 
 User = get_user_model()
 
@@ -179,7 +201,7 @@ def complete_warehouseman_creation(*, user, role, staff_data):
 
     if warehouse_id:
         try:
-            warehouse = Warehouse.objects.get(id=warehouse_id)
+            warehouse = get_identity_map().get(Warehouse, id=warehouse_id)
         except Warehouse.DoesNotExist:
             pass
 
@@ -199,7 +221,7 @@ def complete_cashier_creation(*, user, role, staff_data):
 
     if warehouse_id:
         try:
-            warehouse = Warehouse.objects.get(id=warehouse_id)
+            warehouse = get_identity_map().get(Warehouse, id=warehouse_id)
         except Warehouse.DoesNotExist:
             pass
 
@@ -219,7 +241,7 @@ def complete_customer_service_creation(*, user, role, staff_data):
 
     if warehouse_id:
         try:
-            warehouse = Warehouse.objects.get(id=warehouse_id)
+            warehouse = get_identity_map().get(Warehouse, id=warehouse_id)
         except Warehouse.DoesNotExist:
             pass
 
@@ -335,14 +357,37 @@ def copy_transaction(transaction: Transaction, delete_old=True):
     This is needed for payment services, they will not accept
     the cancelled transaction again + we take a log of cancelled transactions that way.
     """
-    transaction_copy = Transaction.objects.create(
+    transaction_copy = build_transaction_copy(transaction)
+    transaction_copy.save()
+
+    for child in transaction.children.all():
+        child.parent = transaction_copy
+        child.save(update_fields=["parent"])
+
+    transaction.cashbacks.all().update(cashback_to=transaction_copy)
+
+    if delete_old:
+        transaction.is_deleted = True
+        transaction.extra["deletion_detail"] = "Copied to a newer transaction"
+        transaction.save(update_fields=["is_deleted", "extra"])
+
+    return transaction_copy
+
+
+def build_transaction_copy(transaction: Transaction, **overrides):
+    """
+    Returns unsaved copy of the transaction.
+    Fields can be overriden using their attribute names (e.g. `parent_id`).
+    """
+    fields = dict(
         user_id=transaction.user_id,
         currency_id=transaction.currency_id,
         parent_id=transaction.parent_id,
         amount=transaction.amount,
         purpose=transaction.purpose,
         type=transaction.type,
-        related_object=transaction.related_object,
+        object_type_id=transaction.object_type_id,
+        object_id=transaction.object_id,
         related_object_identifier=transaction.related_object_identifier,
         completed=transaction.completed,
         completed_at=transaction.completed_at,
@@ -355,23 +400,13 @@ def copy_transaction(transaction: Transaction, delete_old=True):
         original_currency_id=transaction.original_currency_id,
         is_partial=transaction.is_partial,
         from_balance_amount=transaction.from_balance_amount,
-        from_balance_currency=transaction.from_balance_currency,
+        from_balance_currency_id=transaction.from_balance_currency_id,
         extra=transaction.extra,
         cashback_to_id=transaction.cashback_to_id,
     )
+    fields.update(overrides)
 
-    for child in transaction.children.all():
-        child.parent = transaction_copy
-        child.save(update_fields=["parent"])
-
-    transaction.cashbacks.all().update(cashback_to=transaction_copy)
-
-    if delete_old:
-        transaction.is_deleted = True
-        transaction.extra["deletion_detail"] = "Copied to a newer transaction"
-        transaction.save(update_fields=["is_deleted", "extra"])
-
-    return transaction_copy
+    return Transaction(**fields)
 
 
 def make_payment_partial(transaction: Transaction, payment_service: str):
@@ -636,6 +671,7 @@ def handle_promo_data(transaction: Transaction):
             pass  # ignore
 
 
+@balance_resolver_scope()
 @db_transaction.atomic
 def complete_payments(
     transactions: List[Transaction],
@@ -719,8 +755,7 @@ def complete_payments(
                 missing_amount=transaction_amount - balance.amount,
             )
 
-        balance.amount = F("amount") - transaction_amount
-        balance.save(update_fields=["amount"])
+        get_balance_resolver().change_amount(balance, -transaction_amount, transaction)
 
     elif transaction.type == Transaction.CARD:
         if not transaction.check_payment_service_confirmation():
@@ -733,12 +768,15 @@ def complete_payments(
             from_balance_currency = transaction.from_balance_currency
             balance = transaction.user.as_customer.active_balance
 
-            balance.amount = F("amount") - Converter.convert(
-                from_balance_amount,
-                from_balance_currency.code,
-                balance.currency.code,
+            get_balance_resolver().change_amount(
+                balance,
+                -Converter.convert(
+                    from_balance_amount,
+                    from_balance_currency.code,
+                    balance.currency.code,
+                ),
+                transaction,
             )
-            balance.save(update_fields=["amount"])
 
     elif transaction.type in [Transaction.CASH, Transaction.TERMINAL]:
         affect_balance_by(transaction, notify=True)
@@ -770,10 +808,13 @@ def affect_balance_by(transaction: Transaction, notify: bool = False):
         return False
 
     if transaction.purpose == Transaction.BALANCE_INCREASE:
-        balance.amount = F("amount") + Converter.convert(
-            Decimal(amount), transaction.currency.code, balance.currency.code
+        get_balance_resolver().change_amount(
+            balance,
+            Converter.convert(
+                Decimal(amount), transaction.currency.code, balance.currency.code
+            ),
+            transaction,
         )
-        balance.save(update_fields=["amount"])
 
         if notify:
             create_notification(
@@ -784,45 +825,170 @@ def affect_balance_by(transaction: Transaction, notify: bool = False):
             )
 
     elif transaction.purpose == Transaction.BALANCE_DECREASE:
-        balance.amount = F("amount") - Converter.convert(
-            Decimal(amount),
-            transaction.currency.code,
-            balance.currency.code,
+        get_balance_resolver().change_amount(
+            balance,
+            -Converter.convert(
+                Decimal(amount),
+                transaction.currency.code,
+                balance.currency.code,
+            ),
+            transaction,
         )
-        balance.save(update_fields=["amount"])
 
     return True
 
 
+@db_transaction.atomic
+def roll_up_balances(balance_ids=None):
+    """
+    Materializes ledger entries that are not rolled up yet into balance
+    amounts and records a snapshot for every affected balance.
+    Returns number of rolled up entries.
+    """
+    from customer.models import Balance, BalanceEntry, BalanceSnapshot
+
+    pending_entries = BalanceEntry.objects.filter(snapshot__isnull=True)
+
+    if balance_ids is not None:
+        pending_entries = pending_entries.filter(balance_id__in=balance_ids)
+
+    balances = list(
+        Balance.objects.select_for_update()
+        .filter(id__in=pending_entries.values("balance_id"))
+        .order_by("id")
+    )
+
+    if not balances:
+        return 0
+
+    # Read entries after balances are locked, so concurrent roll-ups
+    # don't materialize same entries twice
+    entries = {}
+    for entry_id, balance_id, amount in pending_entries.filter(
+        balance_id__in=[balance.id for balance in balances]
+    ).values_list("id", "balance_id", "amount"):
+        entries.setdefault(balance_id, []).append((entry_id, amount))
+
+    balances = [balance for balance in balances if balance.id in entries]
+    for balance in balances:
+        balance.amount += sum(amount for _, amount in entries[balance.id])
+
+    Balance.objects.bulk_update(balances, ["amount"])
+    snapshots = BalanceSnapshot.objects.bulk_create(
+        [
+            BalanceSnapshot(balance_id=balance.id, amount=balance.amount)
+            for balance in balances
+        ]
+    )
+
+    for snapshot in snapshots:
+        BalanceEntry.objects.filter(
+            id__in=[entry_id for entry_id, _ in entries[snapshot.balance_id]]
+        ).update(snapshot=snapshot)
+
+    return sum(len(balance_entries) for balance_entries in entries.values())
+
+
+def get_balance_amount_at(balance, at):
+    """
+    Returns balance amount at the given time using closest snapshot
+    and ledger entries made after it.
+    """
+    snapshot = balance.snapshots.filter(created_at__lte=at).order_by("-id").first()
+
+    if snapshot:
+        tail_amount = balance.entries.filter(
+            Q(snapshot__isnull=True) | Q(snapshot_id__gt=snapshot.id),
+            created_at__lte=at,
+        ).aggregate(total=Sum("amount"))["total"]
+        return snapshot.amount + (tail_amount or 0)
+
+    # No snapshot made before that time, go back from the current amount
+    balance.refresh_from_db(fields=["amount"])
+    later_amount = balance.entries.filter(created_at__gt=at).aggregate(
+        total=Sum("amount")
+    )["total"]
+    return balance.amount - (later_amount or 0)
+
+
+def get_transaction_descendants(transactions: List[Transaction]) -> List[Transaction]:
+    """
+    Loads children of the transactions, their children and so on
+    using one recursive query. Transactions are returned depth-first,
+    siblings are ordered by id.
+    """
+    transaction_ids = [transaction.id for transaction in transactions]
+
+    if not transaction_ids:
+        return []
+
+    table = Transaction._meta.db_table
+    return list(
+        Transaction.objects.raw(
+            f"""
+            WITH RECURSIVE tree (id, path) AS (
+                SELECT id, ARRAY[parent_id, id] FROM {table}
+                WHERE parent_id = ANY(%s) AND deleted_at IS NULL
+                UNION ALL
+                SELECT child.id, tree.path || child.id FROM {table} child
+                JOIN tree ON child.parent_id = tree.id
+                WHERE child.deleted_at IS NULL AND NOT child.id = ANY(tree.path)
+            )
+            SELECT {table}.* FROM {table}
+            JOIN tree ON {table}.id = tree.id
+            ORDER BY tree.path
+            """,
+            [transaction_ids],
+        )
+    )
+
+
+def prefetch_transaction_related_objects(transactions: List[Transaction]):
+    """
+    Fetches related objects of the transactions and discounts
+    of that objects using one query per content type.
+    """
+    prefetch_related_objects(transactions, "related_object", "currency")
+
+    objects_by_model = {}
+    for transaction in transactions:
+        related_object = transaction.related_object
+        if related_object is not None and hasattr(related_object, "discounts"):
+            objects_by_model.setdefault(type(related_object), []).append(related_object)
+
+    for related_objects in objects_by_model.values():
+        prefetch_related_objects(related_objects, "discounts")
+
+
 def _make_completed(transaction, custom_callback=None, custom_callback_params=None):
     custom_callback_params = custom_callback_params or dict()
-    related_objects = []
-    children = []
 
     now = timezone.now()
     transaction.completed = True
     transaction.completed_at = now
     transaction.save(update_fields=["completed", "completed_at"])
 
-    if transaction.children.exists():
-        transaction.children.update(completed=True, completed_at=now)
+    children = get_transaction_descendants([transaction])
 
-        for transaction in transaction.children.all():
-            # TODO: Make some recursivness here.
-            # But for now we will not go deeper than 2 nested levels of transactions.
-            children.append(transaction)
-            related_objects.append(transaction.related_object)
+    if children:
+        Transaction.objects.filter(id__in=[child.id for child in children]).update(
+            completed=True, completed_at=now
+        )
+        prefetch_transaction_related_objects(children)
 
-            # FIXME: DRY needed...
-            if transaction.children.exists():
-                transaction.children.update(completed=True, completed_at=now)
+        for child in children:
+            child.completed = True
+            child.completed_at = now
 
-                for nested_transaction in transaction.children.all():
-                    children.append(nested_transaction)
-                    related_objects.append(nested_transaction.related_object)
+        related_objects = [child.related_object for child in children]
 
+        # Callbacks of merged transaction have always been called
+        # with its last direct child
+        transaction = [
+            child for child in children if child.parent_id == transaction.id
+        ][-1]
     else:
-        related_objects.append(transaction.related_object)
+        related_objects = [transaction.related_object]
 
     payment_callback(related_objects, transaction, children)
     if custom_callback and callable(custom_callback):
@@ -835,30 +1001,95 @@ def remove_from_parent(transaction: Transaction, parent=None):
     parent = transaction.parent or parent
 
     if parent:
+        remove_from_parents([transaction], parents=[parent])
+
+    return parent
+
+
+def remove_from_parents(transactions: List[Transaction], parents=None):
+    """
+    Detaches transactions from their parents. Parents that are left with only
+    one child are deleted, amounts of other parents are recalculated.
+    Returns list of parents.
+    """
+    if parents is None:
+        # Use already loaded parents, so they are updated in place
+        parents = {
+            t.parent_id: t.parent
+            for t in transactions
+            if t.parent_id and Transaction.parent.is_cached(t)
+        }
+        missing_parent_ids = {
+            t.parent_id for t in transactions if t.parent_id not in parents
+        } - {None}
+        parents.update(Transaction.objects.in_bulk(missing_parent_ids))
+        parents = list(parents.values())
+
+    if not parents:
+        return []
+
+    parent_ids = [parent.id for parent in parents]
+
+    detached_transactions = [t for t in transactions if t.parent_id]
+    Transaction.objects.filter(id__in=[t.id for t in detached_transactions]).update(
+        parent=None
+    )
+    for transaction in transactions:
         transaction.parent = None
-        transaction.save(update_fields=["parent"])
-        if parent.children.count() == 1:
+
+    remaining_children = list(Transaction.objects.filter(parent_id__in=parent_ids))
+    prefetch_related_objects(parents, "currency")
+    prefetch_transaction_related_objects(remaining_children)
+
+    children_by_parent = {}
+    for child in remaining_children:
+        children_by_parent.setdefault(child.parent_id, []).append(child)
+
+    deleted_parents = []
+    updated_parents = []
+
+    for parent in parents:
+        children = children_by_parent.get(parent.id, [])
+
+        if len(children) <= 1:
             parent.is_deleted = True
             parent.extra["deletion_detail"] = "Because only one child left"
-            parent.save(update_fields=["is_deleted", "extra"])
-            parent.children.update(parent=None)
-            parent.delete()  # make soft delete
+            deleted_parents.append(parent)
         else:
-            parent_amount = Decimal("0.00")
-            for child in parent.children.all():
-                parent_amount += Converter.convert(
-                    child.discounted_amount,
-                    child.discounted_amount_currency.code,
-                    parent.currency.code,
-                )
-                parent.amount = parent_amount
-                parent.save(update_fields=["amount"])
-                parent.refresh_from_db(fields=["amount"])
-
-            parent.save(update_fields=["amount"])
-            parent.refresh_from_db(fields=["amount"])
+            parent.amount = sum(
+                (
+                    Converter.convert(
+                        child.discounted_amount,
+                        child.discounted_amount_currency.code,
+                        parent.currency.code,
+                    )
+                    for child in children
+                ),
+                Decimal("0.00"),
+            )
+            updated_parents.append(parent)
+
+    # Bulk updates don't send signals
+    invalidate_related_object_invoices(detached_transactions + updated_parents)
+
+    if updated_parents:
+        Transaction.objects.bulk_update(updated_parents, ["amount"])
+        for parent in updated_parents:
+            if parent.is_amount_changed:
+                parent.update_related_cashbacks()
+
+    if deleted_parents:
+        Transaction.objects.bulk_update(deleted_parents, ["is_deleted", "extra"])
+        Transaction.objects.filter(parent__in=deleted_parents).update(parent=None)
+        invalidate_related_object_invoices(
+            child
+            for parent in deleted_parents
+            for child in children_by_parent.get(parent.id, [])
+        )
+        for parent in deleted_parents:
+            parent.delete()  # make soft delete
 
-    return parent
+    return parents
 
 
 def merge_transactions(user_id, transaction_type, currency_id, transactions):
@@ -882,33 +1113,37 @@ def merge_transactions(user_id, transaction_type, currency_id, transactions):
         completed=False,
     )
 
-    for transaction in transactions:
-        remove_from_parent(transaction)
+    remove_from_parents(transactions)
 
+    for transaction in transactions:
         transaction.type = transaction_type
         transaction.parent = parent
-        transaction.save(update_fields=["parent", "type"])
-
-        for cashback_transaction in transaction.cashbacks.all():
-            copy_of_cashback = copy_transaction(cashback_transaction, delete_old=False)
-            copy_of_cashback.cashback_to = parent
-            copy_of_cashback.save()
-
-        # check if this transaction has child transactions
-        # collect that cashbacks too
-        # TODO: Not respecting DRY, fix that, may be some recursivness would help
-        cashbacks_exist = Transaction.objects.filter(
-            cashback_to=OuterRef("id"), completed=False, is_deleted=False
-        ).values("id")
-        for child_transaction in transaction.children.annotate(
-            cashbacks_exist=Exists(cashbacks_exist)
-        ).filter(completed=False, is_deleted=False, cashbacks_exist=True):
-            for child_cashback in child_transaction.cashbacks.all():
-                copy_of_child_cashback = copy_transaction(
-                    child_cashback, delete_old=False
-                )
-                copy_of_cashback.cashback_to = parent
-                copy_of_child_cashback.save()
+
+    Transaction.objects.bulk_update(transactions, ["parent", "type"])
+    invalidate_related_object_invoices(transactions)
+
+    # Copy cashbacks of merged transactions and cashbacks
+    # of their children that still have something to apply
+    pending_cashbacks = Transaction.objects.filter(
+        cashback_to=OuterRef("id"), completed=False, is_deleted=False
+    )
+    children_with_cashbacks = Transaction.objects.filter(
+        Exists(pending_cashbacks),
+        parent__in=transactions,
+        completed=False,
+        is_deleted=False,
+    )
+    cashbacks = Transaction.objects.filter(
+        Q(cashback_to__in=transactions) | Q(cashback_to__in=children_with_cashbacks)
+    ).order_by("id")
+
+    cashback_copies = Transaction.objects.bulk_create(
+        [
+            build_transaction_copy(cashback, cashback_to_id=parent.id)
+            for cashback in cashbacks
+        ]
+    )
+    invalidate_related_object_invoices(cashback_copies)
 
     return parent
 
@@ -1007,10 +1242,13 @@ def payment_callback(
     # Apply cashbacks
     cashback_amount = transaction.get_cashback_amount(complete_cashbacks=True)
     balance = transaction.user.active_balance
-    balance.amount = F("amount") + Converter.convert(
-        cashback_amount, transaction.currency.code, balance.currency.code
+    get_balance_resolver().change_amount(
+        balance,
+        Converter.convert(
+            cashback_amount, transaction.currency.code, balance.currency.code
+        ),
+        transaction,
     )
-    balance.save(update_fields=["amount"])
     if transaction.cashbacks.filter(extra__invite_friend_cashback=True).exists():
         create_notification(
             transaction,
@@ -1175,6 +1413,234 @@ def _promote_ticket_status(ticket: Ticket, to_status, **kwargs):
     return None
 
 
+STATUS_TYPES = {
+    Order: Status.ORDER_TYPE,
+    Package: Status.PACKAGE_TYPE,
+    Shipment: Status.SHIPMENT_TYPE,
+    Ticket: Status.TICKET_TYPE,
+}
+
+# Transitions that have per-object side effects (refunds, declared price
+# recalculation...), those are still promoted one by one using promote_status.
+PER_INSTANCE_TRANSITIONS = {
+    Order: ["deleted"],
+    Shipment: ["tobeshipped"],
+}
+
+
+@db_transaction.atomic
+def promote_status_bulk(instances, to_status=None, **kwargs):
+    """
+    Promotes statuses of many objects of the same model at once.
+
+    Does the same thing promote_status does, but creates status events and
+    updates objects using a constant number of queries. Objects that have
+    no next status, are already in to_status or are unpaid shipments
+    promoted to a final status are skipped (promote_status raises
+    InvalidActionError for them).
+    Returns lists of promoted and skipped objects.
+    """
+    if isinstance(instances, QuerySet):
+        instances = list(instances.select_related("user"))
+    else:
+        instances = list(instances)
+
+    if not instances:
+        return [], []
+
+    model = type(instances[0])
+    status_type = STATUS_TYPES.get(model)
+
+    if not status_type or (to_status and to_status.type != status_type):
+        raise InvalidActionError
+
+    next_statuses = {}  # current status id -> next status
+
+    def _get_next_status(current_status):
+        if to_status:
+            return to_status
+        if current_status.id not in next_statuses:
+            next_statuses[current_status.id] = (
+                None if current_status.is_final else current_status.next
+            )
+        return next_statuses[current_status.id]
+
+    current_statuses = Status.objects.in_bulk(
+        {instance.status_id for instance in instances}
+    )
+    per_instance_codenames = PER_INSTANCE_TRANSITIONS.get(model, [])
+    transitions = []
+    promoted = []
+    skipped = []
+
+    for instance in instances:
+        current_status = current_statuses[instance.status_id]
+        next_status = _get_next_status(current_status)
+
+        if (
+            not next_status
+            or next_status.id == current_status.id
+            or (model is Shipment and next_status.is_final and not instance.is_paid)
+        ):
+            skipped.append(instance)
+            continue
+
+        if next_status.codename in per_instance_codenames:
+            promote_status(instance, to_status=next_status, **kwargs)
+            promoted.append(instance)
+            continue
+
+        transitions.append((instance, current_status, next_status))
+
+    if not transitions:
+        return promoted, skipped
+
+    now = timezone.now()
+    update_fields = ["status", "status_last_update_time"]
+
+    if model is Order and any(
+        next_status.codename == "paid" for _, _, next_status in transitions
+    ):
+        update_fields.append("is_paid")
+
+    if model is not Ticket:
+        StatusEvent.objects.bulk_create(_get_status_events(model, transitions))
+
+    for instance, _, next_status in transitions:
+        instance.status = next_status
+        instance.status_last_update_time = now
+
+        if model is Order and next_status.codename == "paid":
+            instance.is_paid = True
+
+    model.objects.bulk_update(
+        [instance for instance, _, _ in transitions], update_fields
+    )
+
+    if model is Shipment:
+        _schedule_shipment_customs_tasks([instance for instance, _, _ in transitions])
+
+    create_notifications_in_bulk(_get_status_notifications(model, transitions))
+
+    return promoted + [instance for instance, _, _ in transitions], skipped
+
+
+def _get_status_events(model, transitions):
+    field_name = model._meta.model_name
+    messages = {}  # (status, warehouses) -> translated messages
+
+    events = []
+
+    for instance, current_status, next_status in transitions:
+        translated_messages = {}
+
+        if model is Shipment:
+            key = (
+                next_status.id,
+                instance.source_warehouse_id,
+                instance.destination_warehouse_id,
+            )
+
+            if key not in messages:
+                messages[key] = {}
+                for lang_code, lang_name in settings.LANGUAGES:
+                    with translation.override(lang_code):
+                        message = _get_shipment_status_notification(
+                            instance, next_status, send_notification=False
+                        )
+                        messages[key]["message_%s" % lang_code] = message and str(
+                            message
+                        )
+
+            translated_messages = messages[key]
+
+        events.append(
+            StatusEvent(
+                from_status=current_status,
+                to_status=next_status,
+                **{field_name: instance},
+                **translated_messages,
+            )
+        )
+
+    return events
+
+
+def _get_status_notifications(model, transitions):
+    """Returns (instance, reason, subject instances) for each notification to be created."""
+    reasons = {
+        Order: {"ordered": EVENTS.ON_ORDER_FULFILL},
+        Package: {
+            "problematic": EVENTS.ON_PACKAGE_STATUS_PROBLEMATIC,
+            "foreign": EVENTS.ON_PACKAGE_STATUS_FOREIGN,
+        },
+        Shipment: {
+            "ontheway": EVENTS.ON_SHIPMENT_STATUS_ONTHEWAY,
+            "received": EVENTS.ON_SHIPMENT_STATUS_RECEIVED,
+            "done": EVENTS.ON_SHIPMENT_STATUS_DONE,
+        },
+    }.get(model, {})
+
+    notifications = []
+
+    for instance, _, next_status in transitions:
+        reason = reasons.get(next_status.codename)
+        if reason:
+            notifications.append((instance, reason, [instance, instance.user]))
+
+    return notifications
+
+
+def _schedule_shipment_customs_tasks(shipments):
+    """
+    Does what Shipment.save does after status is changed,
+    but schedules one task for all shipments.
+    """
+    from fulfillment.tasks import add_to_customs_box
+
+    candidates = [
+        shipment
+        for shipment in shipments
+        if shipment.status.codename in ["processing", "problematic"]
+    ]
+    _prefetch_shipment_package_weights(candidates)
+
+    committable_ids = [
+        shipment.id for shipment in candidates if shipment.can_be_committed_to_customs
+    ]
+    box_ids = [
+        shipment.id
+        for shipment in shipments
+        if shipment.box_id and not shipment.is_added_to_box
+    ]
+
+    if committable_ids:
+        db_transaction.on_commit(lambda: commit_to_customs.delay(committable_ids))
+    if box_ids:
+        db_transaction.on_commit(lambda: add_to_customs_box.delay(box_ids))
+
+
+def _prefetch_shipment_package_weights(shipments):
+    """
+    Sets values used by total_weight and has_packages of shipments,
+    so checking them doesn't query packages of each shipment.
+    """
+    if not shipments:
+        return
+
+    totals = {
+        row["shipment_id"]: row
+        for row in Package.objects.filter(shipment__in=shipments)
+        .values("shipment_id")
+        .annotate(packages_count=Count("id"), total_weight=Sum("weight"))
+    }
+
+    for shipment in shipments:
+        row = totals.get(shipment.id)
+        shipment._has_packages = bool(row)
+        shipment._total_weight = Decimal((row and row["total_weight"]) or 0)
+
+
 def _get_shipment_status_notification(shipment, to_status, send_notification=False):
     message = None
 
@@ -1495,9 +1961,6 @@ def refund_order(order, staff_user_id=None):
         for t in transactions
     )
 
-    balance.amount = F("amount") + refund_amount
-    balance.save(update_fields=["amount"])
-
     # Create refund transaction
     transaction = Transaction.objects.create(
         user=order.user,
@@ -1509,6 +1972,7 @@ def refund_order(order, staff_user_id=None):
         related_object_identifier=order.identifier,
         completed=True,
     )
+    get_balance_resolver().change_amount(balance, refund_amount, transaction)
 
     order.is_paid = False
     order.paid_amount = 0
@@ -1536,20 +2000,86 @@ def refund_order(order, staff_user_id=None):
     return transaction
 
 
-def get_assistant_with_minimum_workload(country_id):
-    return (
+def get_assistant_workloads(country_ids):
+    """
+    Loads count of uncompleted assignments for every assistant working with
+    any of given countries using one query.
+
+    Returns workloads mapped by assistant id and min-heaps of
+    (workload, assistant id) pairs mapped by country id.
+    """
+    rows = (
         ShoppingAssistantProfile.objects.filter(
-            ~Q(user__role__type=Role.ADMIN), countries__id=country_id
+            ~Q(user__role__type=Role.ADMIN), countries__id__in=country_ids
         )
+        .values_list("id", "countries__id")
         .annotate(
             count_of_assignments=Count(
-                "assignment", filter=Q(assignment__is_completed=False)
+                "assignment", filter=Q(assignment__is_completed=False), distinct=True
             )
         )
-        .order_by("count_of_assignments")
-        .first()
     )
 
+    workloads = {}
+    heaps = {}
+
+    for assistant_id, country_id, count_of_assignments in rows:
+        workloads[assistant_id] = count_of_assignments
+        heaps.setdefault(country_id, []).append((count_of_assignments, assistant_id))
+
+    for heap in heaps.values():
+        heapq.heapify(heap)
+
+    return workloads, heaps
+
+
+def pop_assistant_with_minimum_workload(workloads, heaps, country_id):
+    """
+    Returns id of the least busy assistant for country and increases his workload.
+    Assistant may work with several countries, so heap entries left with old
+    workload are skipped and pushed again with the actual one.
+    """
+    heap = heaps.get(country_id)
+
+    while heap:
+        workload, assistant_id = heapq.heappop(heap)
+
+        if workload != workloads[assistant_id]:
+            heapq.heappush(heap, (workloads[assistant_id], assistant_id))
+            continue
+
+        workloads[assistant_id] += 1
+        heapq.heappush(heap, (workloads[assistant_id], assistant_id))
+        return assistant_id
+
+    return None
+
+
+def assign_orders_to_assistants_in_batch(orders):
+    """
+    Distributes orders between assistants of their source countries,
+    so every order goes to the least busy assistant at that moment.
+    """
+    orders = list(orders)
+
+    if not orders:
+        return []
+
+    workloads, heaps = get_assistant_workloads(
+        {order.source_country_id for order in orders}
+    )
+    assignments = [
+        Assignment(
+            assistant_profile_id=pop_assistant_with_minimum_workload(
+                workloads, heaps, order.source_country_id
+            ),
+            order=order,
+        )
+        for order in orders
+    ]
+
+    return Assignment.objects.bulk_create(assignments)
+
 
 def assign_orders_to_assistants(orders):
     """
@@ -1647,8 +2177,7 @@ def approve_remainder_price(staff_user, order):
         )
         order.save(update_fields=order_update_fields)
 
-        balance.amount = F("amount") + refund_amount
-        balance.save(update_fields=["amount"])
+        get_balance_resolver().change_amount(balance, refund_amount, transaction)
         change_message = (
             "User's overpaid amount of %s %s was refunded to his balance"
             % (transaction.amount, transaction.currency.code)
@@ -1803,11 +2332,11 @@ def create_package_from_orders(
             is_serviced=True,
         )
 
-    for order in orders:
-        # Promote order's status to completed (ordered)
-        ordered_status = Status.objects.get(type=Status.ORDER_TYPE, codename="ordered")
-        promote_status(order, to_status=ordered_status)
+    # Promote orders' statuses to completed (ordered)
+    ordered_status = Status.objects.get(type=Status.ORDER_TYPE, codename="ordered")
+    promote_status_bulk(orders, to_status=ordered_status)
 
+    for order in orders:
         # Set assignment as completed
         assignment = order.as_assignment
         assignment.is_completed = True
@@ -1845,9 +2374,10 @@ def accept_incoming_packages(packages, warehouseman, override_tracking_code=None
     current_warehouse = warehouseman.warehouse
     foreign = Status.objects.get(type=Status.PACKAGE_TYPE, codename="foreign")
 
-    for package in filter(lambda p: not p.is_accepted, packages):
-        promote_status(package, to_status=foreign)
+    packages_to_accept = [package for package in packages if not package.is_accepted]
+    promote_status_bulk(packages_to_accept, to_status=foreign)
 
+    for package in packages_to_accept:
         # If ordererd using oneclick, automatically set source_warehouse
         if package.shipment_id:
             package.shipment.source_warehouse = current_warehouse
@@ -1946,11 +2476,11 @@ def create_packages_from_orders(staff_user, orders, tracking_code, arrival_date)
                     is_serviced=True,  # will force the shipment to be marked as serviced
                 )
 
-    for order in orders:
-        # Promote order's status to completed (ordered)
-        ordered_status = Status.objects.get(type=Status.ORDER_TYPE, codename="ordered")
-        promote_status(order, to_status=ordered_status)
+    # Promote orders' statuses to completed (ordered)
+    ordered_status = Status.objects.get(type=Status.ORDER_TYPE, codename="ordered")
+    promote_status_bulk(orders, to_status=ordered_status)
 
+    for order in orders:
         # Set assignment as completed
         assignment = order.as_assignment
         assignment.is_completed = True
@@ -1988,9 +2518,10 @@ def accept_incoming_packages(packages, warehouseman, override_tracking_code=None
     current_warehouse = warehouseman.warehouse
     foreign = Status.objects.get(type=Status.PACKAGE_TYPE, codename="foreign")
 
-    for package in filter(lambda p: not p.is_accepted, packages):
-        promote_status(package, to_status=foreign)
+    packages_to_accept = [package for package in packages if not package.is_accepted]
+    promote_status_bulk(packages_to_accept, to_status=foreign)
 
+    for package in packages_to_accept:
         # If ordererd using oneclick, automatically set source_warehouse
         if package.shipment_id:
             package.shipment.source_warehouse = current_warehouse
@@ -2317,8 +2848,58 @@ def get_invoice(instance: Union[Order, Shipment, CourierOrder]):
     return Invoice(instance)
 
 
+def _get_invoice_cache_instances(instances):
+    """
+    Instances which state is serialized into invoices of the given ones.
+    Unpaid shipments are included into courier order invoices.
+    """
+    cache_instances = []
+
+    for instance in instances:
+        cache_instances.append(instance)
+        if isinstance(instance, CourierOrder):
+            cache_instances += instance.shipments.filter(is_paid=False)
+
+    return cache_instances
+
+
+def get_serialized_invoice(instance: Union[Order, Shipment, CourierOrder]):
+    """Same as get_invoice(instance).serialize(), but cached."""
+    return get_cached_invoice(
+        "invoice",
+        instance.user.as_customer.active_balance,
+        _get_invoice_cache_instances([instance]),
+        lambda: get_invoice(instance).serialize(),
+    )
+
+
+def get_serialized_merged_invoice(
+    user, instances: List[Union[Order, Shipment, CourierOrder]]
+):
+    """Same as merge_invoices(...).serialize(), but cached."""
+    return get_cached_invoice(
+        "merged_invoice",
+        user.as_customer.active_balance,
+        _get_invoice_cache_instances(instances),
+        lambda: merge_invoices(
+            user, [get_invoice(instance) for instance in instances]
+        ).serialize(),
+    )
+
+
 def get_serialized_multiple_invoice(
     user_balance, instances: List[Union[Order, Shipment, CourierOrder]]
+):
+    return get_cached_invoice(
+        "multiple_invoice",
+        user_balance,
+        _get_invoice_cache_instances(instances),
+        lambda: _serialize_multiple_invoice(user_balance, instances),
+    )
+
+
+def _serialize_multiple_invoice(
+    user_balance, instances: List[Union[Order, Shipment, CourierOrder]]
 ):
     from core.serializers.client import CurrencySerializer
 
@@ -2536,41 +3117,39 @@ def make_completed_callback(instances, *args, **kwargs):
 MonthlySpendings = namedtuple("MonthlySpendings", ["amount", "currency", "status"])
 
 
-def calculate_monthly_spendings(recipient) -> MonthlySpendings:
+def calculate_monthly_spendings_in_bulk(recipients):
     """
-    Calculated monthly (current month) spendings of customer.
+    Calculates monthly (current month) spendings of recipients at once.
     Shipments must have `declared_at` field of non-null value.
+    Returns {recipient: MonthlySpendings}.
     """
-    customer = recipient.user
+    recipients = list(recipients)
+
+    if not recipients:
+        return {}
 
     conf = Configuration()
     monthly_spendings_currency = conf.monthly_spendings_treshold_currency
+    amounts = get_monthly_spendings_amounts(recipients, monthly_spendings_currency)
 
-    current_date = timezone.now().date()
-    shipments = customer.shipments.filter(
-        recipient__id_pin=recipient.id_pin,
-        declared_at__isnull=False,
-        declared_at__year=current_date.year,
-        declared_at__month=current_date.month,
-    ).only(
-        "declared_price",
-        "declared_price_currency",
-    )
+    spendings = {}
+    for recipient in recipients:
+        total_spendings = amounts[(recipient.user_id, recipient.id_pin)]
+        spendings[recipient] = MonthlySpendings(
+            total_spendings,
+            monthly_spendings_currency,
+            conf.get_monthly_spendings_status_for_amount(total_spendings),
+        )
 
-    total_spendings = Decimal("0.00")
+    return spendings
 
-    for shipment in shipments:
-        total_spendings += Converter.convert(
-            shipment.declared_price,
-            shipment.declared_price_currency.code,
-            monthly_spendings_currency.code,
-        )
 
-    return MonthlySpendings(
-        total_spendings,
-        monthly_spendings_currency,
-        conf.get_monthly_spendings_status_for_amount(total_spendings),
-    )
+def calculate_monthly_spendings(recipient) -> MonthlySpendings:
+    """
+    Calculated monthly (current month) spendings of customer.
+    Shipments must have `declared_at` field of non-null value.
+    """
+    return calculate_monthly_spendings_in_bulk([recipient])[recipient]
 
 
 def create_notification(
@@ -2588,6 +3167,34 @@ def create_notification(
         pass
 
 
+def create_notifications_in_bulk(notifications, add_related_obj=True):
+    """
+    Same as create_notification, but creates all notifications at once.
+    `notifications` is an iterable of (instance, reason, subject instances).
+    """
+    events = {}
+    notification_events = []
+
+    for instance, reason, subject_instances in notifications:
+        if reason not in events:
+            events[reason] = EVENTS.objects.filter(
+                is_active=True, reason=reason
+            ).first()
+
+        if events[reason]:
+            notification_events.append(
+                NotificationEvent(
+                    instance,
+                    reason,
+                    subject_instances,
+                    add_related_obj=add_related_obj,
+                    event=events[reason],
+                )
+            )
+
+    return NotificationEvent.trigger_in_bulk(notification_events)
+
+
 def check_if_customer_can_top_up_balance(customer, payment_service):
     if payment_service in [
         Transaction.CYBERSOURCE_SERVICE,
@@ -2640,21 +3247,19 @@ def accept_box_at_customs(box: Box, tracking_status: TrackingStatus):
     """
     customs_status = Status.objects.get(type=Status.SHIPMENT_TYPE, codename="customs")
 
-    counter = 0
-    # All boxes have at max 15-30 shipments
-    # FIXME: Make this function async if it hurts performance
-    for shipment in box.shipments.all():
-        counter += 1
+    shipments = list(box.shipments.select_related("user"))
 
-        if tracking_status:
+    if tracking_status:
+        box.shipments.update(tracking_status=tracking_status)
+        for shipment in shipments:
             shipment.tracking_status = tracking_status
-            shipment.save(update_fields=["tracking_status"])
 
-        promote_status(shipment, to_status=customs_status)
-        create_notification(
-            shipment, EVENTS.ON_SHIPMENT_STATUS_CUSTOMS, [shipment, shipment.user]
-        )
-    return counter
+    promote_status_bulk(shipments, to_status=customs_status)
+    create_notifications_in_bulk(
+        (shipment, EVENTS.ON_SHIPMENT_STATUS_CUSTOMS, [shipment, shipment.user])
+        for shipment in shipments
+    )
+    return len(shipments)
 
 
 def accept_shipment_at_customs(shipment: Shipment, tracking_status: TrackingStatus):
@@ -2929,73 +3534,250 @@ def try_create_promo_code_cashbacks(instance: Union[Shipment, CourierOrder, Orde
                 )
 
 
+def _get_first_completed_transactions(objects):
+    """
+    Returns {(object_type_id, object_id): transaction} of the first
+    completed transaction of each object, loaded with one query.
+    """
+    ids_by_type = {}
+
+    for obj in objects:
+        content_type = ContentType.objects.get_for_model(obj)
+        ids_by_type.setdefault(content_type.pk, []).append(str(obj.pk))
+
+    if not ids_by_type:
+        return {}
+
+    condition = Q()
+    for content_type_id, ids in ids_by_type.items():
+        condition |= Q(object_type_id=content_type_id, object_id__in=ids)
+
+    transactions = {}
+
+    for transaction in (
+        Transaction.objects.filter(
+            condition, completed=True, is_deleted=False, deleted_at__isnull=True
+        )
+        .select_related("currency")
+        .order_by("-id")
+    ):
+        transactions[(transaction.object_type_id, transaction.object_id)] = transaction
+
+    return transactions
+
+
+@balance_resolver_scope()
 @db_transaction.atomic
-def apply_cashbacks_to_promo_code_owner(transaction_id):
-    try:
-        transaction = Transaction.objects.get(id=transaction_id)
-    except Transaction.DoesNotExist:
-        return
+def settle_invite_friend_cashbacks(cashbacks):
+    """
+    Gives promo code owners cashbacks for completed invite friend cashbacks
+    of their consumers.
+
+    Each cashback uses the next usable benefit of the promo code, like
+    `PromoCode.get_next_cashback` does, but benefits, their objects and
+    transactions are loaded for all cashbacks at once, and cashback
+    transactions, balance entries and notifications are created in bulk.
+    Returns created cashback transactions.
+    """
+    conf = Configuration()
+    cashbacks = [
+        cashback for cashback in cashbacks if cashback.user.registered_promo_code_id
+    ]
+
+    if not cashbacks:
+        return []
+
+    usable_benefits = {}
+
+    for benefit in (
+        PromoCodeBenefit.objects.select_for_update()
+        .filter(
+            promo_code__in={c.user.registered_promo_code_id for c in cashbacks},
+            used_by_owner=False,
+            used_by_consumer=True,
+        )
+        .order_by("id")
+    ):
+        usable_benefits.setdefault(benefit.promo_code_id, []).append(benefit)
 
-    cashbacks = transaction.cashbacks.filter(
-        completed=True, is_deleted=False, extra__invite_friend_cashback=True
+    benefits = [
+        b for promo_benefits in usable_benefits.values() for b in promo_benefits
+    ]
+    prefetch_generic_related_objects(benefits, nested=False)
+
+    related_objects = [b.related_object for b in benefits if b.related_object]
+    for model in {type(obj) for obj in related_objects}:
+        if issubclass(model, DiscountableModelMixin):
+            prefetch_related_objects(
+                [obj for obj in related_objects if type(obj) is model],
+                model.get_discounts_prefetch(),
+            )
+
+    related_transactions = _get_first_completed_transactions(related_objects)
+    transaction_related_object = Transaction._meta.get_field("related_object")
+    usd_currency_id = (
+        Currency.objects.filter(code="USD").values_list("id", flat=True).first()
     )
 
+    used_benefits = []
+    settled_cashbacks = []
+
     for cashback in cashbacks:
-        user = cashback.user
-        promo_code = user.registered_promo_code
-        next_cashback = promo_code.get_next_cashback()
+        promo_code = cashback.user.registered_promo_code
+        promo_benefits = usable_benefits.get(promo_code.pk)
+
+        if not promo_benefits:
+            continue
+
+        benefit = promo_benefits[0]
+        related_transaction = benefit.related_object and related_transactions.get(
+            (benefit.object_type_id, str(benefit.related_object.pk))
+        )
+
+        if not related_transaction:
+            # Next benefit is not usable yet, so none of the following are
+            continue
+
+        transaction_related_object.set_cached_value(
+            related_transaction, benefit.related_object
+        )
+        promo_benefits.pop(0)
+        benefit.used_by_owner = True
+        benefit.cashback_amount = (
+            related_transaction.discounted_amount
+            * conf.invite_friend_cashback_percentage
+            / Decimal("100")
+        )
+        benefit.cashback_amount_currency_id = usd_currency_id
+        used_benefits.append(benefit)
+        settled_cashbacks.append(cashback)
+
+    PromoCodeBenefit.objects.bulk_update(
+        used_benefits,
+        ["used_by_owner", "cashback_amount", "cashback_amount_currency"],
+    )
 
-        if next_cashback:
-            cashback_transaction = Transaction.objects.create(
-                user_id=promo_code.user_id,
+    cashback_transactions = Transaction.objects.bulk_create(
+        [
+            Transaction(
+                user_id=cashback.user.registered_promo_code.user_id,
                 amount=cashback.amount,
                 currency_id=cashback.currency_id,
+                original_amount=cashback.amount,
+                original_currency_id=cashback.currency_id,
                 cashback_to=None,
                 completed=True,
                 type=Transaction.BALANCE,
                 purpose=Transaction.CASHBACK,
                 extra={"cashback_from_invited_friend": True},
             )
-            balance = promo_code.user.active_balance
-            balance.amount = F("amount") + Converter.convert(
-                cashback_transaction.amount,
-                cashback_transaction.currency.code,
-                promo_code.user.active_balance.currency.code,
+            for cashback in settled_cashbacks
+        ]
+    )
+
+    # One balance change per owner (and currency of cashbacks)
+    owner_cashbacks = {}
+
+    for cashback, cashback_transaction in zip(settled_cashbacks, cashback_transactions):
+        owner = cashback.user.registered_promo_code.user
+        owner_cashbacks.setdefault((owner, cashback.currency), []).append(
+            cashback_transaction
+        )
+
+    resolver = get_balance_resolver()
+    balance_changes = []
+
+    for (owner, currency), transactions in owner_cashbacks.items():
+        balance = resolver.get_active_balance(
+            owner, code=settings.USER_BALANCE_CURRENCY_CODE
+        )
+        balance_changes.append(
+            (
+                balance,
+                Converter.convert(
+                    sum(t.amount for t in transactions),
+                    currency.code,
+                    balance.currency.code,
+                ),
+                transactions[0] if len(transactions) == 1 else None,
             )
-            balance.save(update_fields=["amount"])
-            balance.refresh_from_db(fields=["amount"])
-            create_notification(
+        )
+
+    resolver.change_amounts(balance_changes)
+
+    create_notifications_in_bulk(
+        [
+            (
                 cashback_transaction,
                 EVENTS.ON_INVITE_FRIEND_CASHBACK_OWNER,
-                [transaction.user],
-                add_related_obj=False,
+                [cashback.user],
             )
+            for cashback, cashback_transaction in zip(
+                settled_cashbacks, cashback_transactions
+            )
+        ],
+        add_related_obj=False,
+    )
+
+    return cashback_transactions
+
+
+def apply_cashbacks_to_promo_code_owner(transaction_id):
+    transaction = Transaction.objects.filter(id=transaction_id).first()
+
+    if transaction is None:
+        return []
+
+    return settle_invite_friend_cashbacks(
+        transaction.cashbacks.filter(
+            completed=True, is_deleted=False, extra__invite_friend_cashback=True
+        ).select_related("currency", "user__registered_promo_code__user")
+    )
 
 
 @db_transaction.atomic
 def make_objects_paid(
-    instances: List[Union[CourierOrder, Shipment, Order]], user_id=None
+    instances: Iterable[Union[CourierOrder, Shipment, Order]], user_id=None
 ):
-    content_type_model_pk_map = {}
+    """
+    Marks instances as paid and completes their transactions manually.
+    Instances may be of different models, a fixed number of queries
+    is run per model.
+    """
+    instances_by_model = {}
 
     for instance in instances:
-        instance.is_paid = True
-        instance.save(update_fields=["is_paid"])
-        instance.transactions.filter(is_deleted=False).update(
-            completed=True, completed_at=timezone.now(), completed_manually=True
-        )
-        if user_id:
-            content_type_pk = content_type_model_pk_map.get(type(instance), None)
+        instances_by_model.setdefault(type(instance), []).append(instance)
 
-            if not content_type_pk:
-                content_type_pk = ContentType.objects.get_for_model(instance).pk
-                content_type_model_pk_map[type(instance)] = content_type_pk
+    completed_at = timezone.now()
+    log_entries = []
 
-            LogEntry.objects.log_action(
-                user_id=user_id,
-                content_type_id=content_type_pk,
-                object_id=instance.pk,
-                object_repr=str(instance),
-                action_flag=CHANGE,
-                change_message=("Manually marked instance as paid"),
-            )
+    for model, model_instances in instances_by_model.items():
+        content_type = ContentType.objects.get_for_model(model)
+        pks = [instance.pk for instance in model_instances]
+
+        model._base_manager.filter(pk__in=pks).update(is_paid=True)
+        Transaction.objects.filter(
+            object_type=content_type,
+            object_id__in=[str(pk) for pk in pks],
+            is_deleted=False,
+        ).update(completed=True, completed_at=completed_at, completed_manually=True)
+
+        for instance in model_instances:
+            instance.is_paid = True
+            # Updated in bulk, signals are not sent
+            invalidate_invoice(model._meta.label_lower, instance.pk)
+
+            if user_id:
+                log_entries.append(
+                    LogEntry(
+                        user_id=user_id,
+                        content_type_id=content_type.pk,
+                        object_id=str(instance.pk),
+                        object_repr=str(instance)[:200],
+                        action_flag=CHANGE,
+                        change_message="Manually marked instance as paid",
+                    )
+                )
+
+    LogEntry.objects.bulk_create(log_entries)
@@ -1,4 +1,5 @@
 import json
+from contextlib import contextmanager
 from typing import Union, List
 from decimal import Decimal
 from xml.dom.minidom import parseString
@@ -12,18 +13,18 @@ from django.core.files.base import ContentFile
 from django.conf import settings
 from django.core.mail import EmailMessage
 from django.db import transaction as db_transaction
-from django.db.models import Prefetch, F, Count, Q, Sum
+from django.db.models import Prefetch, F, Count, Q, Sum, prefetch_related_objects
 from django.contrib.admin.models import ContentType
 from django.utils import translation, timezone
 from django.template import Template, Context
 from django.utils.translation import ugettext_lazy as _
-from djangorestframework_camel_case.render import CamelCaseJSONRenderer
 
 from ontime import messages as msg
 from poctgoyercin.utils import send_sms_to_customer
 from domain.exceptions.logic import InvalidActionError, QueueError, ManifestError
 from domain.conf import Configuration
 from ontime.utils import get_redis_client
+from ontime.renderers import CamelCaseJSONRenderer
 from core.converter import Converter
 from core.models import Currency
 from customer.models import Role
@@ -312,6 +313,8 @@ class Invoice:
         if reasons:
             from core.serializers.client import CurrencySerializer
 
+            active_balance = self.instance.user.as_customer.active_balance
+
             payment_service_currency_codes = set(
                 [settings.PAYPAL_CURRENCY_CODE, settings.CYBERSOURCE_CURRENCY_CODE]
             )
@@ -329,9 +332,9 @@ class Invoice:
                     Converter.convert(
                         self.instance.discounted_total_price,
                         self.instance.discounted_total_price_currency.code,
-                        self.instance.user.as_customer.active_balance.currency.code,
+                        active_balance.currency.code,
                     )
-                    - self.instance.user.as_customer.active_balance.amount
+                    - active_balance.amount
                 )
                 is_missing = missing_amount > 0 and not self.instance.is_paid
             else:
@@ -340,9 +343,9 @@ class Invoice:
                         Converter.convert(
                             remainder_transaction.discounted_amount,
                             remainder_transaction.discounted_amount_currency.code,
-                            self.instance.user.as_customer.active_balance.currency.code,
+                            active_balance.currency.code,
                         )
-                        - self.instance.user.as_customer.active_balance.amount
+                        - active_balance.amount
                     )
 
                 is_missing = (
@@ -350,16 +353,14 @@ class Invoice:
                     and not remainder_transaction.completed
                     and missing_amount > 0
                 )
-            missing_amount_currency = CurrencySerializer(
-                self.instance.user.as_customer.active_balance.currency
-            ).data
+            missing_amount_currency = CurrencySerializer(active_balance.currency).data
 
             main_total = Converter.convert(
                 self.instance.total_price,
                 self.instance.total_price_currency.code,
-                self.instance.user.as_customer.active_balance.currency.code,
+                active_balance.currency.code,
             )
-            main_total_currency = self.instance.user.as_customer.active_balance.currency
+            main_total_currency = active_balance.currency
             self.main_total = main_total
             self.main_total_currency = main_total_currency
 
@@ -410,7 +411,7 @@ class Invoice:
                         }
                     ]
                     if self.instance.total_price_currency_id
-                    != self.instance.user.as_customer.active_balance.currency_id
+                    != active_balance.currency_id
                     else []
                 ),
                 "missing": {
@@ -425,11 +426,11 @@ class Invoice:
                                 Converter.convert(
                                     remainder_transaction.discounted_amount,
                                     remainder_transaction.discounted_amount_currency.code,
-                                    self.instance.user.as_customer.active_balance.currency.code,
+                                    active_balance.currency.code,
                                 )
                             ),
                             "currency": CurrencySerializer(
-                                self.instance.user.as_customer.active_balance.currency,
+                                active_balance.currency,
                             ).data,
                             "is_main": True,
                         }
@@ -447,7 +448,7 @@ class Invoice:
                             }
                         ]
                         if remainder_transaction.currency_id
-                        != self.instance.user.active_balance.currency_id
+                        != active_balance.currency_id
                         else []
                     )
                 )
@@ -596,6 +597,24 @@ NOTIFY_CHANNELS = NOTIFY_CHANNELS()
 
 
 class QueueClient:
+    """
+    Publishes queue events to redis channels.
+
+    Events are rendered at the moment they are published (so deleted items
+    can still be announced), but sent only after the surrounding database
+    transaction commits, all in one redis pipeline. Wrap several publish calls
+    into `batch()` to send them in the same round trip and to serialize
+    each queued item only once.
+    """
+
+    DASHBOARD_SNAPSHOT = "dashboard"
+    MONITOR_SNAPSHOT = "monitor"
+
+    # Published events are also kept in a capped per-warehouse stream,
+    # so clients can ask only for changes since the last event they saw.
+    EVENT_STREAM = "queue_events:%s"
+    EVENT_STREAM_LENGTH = 5000
+
     def __init__(self, redis_client=None):
         from fulfillment.serializers.admin import queue as serializers
 
@@ -603,6 +622,27 @@ class QueueClient:
         if not self.redis_client:
             self.redis_client = get_redis_client()
         self.serializers = serializers
+        self.renderer = CamelCaseJSONRenderer()
+
+        self._pending_messages = []
+        self._snapshots = {}
+        self._batch_depth = 0
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        # Messages queued before the block (by outer batches) are kept
+        pending_count = len(self._pending_messages)
+        try:
+            yield self
+        except Exception:
+            del self._pending_messages[pending_count:]
+            raise
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._snapshots = {}
+                self._schedule_flush()
 
     def publish_assignable_item(self, queued_item: QueuedItem):
         """
@@ -636,37 +676,144 @@ class QueueClient:
     def publish_assigned_item(
         self, queued_item: QueuedItem, to_dashboard=True, to_monitor=True, action="add"
     ):
-        base_dashboard_data = {
-            "warehouse_id": queued_item.warehouse_id,
-            "queue_id": queued_item.queue_id,
-            "queue_code": queued_item.queue_id and queued_item.queue.code,
-            # "monitor_code": (queued_item.queue_id and queued_item.queue.monitor.code),
-            "action": action,
-        }
-        base_monitor_data = {"warehouse_id": queued_item.warehouse_id, "action": action}
+        if not (to_dashboard or to_monitor):
+            return
+
+        with self.batch():
+            prefetch_related_objects([queued_item], "queue", "dest_queue", "user")
+
+            base_dashboard_data = {
+                "warehouse_id": queued_item.warehouse_id,
+                "queue_id": queued_item.queue_id,
+                "queue_code": queued_item.queue_id and queued_item.queue.code,
+                # "monitor_code": (queued_item.queue_id and queued_item.queue.monitor.code),
+                "action": action,
+            }
+            base_monitor_data = {
+                "warehouse_id": queued_item.warehouse_id,
+                "action": action,
+            }
 
-        if to_dashboard:
-            self._publish(
-                DASHBOARD_CHANNELS[queued_item.queue.type],
-                {
-                    **base_dashboard_data,
-                    "item": self.serializers.QueuedItemSerializer(queued_item).data,
-                },
-            )
+            if to_dashboard:
+                self._publish(
+                    DASHBOARD_CHANNELS[queued_item.queue.type],
+                    {
+                        **base_dashboard_data,
+                        "item": self.get_snapshot(queued_item, self.DASHBOARD_SNAPSHOT),
+                    },
+                )
 
-        if to_monitor:
-            self._publish(
-                MONITOR_CHANNELS.MAIN_MONITOR,
-                {
-                    **base_monitor_data,
-                    "item": self.serializers.MonitorQueuedItemSerializer(
-                        queued_item
-                    ).data,
-                },
-            )
+            if to_monitor:
+                self._publish(
+                    MONITOR_CHANNELS.MAIN_MONITOR,
+                    {
+                        **base_monitor_data,
+                        "item": self.get_snapshot(queued_item, self.MONITOR_SNAPSHOT),
+                    },
+                )
+
+    def get_snapshot(self, queued_item: QueuedItem, kind):
+        """
+        Returns serialized queued item. Snapshot is built once per batch,
+        so item must not be changed between publish calls of the same batch.
+        """
+        key = (queued_item.pk, kind)
+
+        if key not in self._snapshots:
+            if kind == self.DASHBOARD_SNAPSHOT:
+                serializer_class = self.serializers.QueuedItemSerializer
+            else:
+                serializer_class = self.serializers.MonitorQueuedItemSerializer
+
+            self._snapshots[key] = serializer_class(queued_item).data
+
+        return self._snapshots[key]
+
+    def get_last_event_id(self, warehouse_id):
+        events = self.redis_client.xrevrange(self.EVENT_STREAM % warehouse_id, count=1)
+        return events[0][0].decode() if events else None
+
+    def read_events(self, warehouse_id, since, channels=None):
+        """
+        Returns events published to `channels` (all by default) after
+        event with id `since`. Returns None when `since` is malformed or
+        already trimmed from the stream, in that case caller must reload all items.
+        """
+        since_key = self.parse_event_id(since)
+        if not since_key:
+            return None
+
+        stream = self.EVENT_STREAM % warehouse_id
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.xrange(stream, count=1)
+        pipeline.xrange(stream, min=since)
+        first_events, events = pipeline.execute()
+
+        if first_events:
+            first_key = self.parse_event_id(first_events[0][0].decode())
+            if since_key < first_key:
+                return None
+
+        return [
+            {
+                "id": event_id.decode(),
+                "channel": fields[b"channel"].decode(),
+                **json.loads(fields[b"data"]),
+            }
+            for event_id, fields in events
+            if event_id.decode() != since
+            and (channels is None or fields[b"channel"].decode() in channels)
+        ]
+
+    def flush(self):
+        """Sends all pending messages right away."""
+        messages, self._pending_messages = self._pending_messages, []
+        self._send(messages)
 
     def _publish(self, channel, data):
-        self.redis_client.publish(channel, CamelCaseJSONRenderer().render(data))
+        self._pending_messages.append(
+            (channel, self.renderer.render(data), data.get("warehouse_id"))
+        )
+
+        if not self._batch_depth:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self._pending_messages:
+            return
+
+        cxn = db_transaction.get_connection()
+        if cxn.in_atomic_block:
+            # Take currently pending messages with us, so messages published
+            # in later transactions are not sent before those commit.
+            messages, self._pending_messages = self._pending_messages, []
+            db_transaction.on_commit(lambda: self._send(messages))
+        else:
+            self.flush()
+
+    def _send(self, messages):
+        if not messages:
+            return
+
+        pipeline = self.redis_client.pipeline(transaction=False)
+        for channel, payload, warehouse_id in messages:
+            pipeline.publish(channel, payload)
+            if warehouse_id:
+                pipeline.xadd(
+                    self.EVENT_STREAM % warehouse_id,
+                    {"channel": channel, "data": payload},
+                    maxlen=self.EVENT_STREAM_LENGTH,
+                    approximate=True,
+                )
+        pipeline.execute()
+
+    @staticmethod
+    def parse_event_id(event_id):
+        try:
+            timestamp, sequence = str(event_id).split("-")
+            return int(timestamp), int(sequence)
+        except (TypeError, ValueError):
+            return None
 
 
 class QueueManager:
@@ -691,10 +838,11 @@ class QueueManager:
             code=self.generate_queue_code(),
         )
 
-        self.client.publish_assignable_item(queued_item)
-        self.client.publish_assigned_item(
-            queued_item, to_monitor=True, to_dashboard=False
-        )
+        with self.client.batch():
+            self.client.publish_assignable_item(queued_item)
+            self.client.publish_assigned_item(
+                queued_item, to_monitor=True, to_dashboard=False
+            )
 
         return queued_item
 
@@ -717,10 +865,11 @@ class QueueManager:
         )
         queued_item.shipments.set(shipments)
 
-        self.client.publish_assigned_item(
-            queued_item, to_monitor=True, to_dashboard=False
-        )
-        self.client.publish_assignable_item(queued_item)
+        with self.client.batch():
+            self.client.publish_assigned_item(
+                queued_item, to_monitor=True, to_dashboard=False
+            )
+            self.client.publish_assignable_item(queued_item)
 
         return queued_item
 
@@ -828,12 +977,13 @@ class QueueManager:
                 item.warehouseman_ready = True
                 item.save(update_fields=["warehouseman_ready"])
 
-                self.client.publish_assignable_item(item)
-                self.client.publish_assigned_item(
-                    item,
-                    to_monitor=not item.for_cashier,
-                    to_dashboard=False,
-                )
+                with self.client.batch():
+                    self.client.publish_assignable_item(item)
+                    self.client.publish_assigned_item(
+                        item,
+                        to_monitor=not item.for_cashier,
+                        to_dashboard=False,
+                    )
 
             elif item.queue.type == Queue.TO_CASHIER:
                 item.cashier_ready = True
@@ -944,6 +1094,7 @@ class NotificationEvent:
         subject_instances,
         lang_code=None,
         add_related_obj=True,
+        event=None,
     ):
         self.initiator = initiator_object
         self.reason = reason
@@ -951,9 +1102,13 @@ class NotificationEvent:
         self.lang_code = lang_code
         self.add_related_object = add_related_obj
 
-        self._event = _NotificationEvent.objects.filter(
-            is_active=True, reason=self.reason
-        ).first()
+        # Event may be passed in when triggering many notifications for the same reason
+        self._event = (
+            event
+            or _NotificationEvent.objects.filter(
+                is_active=True, reason=self.reason
+            ).first()
+        )
 
         if not self._event:
             raise _NotificationEvent.DoesNotExist
@@ -980,6 +1135,14 @@ class NotificationEvent:
         return result
 
     def get_notification(self) -> _Notification:
+        notification = self.build_notification()
+        notification.save()
+        return notification
+
+    def build_notification(self) -> _Notification:
+        """
+        Returns rendered, but not yet saved notification.
+        """
         web_title = self.get_rendered_text_in_all_languages("web_title")
         web_text = self.get_rendered_text_in_all_languages("web_text")
         must_be_seen_on_web = all(web_title.values())
@@ -996,7 +1159,7 @@ class NotificationEvent:
             else {}
         )
 
-        notification = _Notification.objects.create(
+        notification = _Notification(
             event=self._event,
             user_id=self.initiator.user_id,
             type=NotificationEvent.get_notification_type(
@@ -1032,6 +1195,30 @@ class NotificationEvent:
     def _send(self):
         return send_notification.delay(self.notification_object.id)
 
+    @classmethod
+    def trigger_in_bulk(cls, events) -> List[_Notification]:
+        """
+        Triggers many events at once. Notifications are inserted
+        in a single query and sent after transaction commits.
+        """
+        notifications = _Notification.objects.bulk_create(
+            [event.build_notification() for event in events]
+        )
+
+        if notifications:
+
+            def _send():
+                for notification in notifications:
+                    send_notification.delay(notification.id)
+
+            cxn = db_transaction.get_connection()
+            if cxn.in_atomic_block:
+                db_transaction.on_commit(_send)
+            else:
+                _send()
+
+        return notifications
+
     def _get_translated_field(
         self, from_object, from_field_name, to_field_name=None, default=None
     ):
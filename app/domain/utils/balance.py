@@ -0,0 +1,177 @@
+"""
+Balance resolver caches user balances for a single request (or any other
+unit of work, like a celery task), so the same balance row and base
+currency are not fetched again on every `active_balance` access.
+
+Outside of `balance_resolver_scope` nothing is cached and every access
+hits the database as before.
+
+Balance changes are appended to the ledger (`BalanceEntry`) instead of
+updating the balance row, and are rolled up into `Balance.amount`
+by `roll_up_balances` after commit and periodically.
+
+Cached balances changed (or created) in a transaction or savepoint that
+is rolled back are dropped and loaded again on next access.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction as db_transaction
+from django.db.models import OuterRef, Subquery, Sum
+
+_current_resolver = ContextVar("balance_resolver", default=None)
+
+
+class _CommitMarker:
+    """
+    Registered as on_commit callback of a change. Rolling back the
+    transaction or savepoint discards the callback before it runs.
+    """
+
+    committed = False
+
+    def __call__(self):
+        self.committed = True
+
+    def is_rolled_back(self):
+        if self.committed:
+            return False
+
+        connection = db_transaction.get_connection()
+        return not any(func is self for sids, func in connection.run_on_commit)
+
+
+class BalanceResolver:
+    def __init__(self):
+        self._currencies = {}
+        self._balances = {}
+        self._markers = {}
+
+    def get_currency(self, **lookup):
+        from core.models import Currency
+
+        key = tuple(sorted(lookup.items()))
+
+        if key not in self._currencies:
+            self._currencies[key] = Currency.objects.filter(**lookup).first()
+
+        return self._currencies[key]
+
+    def get_balance(self, user, currency):
+        """Will create balance if necessary."""
+        key = (user.pk, currency.pk)
+        balance = self._balances.get(key)
+
+        if balance is not None and self._is_rolled_back(key):
+            balance = None
+
+        if balance is None:
+            from customer.models import Balance, BalanceEntry
+
+            pending_amount = (
+                BalanceEntry.objects.filter(
+                    balance=OuterRef("pk"), snapshot__isnull=True
+                )
+                .values("balance")
+                .annotate(total=Sum("amount"))
+                .values("total")
+            )
+            balance, created = (
+                Balance.objects.select_related("currency")
+                .annotate(pending_amount=Subquery(pending_amount))
+                .get_or_create(user=user, currency=currency)
+            )
+            balance.apply_pending_amount(getattr(balance, "pending_amount", 0) or 0)
+            self._balances[key] = balance
+
+            if created:
+                self._track(key)
+
+        return balance
+
+    def get_active_balance(self, user, **currency_lookup):
+        currency = self.get_currency(**currency_lookup)
+        if currency:
+            return self.get_balance(user, currency)
+        return None
+
+    def change_amount(self, balance, amount, transaction=None):
+        """
+        Adds amount (negative to subtract) to the balance
+        by appending an entry to the ledger.
+        """
+        return self.change_amounts([(balance, amount, transaction)])[0]
+
+    def change_amounts(self, changes):
+        """
+        Same as change_amount, but for many (balance, amount, transaction)
+        changes. Entries are inserted using one query.
+        """
+        from customer.models import BalanceEntry
+
+        entries = BalanceEntry.objects.bulk_create(
+            [
+                BalanceEntry(balance=balance, amount=amount, transaction=transaction)
+                for balance, amount, transaction in changes
+            ]
+        )
+
+        for balance, amount, transaction in changes:
+            balance.apply_pending_amount(amount)
+            self._track((balance.user_id, balance.currency_id))
+
+        if entries:
+            self._schedule_roll_up({entry.balance_id for entry in entries})
+
+        return entries
+
+    def _track(self, key):
+        if key not in self._balances:
+            return
+
+        marker = _CommitMarker()
+        self._markers.setdefault(key, []).append(marker)
+        db_transaction.on_commit(marker)
+
+    def _is_rolled_back(self, key):
+        markers = [
+            marker for marker in self._markers.get(key, ()) if not marker.committed
+        ]
+
+        if any(marker.is_rolled_back() for marker in markers):
+            self._balances.pop(key, None)
+            self._markers.pop(key, None)
+            return True
+
+        self._markers[key] = markers
+        return False
+
+    def _schedule_roll_up(self, balance_ids):
+        from customer.tasks import roll_up_balances_task
+
+        balance_ids = list(balance_ids)
+        db_transaction.on_commit(lambda: roll_up_balances_task.delay(balance_ids))
+
+
+def get_balance_resolver() -> BalanceResolver:
+    """Returns resolver of the current scope, or a non-caching one."""
+    return _current_resolver.get() or BalanceResolver()
+
+
+@contextmanager
+def balance_resolver_scope():
+    """
+    Caches balances until the scope is exited.
+    Nested scopes share resolver with the outermost one.
+    """
+    resolver = _current_resolver.get()
+
+    if resolver is not None:
+        yield resolver
+        return
+
+    token = _current_resolver.set(BalanceResolver())
+    try:
+        yield _current_resolver.get()
+    finally:
+        _current_resolver.reset(token)
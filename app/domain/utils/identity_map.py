@@ -0,0 +1,177 @@
+"""
+Identity map keeps rows of small reference tables (currencies,
+countries, warehouses, roles) loaded during a single request (or celery
+task), so the same row is not fetched again on every lookup by id or
+natural key:
+
+    usd = get_identity_map().get(Currency, code="USD")
+
+Rows loaded by any lookup are also returned for lookups by their pk.
+Instances are shared within the scope and must not be changed in place.
+Saving or deleting a row of a model forgets all its loaded rows.
+
+Outside of `identity_map_scope` nothing is cached and every lookup
+hits the database as before. Hits and misses of the scope are counted
+and reported by the middleware and celery signals in debug mode.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from celery import signals as celery_signals
+from celery.utils.log import get_task_logger
+from django.conf import settings
+
+task_logger = get_task_logger(__name__)
+
+_current_map = ContextVar("identity_map", default=None)
+
+_MISSING = object()
+
+
+def _get_key(lookup):
+    return tuple(
+        sorted(
+            ("pk" if name == "id" else name, value) for name, value in lookup.items()
+        )
+    )
+
+
+class IdentityMap:
+    def __init__(self):
+        self._instances = defaultdict(dict)
+        self._all = {}
+        self.stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    def _load(self, model, key, load):
+        instances = self._instances[model]
+        stats = self.stats[model._meta.label]
+        instance = instances.get(key, _MISSING)
+
+        if instance is not _MISSING:
+            stats["hits"] += 1
+            return instance
+
+        stats["misses"] += 1
+        instance = load()
+        instances[key] = instance
+
+        if instance is not None:
+            instances[_get_key({"pk": instance.pk})] = instance
+
+        return instance
+
+    def get(self, model, **lookup):
+        """
+        Same as `model.objects.get(**lookup)`, raises DoesNotExist when
+        there is no row.
+        """
+
+        def load():
+            try:
+                return model._default_manager.get(**lookup)
+            except model.DoesNotExist:
+                return None
+
+        instance = self._load(model, _get_key(lookup), load)
+
+        if instance is None:
+            raise model.DoesNotExist(
+                "%s matching query does not exist." % model._meta.object_name
+            )
+
+        return instance
+
+    def first(self, model, **lookup):
+        """
+        Same as `model.objects.filter(**lookup).first()`.
+        """
+        return self._load(
+            model,
+            ("first",) + _get_key(lookup),
+            lambda: model._default_manager.filter(**lookup).first(),
+        )
+
+    def all(self, model):
+        """
+        Returns list of all rows of the model.
+        """
+        stats = self.stats[model._meta.label]
+
+        if model in self._all:
+            stats["hits"] += 1
+            return self._all[model]
+
+        stats["misses"] += 1
+        instances = list(model._default_manager.all())
+        self._all[model] = instances
+
+        for instance in instances:
+            self._instances[model].setdefault(_get_key({"pk": instance.pk}), instance)
+
+        return instances
+
+    def forget(self, model):
+        self._instances.pop(model, None)
+        self._all.pop(model, None)
+
+    def get_stats_display(self):
+        return "; ".join(
+            "%s hits=%s misses=%s" % (label, stats["hits"], stats["misses"])
+            for label, stats in sorted(self.stats.items())
+        )
+
+
+def get_identity_map() -> IdentityMap:
+    """Returns identity map of the current scope, or a non-caching one."""
+    return _current_map.get() or IdentityMap()
+
+
+def forget_loaded(model):
+    identity_map = _current_map.get()
+
+    if identity_map is not None:
+        identity_map.forget(model)
+
+
+@contextmanager
+def identity_map_scope():
+    """
+    Keeps loaded rows until the scope is exited.
+    Nested scopes share identity map with the outermost one.
+    """
+    identity_map = _current_map.get()
+
+    if identity_map is not None:
+        yield identity_map
+        return
+
+    token = _current_map.set(IdentityMap())
+    try:
+        yield _current_map.get()
+    finally:
+        _current_map.reset(token)
+
+
+@celery_signals.task_prerun.connect(dispatch_uid="task_enter_identity_map_uid")
+def task_enter_identity_map(task, **kwargs):
+    # Tasks run eagerly inside a scope share its identity map
+    if _current_map.get() is None:
+        task.request.identity_map_token = _current_map.set(IdentityMap())
+
+
+@celery_signals.task_postrun.connect(dispatch_uid="task_exit_identity_map_uid")
+def task_exit_identity_map(task, **kwargs):
+    token = getattr(task.request, "identity_map_token", None)
+
+    if token is None:
+        return
+
+    identity_map = _current_map.get()
+    _current_map.reset(token)
+    task.request.identity_map_token = None
+
+    if settings.DEBUG and identity_map.stats:
+        task_logger.info(
+            "%s identity map: %s", task.name, identity_map.get_stats_display()
+        )
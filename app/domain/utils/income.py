@@ -0,0 +1,272 @@
+"""
+Income reporting.
+
+Income is money charged from cards by payment services. It is computed
+in SQL for a whole date range at once: amounts are extracted from
+payment service responses (PayPal captures, Cybersource request amount,
+PayTR payment amount), and when response has no amount the card part of
+the transaction (amount without part paid from balance) is used.
+Amounts are converted into base currency using currency rate of the
+payment time from `CurrencyRateLog`.
+
+Daily results are rolled up into `IncomeSummary`, which reports read.
+"""
+import datetime
+from decimal import Decimal
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.db.models import Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from fulfillment.models import Transaction, IncomeSummary
+
+PERIODS = ["day", "week", "month", "year"]
+
+IncomeRow = namedtuple(
+    "IncomeRow",
+    [
+        "period",
+        "payment_service",
+        "currency_id",
+        "transactions_count",
+        "amount",
+        "base_amount",
+    ],
+)
+
+# Rate (to base currency) of the currency at the given time
+_RATE_SQL = """
+    COALESCE(
+        (
+            SELECT rate_log.rate FROM currency_rate_log rate_log
+            WHERE rate_log.currency_id = {currency}
+                AND rate_log.created_at <= {at}
+            ORDER BY rate_log.created_at DESC
+            LIMIT 1
+        ),
+        (SELECT currency.rate FROM currency WHERE currency.id = {currency})
+    )
+"""
+
+_NUMBER_PATTERN = r"^-?[0-9]+(\.[0-9]+)?$"
+
+INCOME_SQL = """
+WITH card AS (
+    SELECT
+        t.id,
+        t.completed_at,
+        t.payment_service,
+        t.currency_id,
+        t.amount,
+        t.from_balance_amount,
+        t.from_balance_currency_id,
+        t.payment_service_response_json AS response
+    FROM transaction t
+    WHERE t.type = %(type)s
+        AND t.completed
+        AND NOT t.is_deleted
+        AND t.deleted_at IS NULL
+        AND t.completed_at >= %(start)s
+        AND t.completed_at < %(end)s
+        {service_filter}
+),
+service_charges AS (
+    SELECT
+        card.id,
+        (capture -> 'amount' ->> 'value')::numeric AS amount,
+        COALESCE(
+            capture -> 'amount' ->> 'currency_code', %(paypal_currency)s
+        ) AS currency_code
+    FROM card
+    CROSS JOIN LATERAL jsonb_array_elements(
+        COALESCE(card.response -> 'capture_response' -> 'purchase_units', '[]')
+    ) AS purchase_unit
+    CROSS JOIN LATERAL jsonb_array_elements(
+        COALESCE(purchase_unit -> 'payments' -> 'captures', '[]')
+    ) AS capture
+    WHERE card.payment_service = %(paypal)s
+        AND capture -> 'amount' ->> 'value' ~ %(number)s
+
+    UNION ALL
+
+    SELECT
+        card.id,
+        (card.response ->> 'req_amount')::numeric,
+        COALESCE(card.response ->> 'req_currency', %(cybersource_currency)s)
+    FROM card
+    WHERE card.payment_service = %(cybersource)s
+        AND card.response ->> 'req_amount' ~ %(number)s
+
+    UNION ALL
+
+    SELECT
+        card.id,
+        (card.response ->> 'payment_amount')::numeric / 100,
+        'TRY'
+    FROM card
+    WHERE card.payment_service = %(paytr)s
+        AND card.response ->> 'payment_amount' ~ %(number)s
+),
+known_service_charges AS (
+    SELECT service_charges.id, currency.id AS currency_id, service_charges.amount
+    FROM service_charges
+    JOIN currency ON currency.code = service_charges.currency_code
+),
+charges AS (
+    SELECT
+        card.id,
+        card.completed_at,
+        card.payment_service,
+        charge.currency_id,
+        charge.amount
+    FROM known_service_charges charge
+    JOIN card ON card.id = charge.id
+
+    UNION ALL
+
+    SELECT
+        card.id,
+        card.completed_at,
+        card.payment_service,
+        card.currency_id,
+        card.amount - COALESCE(
+            card.from_balance_amount
+            * {from_balance_rate}
+            / {currency_rate},
+            0
+        )
+    FROM card
+    WHERE NOT EXISTS (
+        SELECT 1 FROM known_service_charges charge WHERE charge.id = card.id
+    )
+)
+SELECT
+    date_trunc(%(period)s, charges.completed_at AT TIME ZONE %(time_zone)s)::date,
+    charges.payment_service,
+    charges.currency_id,
+    COUNT(DISTINCT charges.id),
+    ROUND(SUM(charges.amount), 2),
+    ROUND(SUM(charges.amount * {charge_rate}), 2)
+FROM charges
+GROUP BY 1, 2, 3
+ORDER BY 1, 2, 3
+""".format(
+    service_filter="{service_filter}",
+    from_balance_rate=_RATE_SQL.format(
+        currency="card.from_balance_currency_id", at="card.completed_at"
+    ),
+    currency_rate=_RATE_SQL.format(currency="card.currency_id", at="card.completed_at"),
+    charge_rate=_RATE_SQL.format(
+        currency="charges.currency_id", at="charges.completed_at"
+    ),
+)
+
+
+def iter_income(start, end, period="day", payment_service=None, chunk_size=2000):
+    """
+    Yields `IncomeRow`s of card payments completed in [start, end),
+    grouped by period (day, week, month or year), payment service
+    and currency the money was charged in.
+
+    Rows are streamed from the database using server-side cursor.
+    """
+    if period not in PERIODS:
+        raise ValueError("Unknown period %r, must be one of %s" % (period, PERIODS))
+
+    params = {
+        "type": Transaction.CARD,
+        "start": start,
+        "end": end,
+        "period": period,
+        "time_zone": settings.TIME_ZONE,
+        "number": _NUMBER_PATTERN,
+        "paypal": Transaction.PAYPAL_SERVICE,
+        "cybersource": Transaction.CYBERSOURCE_SERVICE,
+        "paytr": Transaction.PAYTR_SERVICE,
+        "paypal_currency": settings.PAYPAL_CURRENCY_CODE,
+        "cybersource_currency": settings.CYBERSOURCE_CURRENCY_CODE,
+        "service": payment_service,
+    }
+    sql = INCOME_SQL.format(
+        service_filter="AND t.payment_service = %(service)s" if payment_service else ""
+    )
+
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+
+            for row in rows:
+                yield IncomeRow(*row)
+
+
+def get_day_start(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+@db_transaction.atomic
+def roll_up_income(start_date, end_date=None):
+    """
+    Recomputes daily income summaries of dates from start_date
+    to end_date (inclusive). Returns number of summaries.
+    """
+    end_date = end_date or start_date
+
+    summaries = [
+        IncomeSummary(
+            date=row.period,
+            payment_service=row.payment_service,
+            currency_id=row.currency_id,
+            transactions_count=row.transactions_count,
+            amount=row.amount,
+            base_amount=row.base_amount,
+        )
+        for row in iter_income(
+            get_day_start(start_date),
+            get_day_start(end_date + datetime.timedelta(days=1)),
+        )
+    ]
+
+    IncomeSummary.objects.filter(date__gte=start_date, date__lte=end_date).delete()
+    IncomeSummary.objects.bulk_create(summaries)
+
+    return len(summaries)
+
+
+def get_income_report(start_date, end_date, period="day", payment_service=None):
+    """
+    Returns income per period, payment service and currency between
+    start_date and end_date (inclusive), read from daily summaries.
+    """
+    if period not in PERIODS:
+        raise ValueError("Unknown period %r, must be one of %s" % (period, PERIODS))
+
+    summaries = IncomeSummary.objects.filter(date__gte=start_date, date__lte=end_date)
+
+    if payment_service:
+        summaries = summaries.filter(payment_service=payment_service)
+
+    return [
+        IncomeRow(
+            period=summary["period"],
+            payment_service=summary["payment_service"],
+            currency_id=summary["currency_id"],
+            transactions_count=summary["transactions_count"],
+            amount=summary["amount"] or Decimal("0"),
+            base_amount=summary["base_amount"] or Decimal("0"),
+        )
+        for summary in summaries.annotate(period=Trunc("date", period))
+        .values("period", "payment_service", "currency_id")
+        .annotate(
+            transactions_count=Sum("transactions_count"),
+            amount=Sum("amount"),
+            base_amount=Sum("base_amount"),
+        )
+        .order_by("period", "payment_service", "currency_id")
+    ]
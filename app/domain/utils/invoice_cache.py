@@ -0,0 +1,128 @@
+"""
+Snapshot cache of serialized invoices.
+
+Customers refresh invoice pages repeatedly during checkout, and building
+an invoice loads services, packages, discounts and transactions and
+converts every line. Serialized invoices are stored in the cache under a
+key derived from:
+
+- field values of the invoiced instances (covers `updated_at`, prices
+  and `is_paid`, even when they are changed using `.update()`),
+- version of every instance, bumped when its discounts, transactions,
+  services, packages or shipments change (see `fulfillment.signals`),
+- global version, bumped when currency rates or service prices change,
+- active balance of the user and current language.
+
+So a stale snapshot is never looked up again, and it expires by itself.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.utils import translation
+
+INVOICE_SNAPSHOT_TIMEOUT = 10 * 60  # seconds
+INVOICE_SNAPSHOT_KEY = "invoice_snapshot:%s"
+INVOICE_VERSION_KEY = "invoice_version:%s:%s"
+INVOICE_GLOBAL_VERSION_KEY = "invoice_version:global"
+
+
+def _get_instance_state(instance):
+    return tuple(
+        field.value_from_object(instance) for field in instance._meta.concrete_fields
+    )
+
+
+def get_invoice_snapshot_key(kind, balance, instances):
+    version_keys = [INVOICE_GLOBAL_VERSION_KEY] + [
+        INVOICE_VERSION_KEY % (instance._meta.label_lower, instance.pk)
+        for instance in instances
+    ]
+    versions = cache.get_many(version_keys)
+
+    parts = [
+        kind,
+        translation.get_language(),
+        balance and (balance.currency_id, balance.amount),
+        [versions.get(key, 0) for key in version_keys],
+        [
+            (instance._meta.label_lower, _get_instance_state(instance))
+            for instance in instances
+        ],
+    ]
+
+    return INVOICE_SNAPSHOT_KEY % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def get_cached_invoice(kind, balance, instances, build):
+    """
+    Returns serialized invoice of the instances from the cache, or builds
+    it by calling `build` and caches it. Empty invoices are not cached.
+
+    `kind` tells apart different invoices of the same instances
+    (single, merged, multiple), `balance` is user's active balance.
+    """
+    instances = [instance for instance in instances if instance is not None]
+    key = get_invoice_snapshot_key(kind, balance, instances)
+    invoice = cache.get(key)
+
+    if invoice is None:
+        invoice = build()
+
+        if invoice is not None:
+            cache.set(key, invoice, INVOICE_SNAPSHOT_TIMEOUT)
+
+    return invoice
+
+
+def _incr_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:  # key does not exist
+        cache.set(key, 1, None)
+
+
+def _invalidate(key):
+    db_transaction.on_commit(lambda: _incr_version(key))
+
+
+def invalidate_invoice(model_label, pk):
+    """
+    Invalidates cached invoices of the instance after commit.
+    `model_label` is lowercased, like "fulfillment.shipment".
+    """
+    if pk:
+        _invalidate(INVOICE_VERSION_KEY % (model_label, pk))
+
+
+def invalidate_related_object_invoice(obj):
+    """
+    Same as invalidate_invoice, but for related object of `obj`
+    (discount, transaction), without fetching it.
+    """
+    from django.contrib.contenttypes.models import ContentType
+
+    if obj.object_type_id:
+        content_type = ContentType.objects.get_for_id(obj.object_type_id)
+        invalidate_invoice(
+            "%s.%s" % (content_type.app_label, content_type.model), obj.object_id
+        )
+
+
+def invalidate_related_object_invoices(objs):
+    """
+    Same as invalidate_related_object_invoice, for objects changed in bulk
+    (`.update()`, `bulk_update`), which don't send signals.
+    """
+    seen = set()
+
+    for obj in objs:
+        key = (obj.object_type_id, obj.object_id)
+
+        if key not in seen:
+            seen.add(key)
+            invalidate_related_object_invoice(obj)
+
+
+def invalidate_all_invoices():
+    _invalidate(INVOICE_GLOBAL_VERSION_KEY)
@@ -0,0 +1,132 @@
+"""
+Monthly spendings of recipients.
+
+Customers are warned when declared prices of shipments of a recipient
+(id_pin) in the current month approach the customs limit. Spendings of
+many recipients are computed in one query grouped by recipient and
+currency, and every currency group is converted once.
+
+Totals are cached per (user, id_pin, month) and invalidated when
+a shipment's declared price, declaration date or recipient changes,
+for both the previous and the new recipient and month. All totals
+are invalidated by bumping the version when currency rates change
+(see `fulfillment.signals`).
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+MONTHLY_SPENDINGS_TIMEOUT = 60 * 60  # seconds
+MONTHLY_SPENDINGS_KEY = "monthly_spendings:%s:%s:%s:%s"
+MONTHLY_SPENDINGS_VERSION_KEY = "monthly_spendings_version"
+
+# Shipment fields monthly spendings are computed from
+SPENDINGS_FIELDS = {
+    "declared_at",
+    "declared_price",
+    "declared_price_currency",
+    "recipient",
+    "user",
+    "deleted_at",
+}
+
+
+def get_monthly_spendings_key(user_id, id_pin, date=None, version=None):
+    date = date or timezone.now().date()
+
+    if version is None:
+        version = cache.get(MONTHLY_SPENDINGS_VERSION_KEY, 0)
+
+    return MONTHLY_SPENDINGS_KEY % (version, user_id, id_pin, date.strftime("%Y-%m"))
+
+
+def _query_monthly_spendings(recipient_keys, currency, date):
+    from fulfillment.models import Shipment
+
+    totals = {key: Decimal("0.00") for key in recipient_keys}
+    groups = (
+        Shipment.objects.filter(
+            user_id__in={user_id for user_id, _ in recipient_keys},
+            recipient__id_pin__in={id_pin for _, id_pin in recipient_keys},
+            declared_at__isnull=False,
+            declared_at__year=date.year,
+            declared_at__month=date.month,
+        )
+        .order_by()
+        .values("user_id", "recipient__id_pin", "declared_price_currency__rate")
+        .annotate(total=Sum("declared_price"))
+    )
+
+    for group in groups:
+        key = (group["user_id"], group["recipient__id_pin"])
+
+        if key in totals:
+            totals[key] += round(
+                group["total"] * group["declared_price_currency__rate"] / currency.rate,
+                2,
+            )
+
+    return totals
+
+
+def get_monthly_spendings_amounts(recipients, currency):
+    """
+    Returns current month spendings of the recipients in the currency,
+    as {(user_id, id_pin): amount}. Works with both recipients and
+    frozen recipients.
+    """
+    date = timezone.now().date()
+    version = cache.get(MONTHLY_SPENDINGS_VERSION_KEY, 0)
+    cache_keys = {
+        (recipient.user_id, recipient.id_pin): get_monthly_spendings_key(
+            recipient.user_id, recipient.id_pin, date, version
+        )
+        for recipient in recipients
+    }
+    cached = cache.get_many(cache_keys.values())
+
+    amounts = {}
+    for recipient_key, cache_key in cache_keys.items():
+        currency_id, amount = cached.get(cache_key, (None, None))
+
+        if currency_id == currency.id:
+            amounts[recipient_key] = amount
+
+    missing = [key for key in cache_keys if key not in amounts]
+
+    if missing:
+        queried = _query_monthly_spendings(missing, currency, date)
+        cache.set_many(
+            {cache_keys[key]: (currency.id, amount) for key, amount in queried.items()},
+            MONTHLY_SPENDINGS_TIMEOUT,
+        )
+        amounts.update(queried)
+
+    return amounts
+
+
+def invalidate_monthly_spendings(user_id, id_pin, declared_at=None):
+    """
+    Invalidates spendings of the recipient in the month of `declared_at`
+    (current month by default) after commit.
+    """
+    if user_id and id_pin:
+        key = get_monthly_spendings_key(
+            user_id, id_pin, declared_at and declared_at.date()
+        )
+        db_transaction.on_commit(lambda: cache.delete(key))
+
+
+def _incr_version():
+    try:
+        cache.incr(MONTHLY_SPENDINGS_VERSION_KEY)
+    except ValueError:  # key does not exist
+        cache.set(MONTHLY_SPENDINGS_VERSION_KEY, 1, None)
+
+
+def invalidate_all_monthly_spendings():
+    """Invalidates spendings of all recipients after commit."""
+    db_transaction.on_commit(_incr_version)
@@ -0,0 +1,134 @@
+"""
+Payment callback pipeline.
+
+Payment service views only verify the callback (signature, hash),
+store it with `ingest_payment_callback` and respond. Payments are
+completed by `process_payment_callback` in the payments celery queue.
+
+- Every callback is stored once per idempotency key, so retries of the
+  same callback by the payment service are not processed again.
+- Callbacks are processed with the transaction row locked, so callbacks
+  of the same transaction with different keys (e.g. Cybersource
+  notification and the same response posted by our front application)
+  never complete it twice.
+- Callbacks whose task was lost are picked up periodically by
+  `process_pending_payment_callbacks`.
+"""
+import datetime
+
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from domain.exceptions.payment import PaymentError
+from fulfillment.models import PaymentCallback, Transaction
+
+PENDING_CALLBACK_DELAY = datetime.timedelta(minutes=5)
+MAX_CALLBACK_ATTEMPTS = 5
+
+
+def ingest_payment_callback(payment_service, key, payload, transaction=None):
+    """
+    Stores the callback and schedules its processing after commit.
+    Returns (callback, created), callback is not scheduled again
+    when it was already received.
+    """
+    callback, created = PaymentCallback.objects.get_or_create(
+        idempotency_key="%s:%s" % (payment_service, key),
+        defaults={
+            "payment_service": payment_service,
+            "transaction": transaction,
+            "payload": payload,
+        },
+    )
+
+    if created:
+        _schedule(callback.id)
+
+    return callback, created
+
+
+def _schedule(callback_id):
+    from fulfillment.tasks import process_payment_callback_task
+
+    db_transaction.on_commit(lambda: process_payment_callback_task.delay(callback_id))
+
+
+def _complete(callback, transaction):
+    if callback.payment_service == Transaction.PAYTR_SERVICE:
+        transaction.payment_service_response_json = callback.payload
+        transaction.payment_service_responsed_at = callback.created_at
+        transaction.save(
+            update_fields=[
+                "payment_service_response_json",
+                "payment_service_responsed_at",
+            ]
+        )
+
+        if callback.payload.get("status") != "success":
+            return PaymentCallback.DECLINED
+
+    from domain.services import complete_payments
+
+    complete_payments([transaction], unmake_partial=False)
+    return PaymentCallback.COMPLETED
+
+
+@db_transaction.atomic
+def process_payment_callback(callback_id):
+    """
+    Completes payment of the callback's transaction. Callbacks that are
+    already processed and transactions that are already completed
+    are skipped. Returns the callback.
+    """
+    callback = (
+        PaymentCallback.objects.select_for_update()
+        .filter(id=callback_id, status=PaymentCallback.RECEIVED)
+        .first()
+    )
+
+    if callback is None:
+        return None
+
+    transaction = (
+        Transaction.objects.select_for_update()
+        .filter(id=callback.transaction_id)
+        .first()
+    )
+    callback.attempts += 1
+
+    if transaction is None:
+        callback.status = PaymentCallback.FAILED
+        callback.error = "Transaction not found"
+    elif transaction.completed:
+        callback.status = PaymentCallback.COMPLETED
+    else:
+        try:
+            with db_transaction.atomic():
+                callback.status = _complete(callback, transaction)
+        except PaymentError as err:
+            callback.status = PaymentCallback.FAILED
+            callback.error = str(err)
+
+    callback.processed_at = timezone.now()
+    callback.save(update_fields=["status", "attempts", "error", "processed_at"])
+
+    return callback
+
+
+def process_pending_payment_callbacks():
+    """
+    Schedules callbacks that were not processed in time again
+    (e.g. their task was lost). Returns number of scheduled callbacks.
+    """
+    callback_ids = list(
+        PaymentCallback.objects.filter(
+            status=PaymentCallback.RECEIVED,
+            created_at__lt=timezone.now() - PENDING_CALLBACK_DELAY,
+            attempts__lt=MAX_CALLBACK_ATTEMPTS,
+        ).values_list("id", flat=True)
+    )
+
+    for callback_id in callback_ids:
+        _schedule(callback_id)
+
+    return len(callback_ids)
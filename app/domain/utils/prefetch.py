@@ -0,0 +1,121 @@
+"""
+Batched resolution of generic foreign keys.
+
+Accessing `related_object` of payments, notifications and tickets makes
+one query per row. `prefetch_generic_related_objects` groups the
+(object_type, object_id) pairs of the given instances, fetches every
+content type with one `in` query and attaches the results, so accessing
+`related_object` afterwards does not hit the database.
+
+Querysets used for each content type are tuned in `RELATED_OBJECT_QUERYSETS`
+for what `serialize_for_payment`, `serialize_for_notification` and
+`serialize_for_ticket` of that model read.
+"""
+from decimal import Decimal
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q, Sum, Count, Value, DecimalField
+from django.db.models.functions import Coalesce
+
+RELATED_OBJECT_QUERYSETS = {
+    "fulfillment.package": lambda queryset: queryset.select_related("shipment"),
+    "fulfillment.shipment": lambda queryset: queryset.annotate(
+        _total_weight=Coalesce(
+            Sum("package__weight", filter=Q(package__deleted_at__isnull=True)),
+            Value(Decimal("0")),
+            output_field=DecimalField(),
+        )
+    ),
+    "fulfillment.courierorder": lambda queryset: queryset.annotate(
+        shipments_count=Count("shipment", filter=Q(shipment__deleted_at__isnull=True))
+    ),
+    "fulfillment.transaction": lambda queryset: queryset.select_related("currency"),
+}
+
+
+def get_related_object_queryset(model):
+    queryset = model._base_manager.all()
+    tune = RELATED_OBJECT_QUERYSETS.get(model._meta.label_lower)
+    return tune(queryset) if tune else queryset
+
+
+def prefetch_generic_related_objects(
+    instances, field_name="related_object", nested=True
+):
+    """
+    Resolves generic foreign key `field_name` of all instances using one
+    query per content type. Instances that already have related object
+    cached are skipped.
+
+    When resolved objects have generic foreign key with the same name
+    (e.g. transaction of a notification), it is resolved too if `nested`.
+    """
+    instances = [instance for instance in instances if instance is not None]
+
+    if not instances:
+        return
+
+    field = instances[0]._meta.get_field(field_name)
+    ct_attname = instances[0]._meta.get_field(field.ct_field).get_attname()
+
+    ids_by_type = defaultdict(set)
+    pending = []
+
+    for instance in instances:
+        ct_id = getattr(instance, ct_attname)
+        object_id = getattr(instance, field.fk_field)
+
+        if not ct_id or object_id in (None, "") or field.is_cached(instance):
+            continue
+
+        ids_by_type[ct_id].add(object_id)
+        pending.append(instance)
+
+    objects = {}
+    models = {}
+    fetched_by_model = {}
+
+    for ct_id, ids in ids_by_type.items():
+        model = models[ct_id] = ContentType.objects.get_for_id(ct_id).model_class()
+        fetched = list(get_related_object_queryset(model).filter(pk__in=ids))
+        fetched_by_model[model] = fetched
+        objects.update(((ct_id, obj.pk), obj) for obj in fetched)
+
+    for instance in pending:
+        ct_id = getattr(instance, ct_attname)
+        object_id = models[ct_id]._meta.pk.to_python(getattr(instance, field.fk_field))
+        related_object = objects.get((ct_id, object_id))
+
+        if related_object is not None:
+            field.set_cached_value(instance, related_object)
+
+    if nested:
+        for model, fetched in fetched_by_model.items():
+            if any(f.name == field_name for f in model._meta.private_fields):
+                prefetch_generic_related_objects(fetched, field_name, nested=False)
+
+
+def prefetch_has_ticket(user, objects):
+    """
+    Computes `get_has_ticket` for all ticketable objects of the user
+    using one query.
+    """
+    from fulfillment.models import Ticket
+
+    objects = [obj for obj in objects if obj is not None]
+
+    if not objects:
+        return
+
+    identifiers = set(
+        Ticket.objects.filter(
+            user=user,
+            related_object_identifier__in=[str(obj.identifier) for obj in objects],
+        )
+        .exclude(status__codename__in=["closed", "deleted"])
+        .values_list("related_object_identifier", flat=True)
+    )
+
+    for obj in objects:
+        obj._has_ticket = str(obj.identifier) in identifiers
@@ -0,0 +1,174 @@
+"""
+Read-through cache of rendered responses of catalogue endpoints.
+
+Views declare models their responses are built from:
+
+    @cache_response(Warehouse, Country, City)
+    class WarehouseApiView(generics.ListAPIView):
+        ...
+
+Rendered responses of GET requests are stored in the cache under a key
+derived from host, path, query parameters, language, accepted media type
+and versions of the declared models. Saving or deleting an instance of
+a declared model bumps its version after commit, so stale responses are
+never looked up again and expire by themselves.
+
+Responses carry a strong ETag (hash of the content), requests with
+a matching If-None-Match header get 304 Not Modified.
+
+The cache is checked inside the view, after authentication, permission
+and throttling checks. Views whose responses depend on the user are
+cached only for anonymous users (`anonymous_only=True`).
+"""
+import functools
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models import signals
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import translation
+from django.utils.http import parse_etags
+from django.views import View
+
+RESPONSE_CACHE_TIMEOUT = 5 * 60  # seconds
+RESPONSE_CACHE_KEY = "response_cache:%s"
+RESPONSE_CACHE_VERSION_KEY = "response_cache_version:%s"
+
+
+def _incr_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:  # key does not exist
+        cache.set(key, 1, None)
+
+
+def invalidate_cached_responses(tag):
+    """
+    Invalidates cached responses built from the model after commit.
+    `tag` is lowercased model label, like "core.country".
+    """
+    key = RESPONSE_CACHE_VERSION_KEY % tag
+    db_transaction.on_commit(lambda: _incr_version(key))
+
+
+def _invalidate_model_responses(sender, **kwargs):
+    invalidate_cached_responses(sender._meta.label_lower)
+
+
+def _connect_invalidation(model):
+    dispatch_uid = "response_cache_%s_uid" % model._meta.label_lower
+    signals.post_save.connect(
+        _invalidate_model_responses, sender=model, dispatch_uid=dispatch_uid
+    )
+    signals.post_delete.connect(
+        _invalidate_model_responses, sender=model, dispatch_uid=dispatch_uid
+    )
+
+
+def get_response_cache_key(request, tags):
+    version_keys = [RESPONSE_CACHE_VERSION_KEY % tag for tag in tags]
+    versions = cache.get_many(version_keys)
+
+    parts = [
+        request.get_host(),
+        request.path,
+        sorted(request.GET.lists()),
+        translation.get_language(),
+        getattr(request, "accepted_media_type", None),
+        [versions.get(key, 0) for key in version_keys],
+    ]
+
+    return RESPONSE_CACHE_KEY % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _etag_matches(request, etag):
+    etags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+    return etag in etags or "*" in etags
+
+
+def _not_modified(etag, vary=None):
+    response = HttpResponseNotModified()
+    response["ETag"] = etag
+
+    if vary:
+        response["Vary"] = vary
+
+    return response
+
+
+def _get_cached_response(request, key):
+    cached = cache.get(key)
+
+    if cached is None:
+        return None
+
+    content, content_type, etag = cached
+
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+
+    response = HttpResponse(content, content_type=content_type)
+    response["ETag"] = etag
+    return response
+
+
+def _cache_after_render(request, key, timeout):
+    def callback(response):
+        if response.status_code != 200:
+            return None
+
+        etag = '"%s"' % hashlib.md5(response.content).hexdigest()
+        response["ETag"] = etag
+        cache.set(key, (response.content, response["Content-Type"], etag), timeout)
+
+        if _etag_matches(request, etag):
+            return _not_modified(etag, response.get("Vary"))
+
+        return None
+
+    return callback
+
+
+def cache_response(*models, timeout=RESPONSE_CACHE_TIMEOUT, anonymous_only=False):
+    """
+    Caches rendered GET responses of a DRF view until any of the `models`
+    changes or `timeout` passes. Decorates view classes (their `get`
+    handler) and function views below `@api_view`.
+    """
+    tags = sorted(model._meta.label_lower for model in models)
+
+    for model in models:
+        _connect_invalidation(model)
+
+    def decorator(view):
+        if isinstance(view, type):
+            view.get = decorator(view.get)
+            return view
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = args[1] if isinstance(args[0], View) else args[0]
+
+            if request.method not in ("GET", "HEAD") or (
+                anonymous_only and request.user.is_authenticated
+            ):
+                return view(*args, **kwargs)
+
+            key = get_response_cache_key(request, tags)
+            response = _get_cached_response(request, key)
+
+            if response is None:
+                response = view(*args, **kwargs)
+
+                # DRF responses are rendered after the view returns
+                if hasattr(response, "add_post_render_callback"):
+                    response.add_post_render_callback(
+                        _cache_after_render(request, key, timeout)
+                    )
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -21,6 +21,7 @@ from fulfillment import admin_filters as af
 from fulfillment.forms import AdminShipmentForm
 from fulfillment.utils import get_status_actions
 from fulfillment.admin_utils import SoftDeletionAdmin, TranslatedSoftDeletionAdmin
+from fulfillment.pagination import EstimatedCountPaginator
 from fulfillment import tasks as fulfillment_tasks
 from fulfillment.models import (
     Address,
@@ -77,6 +78,8 @@ from fulfillment.models import (
     PromoCode,
     PromoCodeBenefit,
     CustomsProductType,
+    IncomeSummary,
+    PaymentCallback,
 )
 
 
@@ -207,6 +210,53 @@ class TransactionAdmin(SoftDeletionAdmin):
     autocomplete_fields = ["currency", "parent", "user", "cashback_to"]
     list_filter = ["purpose", "type", "completed", "is_partial", "is_deleted"]
     ordering = ["-updated_at"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(IncomeSummary)
+class IncomeSummaryAdmin(admin.ModelAdmin):
+    list_display = [
+        "date",
+        "payment_service",
+        "currency",
+        "transactions_count",
+        "amount",
+        "base_amount",
+        "updated_at",
+    ]
+    list_filter = ["payment_service", "currency"]
+    date_hierarchy = "date"
+    ordering = ["-date"]
+
+    def has_add_permission(self, *args, **kwargs):
+        return False
+
+    def has_change_permission(self, *args, **kwargs):
+        return False
+
+
+@admin.register(PaymentCallback)
+class PaymentCallbackAdmin(admin.ModelAdmin):
+    list_display = [
+        "idempotency_key",
+        "payment_service",
+        "transaction",
+        "status",
+        "attempts",
+        "created_at",
+        "processed_at",
+    ]
+    list_filter = ["payment_service", "status"]
+    search_fields = ["idempotency_key", "transaction__invoice_number"]
+    raw_id_fields = ["transaction"]
+    date_hierarchy = "created_at"
+
+    def has_add_permission(self, *args, **kwargs):
+        return False
+
+    def has_change_permission(self, *args, **kwargs):
+        return False
 
 
 @admin.register(Status)
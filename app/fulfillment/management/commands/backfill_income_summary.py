@@ -0,0 +1,58 @@
+import datetime
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from domain.utils.income import roll_up_income
+from fulfillment.management.commands.calculate_income import parse_date
+from fulfillment.models import Transaction
+
+
+def iter_months(start, end):
+    """Yields (first date, last date) of each month between the dates."""
+    while start <= end:
+        next_month = (start.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+        yield start, min(next_month - datetime.timedelta(days=1), end)
+        start = next_month
+
+
+class Command(BaseCommand):
+    help = (
+        "Rolls up daily income summaries of past dates, month by month "
+        "(each month in its own transaction)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=parse_date,
+            help="Defaults to the date of the first card payment.",
+        )
+        parser.add_argument("--end", type=parse_date)
+
+    def handle(self, *args, **options):
+        start = options["start"]
+        end = options["end"] or timezone.localdate()
+
+        if not start:
+            first_completed_at = (
+                Transaction.objects.filter(
+                    type=Transaction.CARD, completed=True, completed_at__isnull=False
+                )
+                .order_by("completed_at")
+                .values_list("completed_at", flat=True)
+                .first()
+            )
+
+            if first_completed_at is None:
+                self.stdout.write("No card payments to roll up")
+                return
+
+            start = timezone.localtime(first_completed_at).date()
+
+        for month_start, month_end in iter_months(start, end):
+            count = roll_up_income(month_start, month_end)
+            self.stdout.write(
+                "Rolled up %s daily summaries of %s - %s"
+                % (count, month_start, month_end)
+            )
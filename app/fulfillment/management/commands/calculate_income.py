@@ -1,34 +1,89 @@
+import datetime
 from decimal import Decimal
 
 from django.core.management import CommandError, BaseCommand
+from django.utils import timezone
 
 from core.converter import Converter
-from fulfillment.models import Transaction
+from core.models import Currency
+from domain.utils.income import (
+    PERIODS,
+    iter_income,
+    roll_up_income,
+    get_income_report,
+    get_day_start,
+)
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError("Invalid date %r, must be YYYY-MM-DD" % value)
 
 
 class Command(BaseCommand):
-    def get_transactions(self):
-        return Transaction.objects.filter(
-            type=Transaction.CARD, completed=True, is_deleted=False
+    help = "Prints income from card payments between two dates (inclusive)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=parse_date, required=True)
+        parser.add_argument("--end", type=parse_date)
+        parser.add_argument("--period", choices=PERIODS, default="month")
+        parser.add_argument("--service", dest="payment_service")
+        parser.add_argument(
+            "--roll-up",
+            action="store_true",
+            help="Recompute daily summaries of the date range before reporting.",
+        )
+        parser.add_argument(
+            "--live",
+            action="store_true",
+            help="Compute from transactions instead of daily summaries.",
         )
 
     def handle(self, *args, **options):
-        transactions = self.get_transactions()
-        total = Decimal("0")
-        for transaction in transactions:
-            print(transaction.invoice_number, transaction)
-            try:
-                total += transaction.get_payment_service_transaction_amount()
-            except Exception:
-                total += Converter.convert(
-                    transaction.amount
-                    - Converter.convert(
-                        transaction.from_balance_amount,
-                        transaction.from_balance_currency.code,
-                        transaction.currency.code,
-                    ),
-                    transaction.currency.code,
-                    "USD",
+        start = options["start"]
+        end = options["end"] or timezone.localdate()
+
+        if options["roll_up"]:
+            count = roll_up_income(start, end)
+            self.stdout.write("Rolled up %s daily summaries" % count)
+
+        if options["live"]:
+            rows = iter_income(
+                get_day_start(start),
+                get_day_start(end + datetime.timedelta(days=1)),
+                period=options["period"],
+                payment_service=options["payment_service"],
+            )
+        else:
+            rows = get_income_report(
+                start,
+                end,
+                period=options["period"],
+                payment_service=options["payment_service"],
+            )
+
+        currency_codes = dict(Currency.objects.values_list("id", "code"))
+        base_currency = Currency.objects.filter(rate=1).first()
+        base_total = Decimal("0")
+
+        for row in rows:
+            self.stdout.write(
+                "%s\t%s\t%s\t%s\t%s"
+                % (
+                    row.period,
+                    row.payment_service or "-",
+                    row.transactions_count,
+                    row.amount,
+                    currency_codes[row.currency_id],
                 )
+            )
+            base_total += row.base_amount
 
-        print("Calculated total amount", total)
+        self.stdout.write("Total in base currency: %s" % base_total)
+        # Totals were reported in USD before daily summaries
+        self.stdout.write(
+            "Total in USD: %s"
+            % Converter.convert(base_total, base_currency.code, "USD")
+        )
@@ -1,7 +1,7 @@
 from django.core.management import CommandError, BaseCommand
-from django.db.models import F
 from django.db import transaction as dbt
 
+from domain.utils.balance import get_balance_resolver
 from fulfillment.models import Transaction
 
 
@@ -62,8 +62,9 @@ class Command(BaseCommand):
                         balance = user.active_balance
                         old = balance.amount
                         print("User's old balance is %s" % old)
-                        balance.amount = F("amount") + bad_cashback.amount
-                        balance.save()
+                        get_balance_resolver().change_amount(
+                            balance, bad_cashback.amount, bad_cashback
+                        )
                         balance.refresh_from_db()
                         new = balance.amount
                         print("User's new balance is %s" % new)
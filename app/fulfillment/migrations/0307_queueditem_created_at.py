@@ -0,0 +1,52 @@
+# Generated by Django 3.1.6 on 2026-10-19 05:12
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Items without shipments (customer service) are older than the monitor feed
+UNKNOWN_CREATED_AT = datetime.datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+def backfill_created_at(apps, schema_editor):
+    QueuedItem = apps.get_model("fulfillment", "QueuedItem")
+    Shipment = apps.get_model("fulfillment", "Shipment")
+
+    # Served items are deleted, remaining ones are dated by last update of
+    # their shipments, not by the time of migration
+    last_shipment_update = (
+        Shipment.objects.filter(queued_item=OuterRef("pk"))
+        .values("queued_item")
+        .annotate(last_update=Max("updated_at"))
+        .values("last_update")
+    )
+    QueuedItem.objects.update(
+        created_at=Coalesce(
+            Subquery(last_shipment_update),
+            models.Value(UNKNOWN_CREATED_AT, output_field=models.DateTimeField()),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fulfillment", "0306_auto_20210705_0954"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="queueditem",
+            name="created_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="queueditem",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
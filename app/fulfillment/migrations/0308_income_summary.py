@@ -0,0 +1,44 @@
+# Generated by Django 3.1.6 on 2026-10-19 06:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0052_currencyratelog_created_at_index'),
+        ('fulfillment', '0307_queueditem_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncomeSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('payment_service', models.CharField(blank=True, max_length=30, null=True)),
+                ('transactions_count', models.PositiveIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('base_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Income summaries',
+                'db_table': 'income_summary',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('completed', True), ('type', 'card')), fields=['completed_at'], name='transaction_card_income_idx'),
+        ),
+        migrations.AddField(
+            model_name='incomesummary',
+            name='currency',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.currency'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='incomesummary',
+            unique_together={('date', 'payment_service', 'currency')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.6 on 2026-10-19 06:08
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fulfillment', '0308_income_summary'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='courierorder',
+            managers=[
+            ],
+        ),
+    ]
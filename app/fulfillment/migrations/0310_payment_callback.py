@@ -0,0 +1,32 @@
+# Generated by Django 3.1.6 on 2026-10-19 06:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fulfillment', '0309_courierorder_discountable_manager'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentCallback',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=255, unique=True)),
+                ('payment_service', models.CharField(max_length=30)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('received', 'Received'), ('completed', 'Completed'), ('declined', 'Declined'), ('failed', 'Failed')], db_index=True, default='received', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_callbacks', related_query_name='payment_callback', to='fulfillment.transaction')),
+            ],
+            options={
+                'db_table': 'payment_callback',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.1.6 on 2026-10-19 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fulfillment', '0310_payment_callback'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(must_be_seen_on_web=True), fields=['user', 'is_seen', '-created_at', '-id'], name='notification_web_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='package',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_accepted', True), ('shipment__isnull', True)), fields=['current_warehouse', '-id'], name='package_dashboard_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(condition=models.Q(deleted_at__isnull=True), fields=['current_warehouse', '-id'], name='shipment_dashboard_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(is_deleted=False), fields=['user', 'completed', '-id'], name='transaction_payments_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['-updated_at', '-id'], name='transaction_updated_idx'),
+        ),
+    ]
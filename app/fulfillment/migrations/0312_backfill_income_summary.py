@@ -0,0 +1,18 @@
+# Generated by Django 3.1.6 on 2026-10-19 09:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Summaries are rolled up only from the time 0308 was applied. Summaries
+    of earlier dates are backfilled by `backfill_income_summary` command,
+    which rolls them up month by month instead of in one migration
+    transaction.
+    """
+
+    dependencies = [
+        ("fulfillment", "0311_keyset_pagination_indexes"),
+    ]
+
+    operations = []
@@ -56,6 +56,8 @@ from fulfillment.models.country_history import UserCountryLog
 from fulfillment.models.shop import Shop
 from fulfillment.models.discount import Discount
 from fulfillment.models.promo_code import PromoCode, PromoCodeBenefit
+from fulfillment.models.income import IncomeSummary
+from fulfillment.models.payment_callback import PaymentCallback
 
 # PHP admin related models
 from fulfillment.models.php import (
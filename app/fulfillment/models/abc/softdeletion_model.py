@@ -11,6 +11,9 @@ __all__ = [
     "CashbackableModelMixin",
     "DiscountableModelMixin",
     "SoftDeletionManager",
+    "DiscountableQueryset",
+    "DiscountableSoftDeletionQueryset",
+    "DiscountableSoftDeletionManager",
 ]
 
 
@@ -30,7 +33,22 @@ class SoftDeletionQueryset(models.QuerySet):
         return self.exclude(deleted_at=None)
 
 
+class DiscountableQueryset(models.QuerySet):
+    def with_discounted_total(self):
+        """
+        Attaches discounts of all fetched instances using one query,
+        so `discounted_total_price` does not query them per instance.
+        """
+        return self.prefetch_related(self.model.get_discounts_prefetch())
+
+
+class DiscountableSoftDeletionQueryset(SoftDeletionQueryset, DiscountableQueryset):
+    pass
+
+
 class SoftDeletionManager(models.Manager):
+    _queryset_class = SoftDeletionQueryset
+
     def __init__(self, *args, **kwargs):
         self.alive_only = kwargs.pop("alive_only", True)
         super().__init__(*args, **kwargs)
@@ -38,11 +56,16 @@ class SoftDeletionManager(models.Manager):
     def get_queryset(self):
         if self.alive_only:
             return (
-                SoftDeletionQueryset(self.model, using=self._db)
+                self._queryset_class(self.model, using=self._db)
                 .filter(deleted_at=None)
                 .all()
             )
-        return SoftDeletionQueryset(self.model, using=self._db).all()
+        return self._queryset_class(self.model, using=self._db).all()
+
+
+DiscountableSoftDeletionManager = SoftDeletionManager.from_queryset(
+    DiscountableSoftDeletionQueryset
+)
 
 
 class SoftDeletionModel(models.Model):
@@ -109,6 +132,16 @@ class DiscountableModelMixin:
     discounts_field_name = "discounts"
     prefetched_discounts_field_name = "prefetched_discounts"
 
+    @classmethod
+    def get_discounts_prefetch(cls):
+        from fulfillment.models.discount import Discount
+
+        return models.Prefetch(
+            cls.discounts_field_name,
+            queryset=Discount.objects.order_by("id"),
+            to_attr=cls.prefetched_discounts_field_name,
+        )
+
     def _get_discounts(self):
         from fulfillment.models.discount import Discount
 
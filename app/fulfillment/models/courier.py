@@ -12,6 +12,7 @@ from fulfillment.models.abc import (
     ArchivableModel,
     DiscountableModelMixin,
     CashbackableModelMixin,
+    DiscountableQueryset,
 )
 from fulfillment.models.status import Status
 
@@ -94,6 +95,8 @@ class CourierOrder(
         object_id_field="object_id",
     )
 
+    objects = DiscountableQueryset.as_manager()
+
     number = models.CharField(unique=True, max_length=20)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -217,11 +220,14 @@ class CourierOrder(
         return new_number
 
     def serialize_for_payment(self):
+        shipments_count = getattr(self, "shipments_count", None)
+        if shipments_count is None:
+            shipments_count = self.shipments.count()
+
         return {
             "identifier": self.identifier,
             "type": "courier",
-            "title": msg.COURIER_ORDER_PAYMENT_TITLE_FMT
-            % {"count": self.shipments.count()},
+            "title": msg.COURIER_ORDER_PAYMENT_TITLE_FMT % {"count": shipments_count},
             "weight": None,
             "is_oneclick": False,
         }
@@ -0,0 +1,34 @@
+from django.db import models
+
+
+class IncomeSummary(models.Model):
+    """
+    Daily roll-up of income from card payments, per payment service and
+    currency the money was charged in. See `domain.utils.income`.
+    """
+
+    date = models.DateField(db_index=True)
+    payment_service = models.CharField(max_length=30, null=True, blank=True)
+    currency = models.ForeignKey(
+        "core.Currency", on_delete=models.PROTECT, related_name="+"
+    )
+
+    transactions_count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Amount in base currency, converted using rate of the payment date
+    base_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "income_summary"
+        verbose_name_plural = "Income summaries"
+        unique_together = ["date", "payment_service", "currency"]
+
+    def __str__(self):
+        return "%s %s %s%s" % (
+            self.date,
+            self.payment_service,
+            self.amount,
+            self.currency.symbol,
+        )
@@ -87,6 +87,14 @@ class Notification(SoftDeletionModel):
 
     class Meta:
         db_table = "notification"
+        indexes = [
+            # Keyset pagination of customer notifications
+            models.Index(
+                fields=["user", "is_seen", "-created_at", "-id"],
+                name="notification_web_idx",
+                condition=models.Q(must_be_seen_on_web=True),
+            )
+        ]
 
     def __str__(self):
         return "Notification [%s type=%s]" % (self.user, self.type)
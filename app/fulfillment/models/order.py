@@ -18,6 +18,7 @@ from fulfillment.models.abc import (
     SoftDeletionModel,
     DiscountableModelMixin,
     CashbackableModelMixin,
+    DiscountableSoftDeletionManager,
 )
 from core.models import Country
 from core.converter import Converter
@@ -51,6 +52,9 @@ class Order(
         object_id_field="object_id",
     )
 
+    objects = DiscountableSoftDeletionManager()
+    all_objects = DiscountableSoftDeletionManager(alive_only=False)
+
     user = models.ForeignKey(
         "customer.User",
         on_delete=models.CASCADE,
@@ -118,6 +118,16 @@ class Package(SoftDeletionModel, TicketMixin, ArchivableModel, models.Model):
 
     class Meta:
         db_table = "package"
+        indexes = [
+            # Keyset pagination of warehouseman dashboard
+            models.Index(
+                fields=["current_warehouse", "-id"],
+                name="package_dashboard_idx",
+                condition=models.Q(
+                    is_accepted=True, shipment__isnull=True, deleted_at__isnull=True
+                ),
+            )
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["user_tracking_code"],
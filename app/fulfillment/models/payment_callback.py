@@ -0,0 +1,48 @@
+from django.db import models
+
+
+class PaymentCallback(models.Model):
+    """
+    Raw callback (notification) of a payment service, stored once per
+    idempotency key. Payments are completed from callbacks in background,
+    see `domain.utils.payment_callbacks`.
+    """
+
+    RECEIVED = "received"
+    COMPLETED = "completed"
+    DECLINED = "declined"
+    FAILED = "failed"
+
+    STATUSES = (
+        (RECEIVED, "Received"),
+        (COMPLETED, "Completed"),
+        (DECLINED, "Declined"),
+        (FAILED, "Failed"),
+    )
+
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    payment_service = models.CharField(max_length=30)
+    transaction = models.ForeignKey(
+        "fulfillment.Transaction",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="payment_callbacks",
+        related_query_name="payment_callback",
+    )
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=RECEIVED, db_index=True
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "payment_callback"
+
+    def __str__(self):
+        return "%s [%s]" % (self.idempotency_key, self.get_status_display())
@@ -90,6 +90,8 @@ class QueuedItem(models.Model):
         blank=True,
     )
 
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
     class Meta:
         db_table = "queued_item"
         unique_together = ["warehouse", "code"]
@@ -3,7 +3,8 @@ import random
 from decimal import Decimal
 
 from django.db import models, transaction
-from django.db.models import Sum, Prefetch
+from django.db.models import Sum, Prefetch, Exists, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils import timezone
 from django.utils.functional import cached_property
@@ -19,12 +20,47 @@ from fulfillment.models.abc import (
     SoftDeletionModel,
     DiscountableModelMixin,
     CashbackableModelMixin,
+    DiscountableSoftDeletionQueryset,
+    DiscountableSoftDeletionManager,
 )
 from fulfillment.models.ticket import TicketMixin
 from core.converter import Converter
 from core.models import Currency
 
 
+class ShipmentQueryset(DiscountableSoftDeletionQueryset):
+    def with_customer_flags(self):
+        """
+        Annotates what customer shipment lists read for each shipment
+        (total weight, whether packages are in a warehouse) and attaches
+        discounts, so listing does not query per shipment.
+        """
+        from fulfillment.models.package import Package
+
+        packages = Package.objects.filter(shipment=OuterRef("pk"))
+
+        return self.annotate(
+            _has_warehoused_packages=Exists(
+                packages.filter(current_warehouse__isnull=False)
+            ),
+            _total_weight=Coalesce(
+                Subquery(
+                    packages.filter(weight__isnull=False)
+                    .order_by()
+                    .values("shipment")
+                    .annotate(total=Sum("weight"))
+                    .values("total"),
+                    output_field=models.DecimalField(),
+                ),
+                Value(Decimal("0")),
+                output_field=models.DecimalField(),
+            ),
+        ).with_discounted_total()
+
+
+ShipmentManager = DiscountableSoftDeletionManager.from_queryset(ShipmentQueryset)
+
+
 class Shipment(
     SoftDeletionModel,
     ArchivableModel,
@@ -53,6 +89,9 @@ class Shipment(
         object_id_field="object_id",
     )
 
+    objects = ShipmentManager()
+    all_objects = ShipmentManager(alive_only=False)
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -236,6 +275,14 @@ class Shipment(
 
     class Meta:
         db_table = "shipment"
+        indexes = [
+            # Keyset pagination of warehouseman dashboard
+            models.Index(
+                fields=["current_warehouse", "-id"],
+                name="shipment_dashboard_idx",
+                condition=models.Q(deleted_at__isnull=True),
+            )
+        ]
 
     def __str__(self):
         return "%s [%s]" % (self.number, self.status_id and self.status.codename)
@@ -266,7 +313,14 @@ class Shipment(
         if self.deleted_at:  # already deleted
             return False
 
-        if self.packages.filter(current_warehouse__isnull=False).exists():
+        has_warehoused_packages = getattr(self, "_has_warehoused_packages", None)
+
+        if has_warehoused_packages is None:
+            has_warehoused_packages = self.packages.filter(
+                current_warehouse__isnull=False
+            ).exists()
+
+        if has_warehoused_packages:
             return False
 
         return self.status.codename in [
@@ -373,11 +427,13 @@ class Shipment(
 
     @property
     def customs_product_price_currency(self) -> Currency:
-        return Currency.objects.get(code="USD")
+        from domain.utils.identity_map import get_identity_map
+
+        return get_identity_map().get(Currency, code="USD")
 
     @property
     def customs_product_price_currency_id(self) -> int:
-        return Currency.objects.filter(code="USD").values("id").first()["id"]
+        return self.customs_product_price_currency.id
 
     @property
     def customs_declared_items(self) -> str:
@@ -425,6 +481,7 @@ class Shipment(
             try_create_promo_code_cashbacks,
             update_or_create_transaction_for_shipment,
         )
+        from domain.utils.identity_map import get_identity_map
 
         if not self.number or getattr(self, "_regen_number", False):
             self.number = self._generate_new_shipment_number(source_country_code)
@@ -435,7 +492,7 @@ class Shipment(
             )
 
         if not self.declared_price_currency_id:
-            self.declared_price_currency = Currency.objects.get(code="USD")
+            self.declared_price_currency = get_identity_map().get(Currency, code="USD")
 
         must_recalculate = getattr(self, "_must_recalculate", False)
 
@@ -488,12 +545,19 @@ class Shipment(
             and self.source_warehouse_id
             and self.destination_warehouse_id
             and self.total_weight
-            and self.packages.exists()
+            and self.has_packages
             and self.status_id
             and self.status.codename in ["tobeshipped", "processing", "problematic"]
             and not getattr(self, "_skip_commiting", False)
         )
 
+    @property
+    def has_packages(self):
+        try:
+            return self._has_packages
+        except AttributeError:
+            return self.packages.exists()
+
     def generate_declared_items_title(self):
         if self.has_customs_product_price:  # then it has items description too
             return self.customs_declared_items
@@ -16,6 +16,10 @@ from fulfillment.models.status import Status
 
 class TicketMixin:
     def get_has_ticket(self):
+        # Computed for whole page by domain.utils.prefetch.prefetch_has_ticket
+        if hasattr(self, "_has_ticket"):
+            return self._has_ticket
+
         return (
             self.user.tickets.filter(
                 related_object_identifier=self.identifier,
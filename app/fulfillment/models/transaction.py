@@ -166,6 +166,21 @@ class Transaction(SoftDeletionModel, TicketMixin, ArchivableModel):
 
     class Meta:
         db_table = "transaction"
+        indexes = [
+            models.Index(
+                fields=["completed_at"],
+                name="transaction_card_income_idx",
+                condition=models.Q(type="card", completed=True),
+            ),
+            # Keyset pagination of customer payments
+            models.Index(
+                fields=["user", "completed", "-id"],
+                name="transaction_payments_idx",
+                condition=models.Q(is_deleted=False),
+            ),
+            # Admin list
+            models.Index(fields=["-updated_at", "-id"], name="transaction_updated_idx"),
+        ]
 
     def __str__(self):
         return "%s %s [user=%s purpose=%s type=%s]" % (
@@ -354,9 +369,9 @@ class Transaction(SoftDeletionModel, TicketMixin, ArchivableModel):
     def discounted_amount(self):
         amount = self.amount
 
-        # Fetch discounts from related model
+        # Fetch discounts from related model (or use prefetched ones)
         if self.related_object and hasattr(self.related_object, "discounts"):
-            discounts = self.related_object.discounts.all()
+            discounts = self.related_object._get_discounts()
 
             for discount in discounts:
                 amount -= amount * discount.percentage / 100
@@ -1,4 +1,17 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.paginator import Paginator
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, OrderBy, Q
+from django.utils.functional import cached_property
+from django.utils.translation import ugettext_lazy as _
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class ShoppingAssistantPagination(pagination.PageNumberPagination):
@@ -7,3 +20,213 @@ class ShoppingAssistantPagination(pagination.PageNumberPagination):
 
 class DynamicPagination(pagination.PageNumberPagination):
     page_size_query_param = "limit"
+
+
+def get_estimated_count(queryset):
+    """
+    Returns number of rows of the queryset estimated by the query planner,
+    without scanning them.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) %s" % sql, params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator of admin lists of big tables, counts rows exactly only
+    when there are not many of them.
+    """
+
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        estimated_count = get_estimated_count(self.object_list)
+
+        if estimated_count < self.exact_count_limit:
+            return super().count
+
+        return estimated_count
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Keyset (cursor) pagination in the order of the queryset.
+
+    Pages are fetched with "sort keys beyond keys of the last row seen"
+    condition instead of OFFSET, and rows are not counted, so deep pages
+    are as fast as the first one when an index matches filters and
+    ordering of the queryset. Primary key is appended to the ordering
+    to break ties. Ordering must be by not null fields of the model.
+
+    Cursors in `next` and `previous` links are opaque. Page size is set
+    by `limit` param like in DynamicPagination. Estimated count is
+    returned only when `count` param is passed.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = None
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = _("Invalid cursor")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.count = None
+
+        if self.count_query_param in request.query_params:
+            self.count = get_estimated_count(queryset)
+
+        is_reversed, keys = self.decode_cursor(request)
+
+        if keys is not None:
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(keys, is_reversed))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        queryset = queryset.order_by(
+            *[
+                F(name).asc() if descending == is_reversed else F(name).desc()
+                for name, descending in self.ordering
+            ]
+        )
+        page = list(queryset[: self.page_size + 1])
+        has_more = len(page) > self.page_size
+        page = page[: self.page_size]
+
+        if is_reversed:
+            page.reverse()
+            self.has_next, self.has_previous = keys is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, keys is not None
+
+        self.page = page
+        return page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        if self.max_page_size:
+            return min(page_size, self.max_page_size)
+
+        return page_size
+
+    def get_ordering(self, queryset):
+        """
+        Returns [(attname, descending)] of the queryset ordering ending
+        with primary key.
+        """
+        opts = queryset.model._meta
+        query = queryset.query
+        order_by = query.order_by or (opts.ordering if query.default_ordering else [])
+        ordering = []
+
+        for field in order_by:
+            if isinstance(field, OrderBy) and isinstance(field.expression, F):
+                name, descending = field.expression.name, field.descending
+            elif isinstance(field, str):
+                name, descending = field.lstrip("-"), field.startswith("-")
+            else:
+                raise TypeError("Can't paginate queryset ordered by %s" % field)
+
+            model_field = opts.pk if name == "pk" else opts.get_field(name)
+            ordering.append((model_field.attname, descending))
+
+            if model_field.primary_key:
+                return ordering
+
+        return ordering + [(opts.pk.attname, bool(ordering and ordering[-1][1]))]
+
+    def get_keyset_filter(self, keys, is_reversed):
+        """
+        Returns condition of rows after (or before) the row with `keys`,
+        like (a, b, c) > (1, 2, 3) with mixed directions.
+        """
+        keyset_filter = Q()
+        equal = Q()
+
+        for (name, descending), key in zip(self.ordering, keys):
+            lookup = "lt" if descending != is_reversed else "gt"
+            keyset_filter |= equal & Q(**{"%s__%s" % (name, lookup): key})
+            equal &= Q(**{name: key})
+
+        return keyset_filter
+
+    def encode_cursor(self, instance, is_reversed):
+        keys = [getattr(instance, name) for name, descending in self.ordering]
+        # Dates are kept with microseconds
+        cursor = json.dumps([is_reversed, keys], default=str)
+        return urlsafe_b64encode(cursor.encode()).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        if not cursor:
+            return False, None
+
+        try:
+            is_reversed, keys = json.loads(urlsafe_b64decode(cursor.encode()))
+            is_valid = len(keys) == len(self.ordering)
+        except (TypeError, ValueError):
+            is_valid = False
+
+        if not is_valid:
+            raise NotFound(self.invalid_cursor_message)
+
+        return bool(is_reversed), keys
+
+    def get_link(self, instance, is_reversed):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.count_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(instance, is_reversed)
+        )
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.get_link(self.page[-1], False)
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self.get_link(self.page[0], True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer", "nullable": True},
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
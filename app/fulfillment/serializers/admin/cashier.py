@@ -2,6 +2,7 @@ from rest_framework import serializers
 
 from domain.services import get_shipment_payment
 from core.serializers.admin import CurrencyCompactSerializer
+from fulfillment.serializers.common import PrefetchingListSerializer
 from fulfillment.serializers.admin.common import WarehouseDetailedSerializer
 from fulfillment.models import Shipment, Transaction, CashierProfile
 
@@ -37,9 +38,30 @@ class ShipmentSerializer(serializers.ModelSerializer):
             # "total_price_currency",
             "payment",
         ]
+        list_serializer_class = PrefetchingListSerializer
+
+    def prefetch(self, shipments):
+        payments = {}
+
+        for payment in (
+            Transaction.objects.filter(
+                purpose=Transaction.SHIPMENT_PAYMENT,
+                related_object_identifier__in=[str(s.identifier) for s in shipments],
+            )
+            .select_related("currency")
+            .order_by("-pk")
+        ):
+            # Same as get_shipment_payment, the first one wins
+            payments[payment.related_object_identifier] = payment
+
+        for shipment in shipments:
+            shipment._payment = payments.get(str(shipment.identifier))
 
     def get_payment(self, shipment):
-        payment = get_shipment_payment(shipment)
+        if hasattr(shipment, "_payment"):
+            payment = shipment._payment
+        else:
+            payment = get_shipment_payment(shipment)
         return PaymentSerializer(payment).data if payment else None
 
 
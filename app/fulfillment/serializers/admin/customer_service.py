@@ -5,6 +5,7 @@ from rest_framework import serializers
 
 from ontime import messages as msg
 from domain.services import promote_status
+from domain.utils.prefetch import prefetch_generic_related_objects
 from fulfillment.models import (
     CustomerServiceProfile,
     Ticket,
@@ -13,7 +14,7 @@ from fulfillment.models import (
     TicketAttachment,
     Status,
 )
-from fulfillment.serializers.common import StatusSerializer
+from fulfillment.serializers.common import StatusSerializer, PrefetchingListSerializer
 from fulfillment.serializers.customer import (
     TicketRelatedObjectField,
     TicketCategorySerializer,
@@ -73,6 +74,10 @@ class TicketReadSerializer(serializers.ModelSerializer):
             "status_last_update_time",
             "answered_by_admin",
         ]
+        list_serializer_class = PrefetchingListSerializer
+
+    def prefetch(self, tickets):
+        prefetch_generic_related_objects(tickets)
 
     def get_object(self, ticket: Ticket):
         if ticket.related_object:
@@ -1,7 +1,7 @@
 import json
 
 from django.db import transaction as db_transaction
-from django.db.models import Q, Prefetch
+from django.db.models import Q, F, Prefetch
 from django.utils.translation import ugettext_lazy as _
 from django.utils import timezone
 from rest_framework import serializers
@@ -9,6 +9,7 @@ from rest_framework import validators
 from drf_extra_fields.fields import Base64ImageField
 
 from ontime import messages as msg
+from ontime.serializers import ValuesSerializer, ExpressionField
 from domain.services import (
     map_package_properties_to_shipment,
     promote_status,
@@ -24,6 +25,7 @@ from core.serializers.admin import (
     CurrencyCompactSerializer,
     CountryCompactSerializer,
     CityCompactSerializer,
+    CountryCompactValuesSerializer,
 )
 from fulfillment.serializers.common import (
     StatusSerializer,
@@ -33,6 +35,7 @@ from fulfillment.serializers.common import (
 )
 from fulfillment.serializers.admin.common import WarehouseDetailedSerializer
 from customer.models import Recipient, Customer
+from core.models import City
 from fulfillment.models import (
     PackageAdditionalService,
     AdditionalService,
@@ -696,6 +699,20 @@ class TransportationCitySerializer(CityCompactSerializer):
         fields = CityCompactSerializer.Meta.fields + ["is_default"]
 
 
+class TransportationCityValuesSerializer(ValuesSerializer):
+    """
+    Values version of TransportationCitySerializer,
+    queryset must be annotated with `is_default`.
+    """
+
+    country = CountryCompactValuesSerializer()
+    is_default = ExpressionField(lambda ref: F(ref("is_default")))
+
+    class Meta:
+        model = City
+        fields = TransportationCitySerializer.Meta.fields
+
+
 class ProductWriteSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(required=False)
     photos = serializers.ListField(
@@ -1,8 +1,9 @@
-from django.db.models import Q, OuterRef, Exists
+from django.db.models import Q, OuterRef, Exists, Manager
 from django.utils.translation import ugettext as _
 from rest_framework import serializers
 
 from ontime import messages as msg
+from ontime.serializers import ValuesSerializer, ComputedField
 from core.models import Country, City, Currency
 from core.converter import Converter
 from core.serializers.client import (
@@ -29,6 +30,18 @@ from fulfillment.models import (
 )
 
 
+class PrefetchingListSerializer(serializers.ListSerializer):
+    """
+    Lets child serializer load what it needs for the whole page at once.
+    Child serializer must implement `prefetch(instances)`.
+    """
+
+    def to_representation(self, data):
+        instances = list(data.all() if isinstance(data, Manager) else data)
+        self.child.prefetch(instances)
+        return super().to_representation(instances)
+
+
 class WarehouseReadSerializer(serializers.ModelSerializer):
     class Meta:
         model = Warehouse
@@ -42,6 +55,18 @@ class WarehouseReadSerializer(serializers.ModelSerializer):
         ]
 
 
+def get_status_hex_color(extra):
+    return extra.get("color", "#00631b")
+
+
+def get_status_icon(extra):
+    return extra.get("icon", "")
+
+
+def is_default_status(type, codename):
+    return type == Status.ORDER_TYPE and codename in ["processing", "paid"]
+
+
 class StatusSerializer(serializers.ModelSerializer):
     hex_color = serializers.SerializerMethodField()
     icon = serializers.SerializerMethodField()
@@ -52,16 +77,25 @@ class StatusSerializer(serializers.ModelSerializer):
         fields = ["id", "display_name", "hex_color", "icon", "is_default"]
 
     def get_hex_color(self, status):
-        return status.extra.get("color", "#00631b")
+        return get_status_hex_color(status.extra)
 
     def get_icon(self, status):
-        return status.extra.get("icon", "")
+        return get_status_icon(status.extra)
 
     def get_is_default(self, status):
-        return status.type == Status.ORDER_TYPE and status.codename in [
-            "processing",
-            "paid",
-        ]
+        return is_default_status(status.type, status.codename)
+
+
+class StatusValuesSerializer(ValuesSerializer):
+    """Values version of StatusSerializer."""
+
+    hex_color = ComputedField(get_status_hex_color, "extra")
+    icon = ComputedField(get_status_icon, "extra")
+    is_default = ComputedField(is_default_status, "type", "codename")
+
+    class Meta:
+        model = Status
+        fields = StatusSerializer.Meta.fields
 
 
 class NextPrevStatusSerializer(StatusSerializer):
@@ -3,7 +3,7 @@ import json
 from typing import Union, Optional
 
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Q, prefetch_related_objects
 from django.contrib.auth import get_user_model
 from django.utils.translation import ugettext as _
 from django.utils import timezone
@@ -13,9 +13,11 @@ from rest_framework import serializers
 from rest_framework import validators
 
 from ontime import messages as msg
+from ontime.serializers import ValuesSerializer, ValuesField
 from domain.validators import validate_phone_number
 from domain.services import (
     calculate_monthly_spendings,
+    calculate_monthly_spendings_in_bulk,
     get_user_transactions,
     get_courier_order_related_shipment_transactions,
     create_shipment,
@@ -25,6 +27,7 @@ from domain.services import (
     promote_status,
 )
 from domain.exceptions.logic import DisabledCountryError
+from domain.utils.prefetch import prefetch_generic_related_objects, prefetch_has_ticket
 from customer.models import Recipient
 from customer.tasks import fetch_user_data_from_government_resource
 from core.utils.security import validate_input_file
@@ -32,12 +35,16 @@ from core.converter import Converter
 from core.models import Country, Currency, City
 from core.serializers.client import (
     CountrySerializer,
+    CountryValuesSerializer,
     CountryCompactSerializer,
     CurrencySerializer,
+    CurrencyValuesSerializer,
     CitySerializer,
 )
 from fulfillment.serializers.common import (
+    PrefetchingListSerializer,
     StatusSerializer,
+    StatusValuesSerializer,
     # NextPrevStatusSerializer,
     ProductTypeExtraCompactSerializer,
     ProductCategoryCompactSerializer,
@@ -83,7 +90,34 @@ User = get_user_model()
 #         fields = ["id", "title"]
 
 
-class RecipientCompactSerializer(serializers.ModelSerializer):
+class MonthlySpendingsMixin:
+    """
+    Calculates monthly spendings of all recipients of the list at once.
+    """
+
+    def prefetch(self, recipients):
+        spendings = calculate_monthly_spendings_in_bulk(recipients)
+
+        for recipient in recipients:
+            recipient._monthly_spendings = spendings[recipient]
+
+    def get_monthly_spendings(self, recipient):
+        if hasattr(recipient, "_monthly_spendings"):
+            monthly_spendings = recipient._monthly_spendings
+        else:
+            monthly_spendings = calculate_monthly_spendings(recipient)
+
+        if monthly_spendings:
+            return {
+                "amount": monthly_spendings.amount,
+                "currency": CurrencySerializer(monthly_spendings.currency).data,
+                "status": monthly_spendings.status,
+            }
+
+        return None
+
+
+class RecipientCompactSerializer(MonthlySpendingsMixin, serializers.ModelSerializer):
     monthly_spendings = serializers.SerializerMethodField()
     region = CourierRegionSerializer(read_only=True)
 
@@ -99,18 +133,7 @@ class RecipientCompactSerializer(serializers.ModelSerializer):
             "region",
             "monthly_spendings",
         ]
-
-    def get_monthly_spendings(self, recipient):
-        monthly_spendings = calculate_monthly_spendings(recipient)
-
-        if monthly_spendings:
-            return {
-                "amount": monthly_spendings.amount,
-                "currency": CurrencySerializer(monthly_spendings.currency).data,
-                "status": monthly_spendings.status,
-            }
-
-        return None
+        list_serializer_class = PrefetchingListSerializer
 
 
 class RecipientVeryCompactSerializer(serializers.ModelSerializer):
@@ -435,7 +458,7 @@ class PackageCompactSerializer(serializers.ModelSerializer):
     def get_products(self, package):
         product_types = []
 
-        for product in package.products.select_related():
+        for product in package.products.all():
             product_types.append(product.normalized_description)
 
         return product_types
@@ -1063,7 +1086,7 @@ class ShipmentWriteSerializer(serializers.ModelSerializer):
         return ShipmentReadSerializer(instance).data
 
 
-class RecipientReadSerializer(serializers.ModelSerializer):
+class RecipientReadSerializer(MonthlySpendingsMixin, serializers.ModelSerializer):
     city = CitySerializer()
     region = CourierRegionSerializer()
     country = CountrySerializer(source="city.country")
@@ -1091,18 +1114,7 @@ class RecipientReadSerializer(serializers.ModelSerializer):
             "monthly_spendings",
             "is_billed_recipient",
         ]
-
-    def get_monthly_spendings(self, recipient):
-        monthly_spendings = calculate_monthly_spendings(recipient)
-
-        if monthly_spendings:
-            return {
-                "amount": monthly_spendings.amount,
-                "currency": CurrencySerializer(monthly_spendings.currency).data,
-                "status": monthly_spendings.status,
-            }
-
-        return None
+        list_serializer_class = PrefetchingListSerializer
 
     def get_is_billed_recipient(self, recipient):
         is_billed_recipient = getattr(recipient, "_is_billed_recipient", None)
@@ -1300,6 +1312,14 @@ class PaymentSerializer(serializers.ModelSerializer):
             "is_archived",
             "actions",
         ]
+        list_serializer_class = PrefetchingListSerializer
+
+    def prefetch(self, transactions):
+        merged = [t for t in transactions if t.purpose == Transaction.MERGED]
+        prefetch_related_objects(merged, "children")
+        prefetch_generic_related_objects(
+            transactions + [child for t in merged for child in t.children.all()]
+        )
 
     def get_type(self, transaction):
         if transaction.is_partial and transaction.from_balance_amount:
@@ -1319,10 +1339,7 @@ class PaymentSerializer(serializers.ModelSerializer):
                 transaction.currency.code,
             )
 
-        elif (
-            transaction.object_type_id
-            and transaction.object_type.model == "courierorder"
-        ):
+        elif isinstance(transaction.related_object, CourierOrder):
             shipment_transactions = get_courier_order_related_shipment_transactions(
                 transaction.related_object
             )
@@ -1381,6 +1398,10 @@ class NotificationSerializer(serializers.ModelSerializer):
             "created_at",
             "object",
         ]
+        list_serializer_class = PrefetchingListSerializer
+
+    def prefetch(self, notifications):
+        prefetch_generic_related_objects(notifications)
 
     def get_object(self, notification):
         if notification.related_object:
@@ -1463,6 +1484,15 @@ class TicketReadSerializer(serializers.ModelSerializer):
             "attachments",
             "actions",
         ]
+        list_serializer_class = PrefetchingListSerializer
+
+    def prefetch(self, tickets):
+        prefetch_related_objects(tickets, "ticket_attachments")
+        prefetch_generic_related_objects(tickets)
+        if tickets:
+            prefetch_has_ticket(
+                tickets[0].user_id, [ticket.related_object for ticket in tickets]
+            )
 
     def get_object(self, ticket: Ticket):
         if ticket.related_object:
@@ -1470,7 +1500,9 @@ class TicketReadSerializer(serializers.ModelSerializer):
         return None
 
     def get_attachments(self, ticket: Ticket):
-        attachment_links = ticket.ticket_attachments.values_list("file", flat=True)
+        attachment_links = [
+            attachment.file.name for attachment in ticket.ticket_attachments.all()
+        ]
         request = self.context["request"]
 
         return [
@@ -1633,6 +1665,19 @@ class ShipmentCompactSerializer(serializers.ModelSerializer):
         ]
 
 
+class ShipmentCompactValuesSerializer(ValuesSerializer):
+    """Values version of ShipmentCompactSerializer."""
+
+    identifier = ValuesField("number")
+    status = StatusValuesSerializer()
+    source_country = CountryValuesSerializer()
+    total_price_currency = CurrencyValuesSerializer()
+
+    class Meta:
+        model = Shipment
+        fields = ShipmentCompactSerializer.Meta.fields
+
+
 class CourierOrderReadSerializer(serializers.ModelSerializer):
     actions = serializers.SerializerMethodField()
     status = StatusSerializer()
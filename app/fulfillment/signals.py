@@ -1,7 +1,30 @@
 from django.db.models import signals
 from django.dispatch import receiver
 
-from fulfillment.models import Shipment, Transaction, Order
+from core.models import Currency, Country
+from customer.models import FrozenRecipient, Role
+from domain.utils.identity_map import forget_loaded
+from domain.utils.invoice_cache import (
+    invalidate_invoice,
+    invalidate_related_object_invoice,
+    invalidate_all_invoices,
+)
+from domain.utils.monthly_spendings import (
+    SPENDINGS_FIELDS,
+    invalidate_monthly_spendings,
+    invalidate_all_monthly_spendings,
+)
+from fulfillment.models import (
+    Shipment,
+    Transaction,
+    Order,
+    Package,
+    Discount,
+    AdditionalService,
+    ShipmentAdditionalService,
+    PackageAdditionalService,
+    Warehouse,
+)
 
 
 @receiver(
@@ -29,3 +52,142 @@ def order_update_related_transactions(sender, instance, **kwargs):
         related_transaction.original_amount = order.total_price
         related_transaction.related_object_identifier = order.identifier
         related_transaction.save()
+
+
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=Discount,
+    dispatch_uid="discount_invalidate_invoice_uid",
+)
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=Transaction,
+    dispatch_uid="transaction_invalidate_invoice_uid",
+)
+def related_object_invalidate_invoice(sender, instance, **kwargs):
+    invalidate_related_object_invoice(instance)
+
+
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=ShipmentAdditionalService,
+    dispatch_uid="shipment_service_invalidate_invoice_uid",
+)
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=Package,
+    dispatch_uid="package_invalidate_invoice_uid",
+)
+def shipment_invalidate_invoice(sender, instance, **kwargs):
+    invalidate_invoice("fulfillment.shipment", instance.shipment_id)
+
+
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=PackageAdditionalService,
+    dispatch_uid="package_service_invalidate_invoice_uid",
+)
+def package_service_invalidate_invoice(sender, instance, **kwargs):
+    shipment_id = (
+        Package.all_objects.filter(id=instance.package_id)
+        .values_list("shipment_id", flat=True)
+        .first()
+    )
+    invalidate_invoice("fulfillment.shipment", shipment_id)
+
+
+@receiver(
+    signals.post_save, sender=Currency, dispatch_uid="currency_invalidate_invoices_uid"
+)
+@receiver(
+    signals.post_save,
+    sender=AdditionalService,
+    dispatch_uid="service_invalidate_invoices_uid",
+)
+def invalidate_invoices(sender, instance, **kwargs):
+    invalidate_all_invoices()
+
+
+def _is_spendings_change(update_fields):
+    return not update_fields or SPENDINGS_FIELDS.intersection(update_fields)
+
+
+@receiver(
+    signals.pre_save,
+    sender=Shipment,
+    dispatch_uid="shipment_remember_spendings_recipient_uid",
+)
+def shipment_remember_spendings_recipient(
+    sender, instance, update_fields=None, **kwargs
+):
+    if instance.pk and _is_spendings_change(update_fields):
+        # Spendings of the previous recipient and month change too
+        instance._previous_spendings_recipient = (
+            Shipment._base_manager.filter(pk=instance.pk)
+            .values_list("user_id", "recipient__id_pin", "declared_at")
+            .first()
+        )
+
+
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=Shipment,
+    dispatch_uid="shipment_invalidate_monthly_spendings_uid",
+)
+def shipment_invalidate_monthly_spendings(
+    sender, instance, update_fields=None, **kwargs
+):
+    if not _is_spendings_change(update_fields):
+        return
+
+    previous = instance.__dict__.pop("_previous_spendings_recipient", None)
+    if previous:
+        invalidate_monthly_spendings(*previous)
+
+    if not instance.recipient_id:
+        return
+
+    if Shipment.recipient.is_cached(instance):
+        id_pin = instance.recipient.id_pin
+    else:
+        id_pin = (
+            FrozenRecipient.objects.filter(id=instance.recipient_id)
+            .values_list("id_pin", flat=True)
+            .first()
+        )
+
+    invalidate_monthly_spendings(instance.user_id, id_pin, instance.declared_at)
+
+
+@receiver(
+    signals.post_save,
+    sender=Currency,
+    dispatch_uid="currency_invalidate_monthly_spendings_uid",
+)
+def currency_invalidate_monthly_spendings(sender, instance, **kwargs):
+    # Cached totals are converted using rates at the time of caching
+    invalidate_all_monthly_spendings()
+
+
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=Currency,
+    dispatch_uid="currency_forget_loaded_uid",
+)
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=Country,
+    dispatch_uid="country_forget_loaded_uid",
+)
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=Warehouse,
+    dispatch_uid="warehouse_forget_loaded_uid",
+)
+@receiver(
+    [signals.post_save, signals.post_delete],
+    sender=Role,
+    dispatch_uid="role_forget_loaded_uid",
+)
+def reference_forget_loaded(sender, instance, **kwargs):
+    forget_loaded(sender)
@@ -20,10 +20,10 @@ from poctgoyercin.exceptions import PoctGoyercinError
 from fulfillment.models import (
     Notification,
     Order,
-    Assignment,
     NotificationEvent,
     Shipment,
     OrderedProduct,
+    PaymentCallback,
 )
 
 
@@ -114,21 +114,13 @@ def send_notification(notification_id):
 
 @shared_task(autoretry_for=(Exception,))
 def assign_orders_to_operator(order_ids):
-    from domain.services import get_assistant_with_minimum_workload
+    from domain.services import assign_orders_to_assistants_in_batch
 
-    assignments = []
-
-    for order in Order.objects.filter(id__in=order_ids, as_assignment__isnull=True):
-        lazy_assistant = get_assistant_with_minimum_workload(order.source_country_id)
-        assignments.append(
-            Assignment(
-                assistant_profile=lazy_assistant,
-                order=order,
-            )
+    assign_orders_to_assistants_in_batch(
+        Order.objects.filter(id__in=order_ids, as_assignment__isnull=True).order_by(
+            "id"
         )
-
-    if assignments:
-        Assignment.objects.bulk_create(assignments)
+    )
 
 
 @shared_task
@@ -212,7 +204,8 @@ def mark_as_paid_task(ct_pk, instance_ids, admin_id=None):
         return
 
     ct_class = ct.model_class()
-    instances = ct_class.objects.filter(id__in=instance_ids)
+    # Related objects are used in log entries (str of instances)
+    instances = ct_class.objects.filter(id__in=instance_ids).select_related()
 
     make_objects_paid(instances, user_id=admin_id)
 
@@ -276,3 +269,35 @@ def depesh_to_customs(transportation_ids):
     ).select_related("box__transportation")
     client = CustomsClient()
     client.depesh_packages(shipments)
+
+
+@shared_task
+def roll_up_income_task(days=1):
+    """Recomputes income summaries of today and previous `days` days."""
+    from datetime import timedelta
+    from domain.utils.income import roll_up_income
+
+    today = timezone.localdate()
+    return roll_up_income(today - timedelta(days=days), today)
+
+
+@shared_task(queue=QUEUES.PAYMENTS, autoretry_for=(Exception,), retry_backoff=True)
+def process_payment_callback_task(callback_id):
+    from domain.utils.payment_callbacks import process_payment_callback
+
+    try:
+        callback = process_payment_callback(callback_id)
+    except Exception as err:
+        PaymentCallback.objects.filter(id=callback_id).update(
+            attempts=F("attempts") + 1, error=str(err)
+        )
+        raise
+
+    return callback and "%s: %s" % (callback, callback.error or "OK")
+
+
+@shared_task(queue=QUEUES.PAYMENTS)
+def process_pending_payment_callbacks_task():
+    from domain.utils.payment_callbacks import process_pending_payment_callbacks
+
+    return process_pending_payment_callbacks()
@@ -1,5 +1,4 @@
 from django.urls import path
-from django.views.decorators.cache import cache_page
 from fulfillment.views import common as views
 
 
@@ -7,27 +6,27 @@ urlpatterns = [
     path("warehouses/", views.WarehouseApiView.as_view(), name="warehouse-list"),
     path(
         "order-statuses/",
-        cache_page(5 * 60)(views.OrderStatusListApiView.as_view()),
+        views.OrderStatusListApiView.as_view(),
         name="order-status-list",
     ),
     path(
         "package-statuses/",
-        cache_page(5 * 60)(views.PackageStatusListApiView.as_view()),
+        views.PackageStatusListApiView.as_view(),
         name="package-status-list",
     ),
     path(
         "shipment-statuses/",
-        cache_page(5 * 60)(views.ShipmentStatusListApiView.as_view()),
+        views.ShipmentStatusListApiView.as_view(),
         name="shipment-status-list",
     ),
     path(
         "ticket-statuses/",
-        cache_page(5 * 60)(views.TicketStatusListApiView.as_view()),
+        views.TicketStatusListApiView.as_view(),
         name="ticket-status-list",
     ),
     path(
         "courier-order-statuses/",
-        cache_page(5 * 60)(views.CourierOrderListApiView.as_view()),
+        views.CourierOrderListApiView.as_view(),
         name="courier-order-status-list",
     ),
     path(
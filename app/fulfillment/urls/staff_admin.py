@@ -231,6 +231,11 @@ urlpatterns = [
     path(
         "monitor/items/", queue_views.MonitorApiView.as_view(), name="monitor-item-list"
     ),
+    path(
+        "events/ticket/",
+        queue_views.create_events_ticket_view,
+        name="staff-events-ticket",
+    ),
     path("queues/", queue_views.QueueListApiView.as_view(), name="queue-list"),
     path(
         "queues/<int:pk>/items/",
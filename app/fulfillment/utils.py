@@ -3,8 +3,7 @@ import functools
 from django.db import transaction
 from django.contrib import messages
 
-from domain.services import promote_status
-from domain.services import promote_status
+from domain.services import promote_status_bulk
 from fulfillment.models import Status
 
 
@@ -25,10 +24,20 @@ def get_status_actions(status_type):
             )
 
         with transaction.atomic():
-            for instance in instances:
-                promote_status(instance, to_status=status)
+            promoted, skipped = promote_status_bulk(instances, to_status=status)
 
-        modeladmin.message_user(request, "Updated selected items!", messages.SUCCESS)
+        if promoted:
+            modeladmin.message_user(
+                request, "Updated %s item(s)!" % len(promoted), messages.SUCCESS
+            )
+
+        if skipped:
+            modeladmin.message_user(
+                request,
+                "Status of %s can't be changed to %s!"
+                % (", ".join(str(instance) for instance in skipped), status),
+                messages.WARNING,
+            )
 
     for status in Status.objects.filter(type=status_type):
         __partial_action__ = functools.partial(__action__, status=status)
@@ -46,7 +46,7 @@ class TicketViewSet(viewsets.ModelViewSet):
         if user_id:
             queryset = queryset.filter(user_id=user_id)
 
-        return queryset.select_related("category", "user")
+        return queryset.select_related("category", "user", "status")
 
 
 class TicketCommentListCreateApiView(generics.ListCreateAPIView):
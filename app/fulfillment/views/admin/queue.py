@@ -19,7 +19,7 @@ from domain.services import (
     make_completed_callback,
     fetch_citizen_data_raw,
 )
-from domain.utils import QueueClient, QueueManager
+from domain.utils import QueueClient, QueueManager, MONITOR_CHANNELS
 from customer.models import Role
 from customer.permissions import (
     IsCustomerMonitor,
@@ -70,6 +70,13 @@ def get_monitor(auth_model):
     return getattr(auth_model, "as_monitor")
 
 
+def get_monitor_warehouse_id(monitor):
+    if monitor.warehouse_id:
+        return monitor.warehouse_id
+    queue = monitor.queues.first()
+    return queue and queue.warehouse_id
+
+
 def get_initial_shipment_queryset(monitor):
     if not monitor:
         return Shipment.objects.none()
@@ -155,6 +162,22 @@ def add_customer_to_service_queue_view(request):
     return Response({"queue_number": item.code})
 
 
+@api_view(["POST"])
+@permission_classes(
+    [
+        IsWarehouseman
+        | IsCashier
+        | IsCustomerService
+        | IsQueueMonitor
+        | IsOntimeAdminUser
+    ]
+)
+def create_events_ticket_view(request):
+    from ontime.events import create_ticket, TICKET_TTL
+
+    return Response({"ticket": create_ticket(request.user), "expires_in": TICKET_TTL})
+
+
 class QueueListApiView(generics.ListAPIView):
     permission_classes = [
         IsWarehouseman | IsOntimeAdminUser | IsCustomerService | IsCashier
@@ -240,19 +263,77 @@ def pay_for_shipment_view(request):
 
 
 class MonitorApiView(generics.ListAPIView):
+    """
+    Lists today's queued items of the monitor's warehouse.
+
+    Responds with `{last_event_id, reset, items}`, where `last_event_id` is
+    id of the last published monitor event (also sent in `X-Last-Event-Id`
+    header). Pass it back as `since` query param to receive
+    `{last_event_id, reset, events}` with only the events published after
+    it. If events are too old to be replayed, all items are returned again
+    with `reset` flag set.
+    """
+
     permission_classes = [IsQueueMonitor | IsOntimeAdminUser]
     pagination_class = None
     serializer_class = queue_serializers.MonitorQueuedItemSerializer
 
+    def list(self, request, *args, **kwargs):
+        monitor = get_monitor(request.user)
+        warehouse_id = monitor and get_monitor_warehouse_id(monitor)
+
+        if not warehouse_id:
+            items = self.get_serializer(self.get_queryset(), many=True).data
+            return Response({"last_event_id": None, "reset": False, "items": items})
+
+        client = QueueClient()
+        since = request.query_params.get("since")
+
+        if since:
+            events = client.read_events(
+                warehouse_id, since, channels=[MONITOR_CHANNELS.MAIN_MONITOR]
+            )
+
+            if events is not None:
+                return Response(
+                    {
+                        "last_event_id": events[-1]["id"] if events else since,
+                        "reset": False,
+                        "events": events,
+                    }
+                )
+
+        # Remember last event before querying items, so no change is missed.
+        # Client may receive some events twice, but they are idempotent.
+        last_event_id = client.get_last_event_id(warehouse_id)
+        items = self.get_serializer(self.get_queryset(), many=True).data
+
+        return Response(
+            {"last_event_id": last_event_id, "reset": bool(since), "items": items},
+            headers={"X-Last-Event-Id": last_event_id or ""},
+        )
+
     def get_queryset(self):
         monitor = get_monitor(self.request.user)
+        warehouse_id = monitor and get_monitor_warehouse_id(monitor)
+
+        if warehouse_id:
+            warehouse = Warehouse.objects.select_related("country").get(id=warehouse_id)
+            start_of_day = warehouse.country.local_datetime.replace(
+                hour=0, minute=0, second=0, microsecond=0
+            )
 
-        if monitor:
             # Exclude queued items with blank codes, because those items
-            # are for cashier (empty codes can appear only for warehouseman queue)
+            # are for cashier (empty codes can appear only for warehouseman queue).
+            # Served items are deleted (handover_queued_item,
+            # mark_queued_customer_as_serviced, make_completed_callback),
+            # so remaining items of the day are the active ones.
             return (
-                QueuedItem.objects.filter()
-                .exclude(code__isnull=True, queue__monitor__id=monitor.id)
+                QueuedItem.objects.filter(
+                    warehouse_id=warehouse_id, created_at__gte=start_of_day
+                )
+                .exclude(code__isnull=True)
+                .select_related("queue", "user")
                 .order_by("-id")
             )
 
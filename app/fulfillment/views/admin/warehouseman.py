@@ -1,7 +1,14 @@
-from itertools import chain
-
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum, Count, Prefetch, Exists, OuterRef
+from django.db.models import (
+    Q,
+    Sum,
+    Count,
+    Prefetch,
+    Exists,
+    OuterRef,
+    ExpressionWrapper,
+    BooleanField,
+)
 from django.db import transaction as db_transaction
 from django.utils import timezone
 from django.http import Http404
@@ -35,8 +42,10 @@ from fulfillment.models import (
     PackageAdditionalServiceAttachment,
     ShipmentAdditionalServiceAttachment,
 )
+from fulfillment.serializers.common import StatusValuesSerializer
 from fulfillment.serializers.admin import warehouseman as wh_serializers
 from fulfillment.views.utils import UserDeclaredFilterMixin
+from fulfillment.pagination import KeysetPagination
 from fulfillment.filters import (
     ShipmentFilter,
     PackageFilter,
@@ -230,6 +239,7 @@ class PackageByClientApiView(generics.ListAPIView):
 class PackageDashboardApiView(generics.ListAPIView):
     permission_classes = [IsWarehouseman | IsOntimeAdminUser]
     serializer_class = wh_serializers.PackageReadSerializer
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = PackageFilter
 
@@ -271,6 +281,7 @@ class PackageRetrieveUpdateApiView(generics.RetrieveUpdateAPIView):
 class ShipmentDashboardApiView(generics.ListAPIView, UserDeclaredFilterMixin):
     permission_classes = [IsWarehouseman | IsOntimeAdminUser]
     serializer_class = wh_serializers.ShipmentReadSerializer
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = ShipmentFilter
 
@@ -561,7 +572,7 @@ def place_accepted_shipment(request, number):
 class ShipmentStatusListApiView(generics.ListAPIView):
     pagination_class = None
     permission_classes = [IsOntimeAdminUser | IsWarehouseman]
-    serializer_class = wh_serializers.StatusSerializer
+    serializer_class = StatusValuesSerializer
     queryset = Status.objects.filter(type=Status.SHIPMENT_TYPE)
 
 
@@ -604,30 +615,20 @@ class CityListApiView(views.APIView):
     permission_classes = [IsWarehouseman | IsOntimeAdminUser]
 
     def get(self, request, *args, **kwargs):
-        warehouseman = request.user.warehouseman_profile
-        cities = City.objects.select_related("country")
-
-        source_cities = list(
-            filter(
-                lambda c: c.country_id == warehouseman.warehouse.city.country_id, cities
+        warehouse = request.user.warehouseman_profile.warehouse
+        cities = City.objects.annotate(
+            is_default=ExpressionWrapper(
+                Q(id=warehouse.city_id), output_field=BooleanField()
             )
         )
-        destination_cities = list(
-            filter(lambda c: c.id != warehouseman.warehouse.city_id, cities)
-        )
-
-        for city in chain(source_cities, destination_cities):
-            city.is_default = False
-            if city.id == warehouseman.warehouse.city_id:
-                city.is_default = True
 
         return Response(
             {
-                "source_cities": wh_serializers.TransportationCitySerializer(
-                    source_cities, many=True
+                "source_cities": wh_serializers.TransportationCityValuesSerializer(
+                    cities.filter(country_id=warehouse.city.country_id), many=True
                 ).data,
-                "destination_cities": wh_serializers.TransportationCitySerializer(
-                    destination_cities, many=True
+                "destination_cities": wh_serializers.TransportationCityValuesSerializer(
+                    cities.exclude(id=warehouse.city_id), many=True
                 ).data,
             }
         )
@@ -14,16 +14,18 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 from domain.services import get_additional_services
 from domain.utils import TariffCalculator, ShipmentDimensions
+from domain.utils.response_cache import cache_response
 from core.serializers.client import (
     CurrencySerializer,
     CitySerializer,
     CountrySerializer,
 )
-from core.models import Country, City
+from core.models import Country, City, Currency
 from core.filters import CityFilter, CountryFilter
 from fulfillment.models import (
     AdditionalService,
     Address,
+    AddressField,
     ProductCategory,
     ProductType,
     Status,
@@ -41,7 +43,7 @@ from fulfillment.serializers.common import (
     AddressSerializer,
     ProductCategorySerializer,
     ProductTypeExtraCompactSerializer,
-    StatusSerializer,
+    StatusValuesSerializer,
     TariffCompactSerializer,
     TariffCalculatorSerializer,
     WarehouseReadSerializer,
@@ -67,6 +69,7 @@ from fulfillment.filters import (
 from fulfillment.pagination import DynamicPagination
 
 
+@cache_response(Warehouse, Country, City)
 class WarehouseApiView(generics.ListAPIView):
     serializer_class = WarehouseReadSerializer
     queryset = Warehouse.objects.filter(
@@ -77,35 +80,40 @@ class WarehouseApiView(generics.ListAPIView):
     filterset_class = WarehouseFilter
 
 
+@cache_response(Status)
 class OrderStatusListApiView(generics.ListAPIView):
     pagination_class = None
-    serializer_class = StatusSerializer
+    serializer_class = StatusValuesSerializer
     queryset = Status.objects.filter(type=Status.ORDER_TYPE)
 
 
+@cache_response(Status)
 class PackageStatusListApiView(generics.ListAPIView):
     pagination_class = None
-    serializer_class = StatusSerializer
+    serializer_class = StatusValuesSerializer
     queryset = Status.objects.filter(type=Status.PACKAGE_TYPE)
 
 
+@cache_response(Status)
 class ShipmentStatusListApiView(generics.ListAPIView):
     pagination_class = None
-    serializer_class = StatusSerializer
+    serializer_class = StatusValuesSerializer
     queryset = Status.objects.filter(type=Status.SHIPMENT_TYPE)
 
 
+@cache_response(Status)
 class TicketStatusListApiView(generics.ListAPIView):
     pagination_class = None
-    serializer_class = StatusSerializer
+    serializer_class = StatusValuesSerializer
     queryset = Status.objects.filter(type=Status.TICKET_TYPE).exclude(
         codename="deleted"
     )
 
 
+@cache_response(Status)
 class CourierOrderListApiView(generics.ListAPIView):
     pagination_class = None
-    serializer_class = StatusSerializer
+    serializer_class = StatusValuesSerializer
     queryset = Status.objects.filter(type=Status.COURIER_ORDER_TYPE)
 
 
@@ -167,6 +175,7 @@ class TariffCalculatorApiView(views.APIView):
         )
 
 
+@cache_response(ProductCategory, Country)
 class ProductCategoryListApiView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
@@ -180,6 +189,7 @@ class ProductCategoryListApiView(generics.ListAPIView):
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 @authentication_classes([])
+@cache_response(ProductType)
 def product_types_view(request, category_pk):
     return Response(
         ProductTypeExtraCompactSerializer(
@@ -192,6 +202,7 @@ def product_types_view(request, category_pk):
 
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
+@cache_response(Address, AddressField, Country, anonymous_only=True)
 def address_by_country_view(request, country_pk):
     return Response(
         AddressSerializer(
@@ -206,6 +217,7 @@ def address_by_country_view(request, country_pk):
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 @authentication_classes([])
+@cache_response(Tariff, City, Country, Currency)
 def tariff_by_country_view(request, country_pk):
     return Response(
         TariffCompactSerializer(
@@ -224,6 +236,17 @@ available_countries = Country.objects.filter(
 ).order_by("display_order")
 
 
+# Countries are listed with their local time, so they are cached shortly
+@cache_response(
+    Country,
+    Currency,
+    Warehouse,
+    Tariff,
+    Address,
+    AddressField,
+    timeout=60,
+    anonymous_only=True,
+)
 class CountryListApiView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     pagination_class = None
@@ -313,6 +336,7 @@ class CityListApiView(generics.ListAPIView):
         return super().paginate_queryset(*args, **kwargs)
 
 
+@cache_response(CourierRegion)
 class CourierRegionListApiView(generics.ListAPIView):
     pagination_class = None
     queryset = CourierRegion.objects.order_by("title")
@@ -6,7 +6,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
 from domain.services import (
-    get_invoice,
+    get_serialized_invoice,
     create_courier_order,
     create_uncomplete_transaction_for_courier_order,
 )
@@ -46,7 +46,11 @@ class CourierOrderListApiView(generics.ListAPIView):
             except ValidationError:
                 pass
 
-        return courier_orders.order_by("-updated_at").select_related()
+        return (
+            courier_orders.order_by("-updated_at")
+            .select_related()
+            .with_discounted_total()
+        )
 
     def post(self, request, *args, **kwargs):
         serializer = CourierOrderWriteSerializer(
@@ -83,7 +87,7 @@ class CourierOrderDetailApiView(generics.RetrieveAPIView):
 @api_view(["GET"])
 def courier_order_invoice_view(request, number):
     courier_order = get_object_or_404(request.user.courier_orders.all(), number=number)
-    invoice = get_invoice(courier_order).serialize()
+    invoice = get_serialized_invoice(courier_order)
 
     if not invoice:
         raise Http404
@@ -46,12 +46,16 @@ def dashboard_view(request):
                 context={"request": request},
             ).data,
             "orders": OrderReadSerializer(
-                orders.order_by("-updated_at").select_related()[:limit],
+                orders.order_by("-updated_at")
+                .select_related()
+                .with_discounted_total()[:limit],
                 many=True,
                 context={"request": request},
             ).data,
             "shipments": ShipmentReadSerializer(
-                shipments.order_by("-updated_at").select_related()[:limit],
+                shipments.order_by("-updated_at")
+                .select_related()
+                .with_discounted_total()[:limit],
                 many=True,
                 context={"request": request},
             ).data,
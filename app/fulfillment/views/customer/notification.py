@@ -6,6 +6,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 from fulfillment.models import Notification
 from fulfillment.filters import NotificationFilter
+from fulfillment.pagination import KeysetPagination
 from fulfillment.serializers.customer import (
     NotificationSerializer,
     NotificationCompactSerializer,
@@ -33,6 +34,7 @@ def get_unseen_notifications_data_view(request):
 
 
 class NotificationReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = NotificationFilter
 
@@ -14,7 +14,7 @@ from domain.conf import Configuration
 from domain.services import (
     create_uncomplete_transactions_for_orders,
     promote_status,
-    get_invoice,
+    get_serialized_invoice,
     complete_payments,
     create_virtual_invoice,
     save_user_country_log,
@@ -69,7 +69,7 @@ class OrderListCreateApiView(generics.ListCreateAPIView):
             except ValidationError:
                 pass
 
-        return orders.order_by("-updated_at").select_related()
+        return orders.order_by("-updated_at").select_related().with_discounted_total()
 
     def get_serializer_class(self, *args, **kwargs):
         if self.request.method == "GET":
@@ -187,7 +187,7 @@ def order_timeline_view(request, order_code):
 @api_view(["GET"])
 def order_invoice_view(request, order_code):
     order = get_object_or_404(request.user.orders.all(), order_code=order_code)
-    invoice = get_invoice(order).serialize()
+    invoice = get_serialized_invoice(order)
 
     if not invoice:
         raise Http404
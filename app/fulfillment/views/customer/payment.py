@@ -15,8 +15,8 @@ from domain.services import (
     get_exposable_customer_payments,
     make_payment_partial,
     prepare_balance_add_form,
-    get_invoice,
-    merge_invoices,
+    get_serialized_invoice,
+    get_serialized_merged_invoice,
     get_user_transactions as get_transactions,
     prepare_transaction_for_courier_order,
     get_serialized_multiple_invoice,
@@ -25,6 +25,7 @@ from domain.services import (
     merge_transactions,
 )
 from domain.exceptions.payment import PaymentError
+from domain.utils.prefetch import prefetch_generic_related_objects
 from core.converter import Converter
 from customer.serializers import BalanceSerializer
 from fulfillment.models import Transaction, Shipment
@@ -38,6 +39,7 @@ from fulfillment.serializers.customer import (
 )
 from fulfillment.filters import PaymentFilter
 from fulfillment.views.utils import filter_by_archive_status
+from fulfillment.pagination import KeysetPagination
 from paypal.client import PayPalClient
 from paytr.client import PayTR
 from ulduzum.client import UlduzumClient
@@ -85,6 +87,7 @@ def payment_view(request):
 
 class PaymentListApiView(generics.ListAPIView):
     serializer_class = PaymentSerializer
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = PaymentFilter
 
@@ -113,17 +116,18 @@ def payment_invoice_view(request, invoice_number):
 
     if transaction.purpose == Transaction.MERGED:
         # Must return merged invoice
-        invoice = merge_invoices(
-            request.user,
-            [get_invoice(t.related_object) for t in transaction.children.all()],
+        children = list(transaction.children.all())
+        prefetch_generic_related_objects(children)
+        invoice = get_serialized_merged_invoice(
+            request.user, [t.related_object for t in children]
         )
-        return Response(invoice.serialize())
+        return Response(invoice)
 
     related_object = transaction.related_object
     if not related_object:
         raise Http404
 
-    invoice = get_invoice(related_object).serialize()
+    invoice = get_serialized_invoice(related_object)
 
     if not invoice:
         raise Http404
@@ -247,6 +251,8 @@ def multiple_payment_invoice_view(request):
         completed=False,
     )
 
+    transactions = list(transactions)
+    prefetch_generic_related_objects(transactions)
     instances = [t.related_object for t in transactions]
 
     return Response(
@@ -34,7 +34,9 @@ class RecipientViewSet(viewsets.ModelViewSet):
         return super().paginate_queryset(*args, **kwargs)
 
     def get_queryset(self):
-        return self.request.user.recipients.filter(is_deleted=False)
+        return self.request.user.recipients.filter(is_deleted=False).select_related(
+            "city__country", "region"
+        )
 
     @db_transaction.atomic
     def perform_destroy(self, instance):
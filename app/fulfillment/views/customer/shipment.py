@@ -1,16 +1,20 @@
 from django.shortcuts import get_object_or_404, get_list_or_404
 from django.http import Http404
-from django.db.models import Q
+from django.db.models import Q, Prefetch
 from django.db import transaction as db_transaction
 from django.utils import timezone
 from rest_framework import generics
 from rest_framework import status
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 
 from domain.conf import Configuration
-from domain.services import get_invoice, save_user_country_log
+from domain.services import get_serialized_invoice, save_user_country_log
 from domain.utils.smart_customs import CustomsClient
 from fulfillment.serializers.common import StatusEventSerializer
 from fulfillment.serializers.customer import (
@@ -19,9 +23,9 @@ from fulfillment.serializers.customer import (
     ShipmentReadSerializer,
     ShipmentWriteSerializer,
     ShipmentDetailedSerializer,
-    ShipmentCompactSerializer,
+    ShipmentCompactValuesSerializer,
 )
-from fulfillment.models import Shipment, StatusEvent
+from fulfillment.models import Shipment, Package, StatusEvent
 from fulfillment.views.utils import filter_by_archive_status, UserDeclaredFilterMixin
 
 
@@ -66,17 +70,27 @@ class ShipmentListCreateApiView(generics.ListCreateAPIView, UserDeclaredFilterMi
                 total_price_currency__isnull=False,
                 courier_order__isnull=True,
             )
+
+        shipments = shipments.order_by("-updated_at")
+
+        if "compact" in self.request.query_params:
+            return shipments
+
         return (
-            shipments.order_by("-updated_at")
-            .select_related(
-                "recipient",
+            shipments.select_related(
+                "recipient__real_recipient",
                 "source_country",
                 "destination_warehouse",
                 "declared_price_currency",
                 "total_price_currency",
                 "status",
             )
-            .prefetch_related("packages__products")
+            .prefetch_related(
+                Prefetch("packages", queryset=Package.objects.select_related("status")),
+                "packages__products__type__category",
+                "packages__products__category",
+            )
+            .with_customer_flags()
         )
 
     def paginate_queryset(self, *args, **kwargs):
@@ -87,7 +101,7 @@ class ShipmentListCreateApiView(generics.ListCreateAPIView, UserDeclaredFilterMi
 
     def get_serializer_class(self, *args, **kwargs):
         if "compact" in self.request.query_params:
-            return ShipmentCompactSerializer
+            return ShipmentCompactValuesSerializer
         if self.request.method == "GET":
             return ShipmentReadSerializer
         return ShipmentWriteSerializer
@@ -168,7 +182,7 @@ class ShipmentDeleteView(generics.DestroyAPIView):
 @api_view(["GET"])
 def shipment_invoice_view(request, number):
     shipment = get_object_or_404(request.user.shipments.all(), number=number)
-    invoice = get_invoice(shipment).serialize()
+    invoice = get_serialized_invoice(shipment)
 
     if not invoice:
         raise Http404
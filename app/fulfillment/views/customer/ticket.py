@@ -33,9 +33,11 @@ class TicketViewSet(viewsets.ModelViewSet):
     throttle_scope = "hardcore"
 
     def get_queryset(self):
-        tickets = self.request.user.tickets.exclude(
-            status__codename="deleted"
-        ).order_by("-id")
+        tickets = (
+            self.request.user.tickets.exclude(status__codename="deleted")
+            .select_related("category", "status")
+            .order_by("-id")
+        )
         tickets = filter_by_archive_status(tickets, self.request)
 
         statuses = self.request.query_params.getlist("status")
@@ -15,8 +15,8 @@ from paypal.client import PayPalClient
 from cybersource.secure_acceptance import SecureAcceptanceClient
 from cybersource.exceptions import InvalidOrMalformedResponseError
 from domain.conf import Configuration
-from domain.services import complete_payments
 from domain.exceptions.payment import PaymentError
+from domain.utils.payment_callbacks import ingest_payment_callback
 from fulfillment.models import Transaction
 
 
@@ -36,7 +36,8 @@ def get_redirect(payment_service, transaction=None, success=True):
 
 def process_transaction(data, api_response=True):
     # This method must not be run in atomic context, because if we fail
-    # to complete the payment, we must at least save the response from CyberSource
+    # to complete the payment, we must at least save the response from CyberSource.
+    # Payment is completed in background, see domain.utils.payment_callbacks
     secure_acceptance_client = SecureAcceptanceClient(response_data=data)
 
     if secure_acceptance_client.is_response_valid():
@@ -48,23 +49,26 @@ def process_transaction(data, api_response=True):
             else:
                 return HttpResponse("MALFORMED", status=400)
 
-        if transaction.completed:  # check if already completed
-            return get_redirect(
-                Transaction.CYBERSOURCE_SERVICE, transaction=transaction, success=True
+        # Signed responses of declined, cancelled and failed payments
+        # are saved too, but only accepted ones are completed
+        accepted = data.get("decision") == "ACCEPT"
+
+        if accepted and not transaction.completed:
+            # Cybersource and our front application post the same response
+            ingest_payment_callback(
+                Transaction.CYBERSOURCE_SERVICE,
+                data.get("transaction_id") or transaction.invoice_number,
+                data,
+                transaction=transaction,
             )
 
-        # Selecting for update
-        transactions = Transaction.objects.select_for_update().filter(id=transaction.id)
-        try:
-            transaction = complete_payments(transactions, unmake_partial=False)
-        except PaymentError:
-            return get_redirect(Transaction.CYBERSOURCE_SERVICE, success=False)
-
         if api_response:
-            return Response({"status": "OK"})
+            if accepted:
+                return Response({"status": "OK"})
+            return Response({"status": "FAIL"}, status=400)
 
         return get_redirect(
-            Transaction.CYBERSOURCE_SERVICE, transaction=transaction, success=True
+            Transaction.CYBERSOURCE_SERVICE, transaction=transaction, success=accepted
         )
 
     if api_response:
@@ -128,8 +132,6 @@ class PayTRSuccessView(View):
                 hash=request.POST["hash"],
             ):
                 print("- valid hash provided")
-                post_params = dict(request.POST.dict())
-                print("- ", post_params)
                 transaction = Transaction.objects.filter(
                     id=request.POST["merchant_oid"]
                 ).first()
@@ -137,21 +139,12 @@ class PayTRSuccessView(View):
                     f"- found transaction with id {request.POST['merchant_oid']} -> {transaction or 'not found...'}"
                 )
                 if transaction:
-                    transaction.payment_service_response_json = post_params
-                    transaction.save()
-                    if request.POST["status"] == "success":
-                        try:
-                            transactions = (
-                                Transaction.objects.select_for_update().filter(
-                                    id=request.POST["merchant_oid"]
-                                )
-                            )
-                            transaction = complete_payments(
-                                transactions, unmake_partial=False
-                            )
-                        except Exception as error:
-                            print("ERROR WHILE PROCESSING PAYTR", error)
-                            return HttpResponse("OK")
-                        return HttpResponse("OK")
-                return HttpResponse("OK")
+                    # Response is saved and payment is completed in background
+                    ingest_payment_callback(
+                        Transaction.PAYTR_SERVICE,
+                        "%s:%s"
+                        % (request.POST["merchant_oid"], request.POST["status"]),
+                        dict(request.POST.dict()),
+                        transaction=transaction,
+                    )
         return HttpResponse("OK")
@@ -2,6 +2,8 @@
 ASGI config for ontime project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests to ``ontime.events.EVENTS_PATH`` are served by server-sent events
+gateway, everything else is handled by Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
@@ -13,4 +15,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ontime.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from ontime.events import EVENTS_PATH, events_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"] == EVENTS_PATH:
+        return await events_application(scope, receive, send)
+    return await django_application(scope, receive, send)
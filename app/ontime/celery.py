@@ -13,6 +13,7 @@ app.autodiscover_tasks()
 class QUEUES:
     CUSTOMS = "customs"
     NOTIFICATIONS = "notifications"
+    PAYMENTS = "payments"
 
 
 app.conf.beat_schedule = {
@@ -33,4 +34,31 @@ app.conf.beat_schedule = {
         ),
         "options": {"queue": QUEUES.CUSTOMS},
     },
+    "roll_up_balances": {
+        "task": "customer.tasks.roll_up_balances_task",
+        "schedule": crontab(
+            minute="*/5",
+            hour="*",
+            day_of_month="*",
+            month_of_year="*",
+            day_of_week="*",
+        ),
+    },
+    "process_pending_payment_callbacks": {
+        "task": "fulfillment.tasks.process_pending_payment_callbacks_task",
+        "schedule": crontab(
+            minute="*/5",
+            hour="*",
+            day_of_month="*",
+            month_of_year="*",
+            day_of_week="*",
+        ),
+        "options": {"queue": QUEUES.PAYMENTS},
+    },
+    "roll_up_income": {
+        "task": "fulfillment.tasks.roll_up_income_task",
+        "schedule": crontab(
+            minute="0", hour="*", day_of_month="*", month_of_year="*", day_of_week="*"
+        ),
+    },
 }
@@ -0,0 +1,399 @@
+"""
+Server-sent events gateway for staff clients.
+
+Pushes queue events (the same ones QueueClient publishes to dashboard,
+monitor and notify channels) to connected warehousemen, cashiers,
+customer service members and monitors, so they don't have to poll.
+
+Events are read from per-warehouse redis streams that QueueClient writes
+in the same pipeline it publishes with. One reader per process serves
+all connections, and clients that reconnect with `Last-Event-ID` header
+(or `lastEventId` query param) receive the events they missed.
+
+EventSource can't send headers, so browsers connect with a `ticket`
+query param issued by `create_ticket`, which keeps auth tokens out of
+access logs. The ticket is valid for TICKET_TTL seconds and is renewed
+while its stream is open, so EventSource can reconnect with the same
+URL. Other clients may send `Authorization` header instead.
+
+Subscribers that don't keep up with events are disconnected once their
+queue is full, and receive the dropped events when they reconnect.
+"""
+import asyncio
+import functools
+import secrets
+from urllib.parse import parse_qs
+
+import redis
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from knox.settings import knox_settings
+from rest_framework.exceptions import AuthenticationFailed
+
+from ontime.utils import parse_int, get_redis_client
+from customer.authentication import CachedTokenAuthentication
+from customer.models import Role
+from domain.utils import (
+    QueueClient,
+    DASHBOARD_CHANNELS,
+    MONITOR_CHANNELS,
+    NOTIFY_CHANNELS,
+)
+
+EVENTS_PATH = "/api/v1/admin/staff/events/"
+KEEP_ALIVE_INTERVAL = 15  # seconds
+READ_BLOCK_TIMEOUT = 2000  # milliseconds
+TICKET_KEY = "events_ticket:%s"
+TICKET_TTL = 30  # seconds
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+ROLE_CHANNELS = {
+    Role.WAREHOUSEMAN: {
+        DASHBOARD_CHANNELS.WH_DASHBOARD,
+        NOTIFY_CHANNELS.WH_NOTIFY,
+    },
+    Role.CASHIER: {
+        DASHBOARD_CHANNELS.CASHIER_DASHBOARD,
+        NOTIFY_CHANNELS.CASHIER_NOTIFY,
+    },
+    Role.CUSTOMER_SERVICE: {
+        DASHBOARD_CHANNELS.CUSTOMER_SERVICE_DASHBOARD,
+        NOTIFY_CHANNELS.CUSTOMER_SERVICE_NOTIFY,
+    },
+    Role.MONITOR: {MONITOR_CHANNELS.MAIN_MONITOR},
+    Role.ADMIN: None,  # admin receives everything
+}
+
+
+class Subscriber:
+    def __init__(self, warehouse_id, channels):
+        self.warehouse_id = warehouse_id
+        self.channels = channels
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def accepts(self, channel):
+        return self.channels is None or channel in self.channels
+
+    def push(self, event):
+        """
+        Queues the event. When the queue is full, queued events are dropped
+        and None is queued instead, which ends the stream of the subscriber.
+        Returns False when the subscriber overflowed.
+        """
+        if self.overflowed:
+            return False
+
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+        return True
+
+
+def create_ticket(user):
+    """
+    Returns ticket authenticating the user to the gateway.
+    """
+    ticket = secrets.token_urlsafe(32)
+    get_redis_client().set(TICKET_KEY % ticket, user.pk, ex=TICKET_TTL)
+    return ticket
+
+
+def renew_ticket(ticket):
+    """Keeps the ticket valid for another TICKET_TTL seconds."""
+    get_redis_client().expire(TICKET_KEY % ticket, TICKET_TTL)
+
+
+def _close_connections(function):
+    """
+    Closes database connections of the thread, which are otherwise left
+    open by the long-lived gateway (Django closes them per request).
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        close_old_connections()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return wrapper
+
+
+def authenticate(ticket=None, authorization=b""):
+    """
+    Returns user of the ticket or knox token of `Authorization` header,
+    or None.
+    """
+    if ticket:
+        user_id = get_redis_client().get(TICKET_KEY % ticket)
+
+        return (
+            user_id
+            and get_user_model()
+            .objects.select_related("role")
+            .filter(pk=int(user_id), is_active=True)
+            .first()
+        )
+
+    auth = authorization.split()
+    prefix = knox_settings.AUTH_HEADER_PREFIX.encode()
+
+    if len(auth) != 2 or auth[0].lower() != prefix.lower():
+        return None
+
+    try:
+        user, _ = CachedTokenAuthentication().authenticate_credentials(auth[1])
+    except AuthenticationFailed:
+        return None
+
+    return user
+
+
+def get_subscription(user, warehouse_id=None):
+    """
+    Returns warehouse id and channels allowed for role of staff user.
+    Returns None when user is not allowed to receive events.
+    """
+    from fulfillment.views.admin.queue import (
+        get_warehouse_id,
+        get_monitor_warehouse_id,
+    )
+
+    if not (user.is_staff and user.role_id) or user.role.type not in ROLE_CHANNELS:
+        return None
+
+    if user.role.type == Role.ADMIN:
+        warehouse_id = parse_int(warehouse_id) or get_warehouse_id(user)
+    elif user.role.type == Role.MONITOR:
+        monitor = getattr(user, "as_monitor", None)
+        warehouse_id = monitor and get_monitor_warehouse_id(monitor)
+    else:
+        warehouse_id = get_warehouse_id(user)
+
+    if not warehouse_id:
+        return None
+
+    return warehouse_id, ROLE_CHANNELS[user.role.type]
+
+
+class EventReader:
+    """
+    Reads per-warehouse event streams and fans events out to subscribers.
+    Only one blocking redis read is made at a time, regardless of the
+    number of connected clients.
+    """
+
+    def __init__(self):
+        self.client = QueueClient()
+        self.subscribers = {}
+        self.cursors = {}
+        self._task = None
+
+    async def subscribe(self, subscriber: Subscriber):
+        warehouse_id = subscriber.warehouse_id
+
+        if warehouse_id not in self.cursors:
+            last_event_id = await sync_to_async(
+                self.client.get_last_event_id, thread_sensitive=False
+            )(warehouse_id)
+            self.cursors.setdefault(warehouse_id, last_event_id or "0-0")
+
+        self.subscribers.setdefault(warehouse_id, set()).add(subscriber)
+
+        if not self._task or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self.subscribers.get(subscriber.warehouse_id, set())
+        subscribers.discard(subscriber)
+
+        if not subscribers:
+            self.subscribers.pop(subscriber.warehouse_id, None)
+            self.cursors.pop(subscriber.warehouse_id, None)
+
+    async def _run(self):
+        while self.subscribers:
+            streams = {
+                self.client.EVENT_STREAM % warehouse_id: cursor
+                for warehouse_id, cursor in self.cursors.items()
+            }
+            try:
+                result = await sync_to_async(self._read, thread_sensitive=False)(
+                    streams
+                )
+            except redis.RedisError:
+                await asyncio.sleep(1)
+                continue
+
+            for stream, events in result:
+                warehouse_id = int(stream.decode().split(":")[-1])
+
+                if warehouse_id not in self.cursors:
+                    continue  # everyone left while we were reading
+
+                for event_id, fields in events:
+                    event = (
+                        event_id.decode(),
+                        fields[b"channel"].decode(),
+                        fields[b"data"].decode(),
+                    )
+                    for subscriber in list(self.subscribers.get(warehouse_id, ())):
+                        if subscriber.accepts(event[1]) and not subscriber.push(event):
+                            self.unsubscribe(subscriber)
+
+                if warehouse_id in self.cursors:
+                    self.cursors[warehouse_id] = events[-1][0].decode()
+
+    def _read(self, streams):
+        return self.client.redis_client.xread(streams, block=READ_BLOCK_TIMEOUT) or []
+
+
+reader = EventReader()
+
+
+@_close_connections
+def _get_request_subscription(ticket, authorization, warehouse_id):
+    user = authenticate(ticket, authorization)
+    return user and get_subscription(user, warehouse_id)
+
+
+def format_event(event_id, channel, data):
+    return ("id: %s\nevent: %s\ndata: %s\n\n" % (event_id, channel, data)).encode()
+
+
+async def events_application(scope, receive, send):
+    """ASGI application that streams queue events to a staff client."""
+    query = parse_qs(scope.get("query_string", b"").decode())
+    headers = dict(scope.get("headers", []))
+    last_event_id = (
+        headers.get(b"last-event-id", b"").decode() or query.get("lastEventId", [""])[0]
+    )
+    ticket = query.get("ticket", [None])[0]
+
+    subscription = await sync_to_async(_get_request_subscription)(
+        ticket,
+        headers.get(b"authorization", b""),
+        query.get("warehouse", [None])[0],
+    )
+
+    if not subscription:
+        await send({"type": "http.response.start", "status": 403, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    subscriber = Subscriber(*subscription)
+    client = reader.client
+    await reader.subscribe(subscriber)
+
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+
+        last_sent = client.parse_event_id(last_event_id)
+
+        if last_event_id:
+            missed_events = await sync_to_async(
+                client.read_events, thread_sensitive=False
+            )(subscriber.warehouse_id, last_event_id, subscriber.channels)
+
+            if missed_events is None:
+                # Too old, client must reload everything it shows
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": b"event: reset\ndata: {}\n\n",
+                        "more_body": True,
+                    }
+                )
+                missed_events = []
+
+            for event in missed_events:
+                event_id, channel = event.pop("id"), event.pop("channel")
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": format_event(
+                            event_id, channel, client.renderer.render(event).decode()
+                        ),
+                        "more_body": True,
+                    }
+                )
+                last_sent = client.parse_event_id(event_id)
+
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        loop = asyncio.get_event_loop()
+        renewed_at = None
+
+        while not disconnected.done():
+            if ticket and (
+                renewed_at is None or loop.time() - renewed_at >= KEEP_ALIVE_INTERVAL
+            ):
+                await sync_to_async(renew_ticket, thread_sensitive=False)(ticket)
+                renewed_at = loop.time()
+
+            get_event = asyncio.ensure_future(subscriber.queue.get())
+            done, _ = await asyncio.wait(
+                [get_event, disconnected],
+                timeout=KEEP_ALIVE_INTERVAL,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if get_event not in done:
+                get_event.cancel()
+                if not disconnected.done():
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": b": keep-alive\n\n",
+                            "more_body": True,
+                        }
+                    )
+                continue
+
+            if get_event.result() is None:
+                # Overflowed, client reconnects and receives dropped events
+                await send({"type": "http.response.body", "body": b""})
+                break
+
+            event_id, channel, data = get_event.result()
+            event_key = client.parse_event_id(event_id)
+
+            # Skip events that were already sent while replaying
+            if last_sent and event_key <= last_sent:
+                continue
+
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": format_event(event_id, channel, data),
+                    "more_body": True,
+                }
+            )
+            last_sent = event_key
+    finally:
+        reader.unsubscribe(subscriber)
+
+
+async def _wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
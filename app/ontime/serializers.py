@@ -0,0 +1,326 @@
+"""
+Read-only serializers compiled to `values_list()` queries.
+
+Big read-only lists don't need model instances nor field machinery of
+ModelSerializer for every row. A values serializer declares the shape
+of its output, which is compiled (once per language) into columns of
+one `values_list()` query and a function building plain dicts from
+its rows:
+
+    class StatusValuesSerializer(ValuesSerializer):
+        hex_color = ComputedField(get_hex_color, "extra")
+
+        class Meta:
+            model = Status
+            fields = ["id", "display_name", "hex_color"]
+
+Names in `Meta.fields` which are not declared are model fields (or
+lookups). Declared fields are:
+
+- `ValuesField(source)`: a model field or lookup under another name.
+- `ExpressionField(build)`: an annotation, `build(ref)` returns the
+  expression, `ref(name)` makes lookups relative to the serialized model.
+- `ComputedField(function, *sources)`: function of values of several
+  lookups (as they are loaded, not represented).
+- nested values serializers with `source` of the relation, represented
+  as None when the relation is null.
+
+Translated fields are read from columns of the current language and its
+fallback languages, like modeltranslation does. Decimals, dates, times,
+UUIDs and files are represented like DRF represents them.
+
+Values serializers are used as `serializer_class` of list views and with
+`many=True`. They represent querysets; model instances and lists of
+them are loaded again by pk.
+"""
+import functools
+
+from django.db.models import Model, QuerySet, FileField
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.translation import get_language
+from modeltranslation.fields import NONE, TranslationFieldDescriptor
+from modeltranslation.settings import ENABLE_FALLBACKS
+from modeltranslation.utils import build_localized_fieldname, resolution_order
+from rest_framework import serializers
+
+
+class ValuesField(serializers.Field):
+    def __init__(self, source):
+        super().__init__(source=source, read_only=True)
+
+
+class ExpressionField(serializers.Field):
+    def __init__(self, build):
+        super().__init__(read_only=True)
+        self.build = build
+
+
+class ComputedField(serializers.Field):
+    def __init__(self, function, *sources):
+        super().__init__(read_only=True)
+        self.function = function
+        self.sources = sources
+
+
+def _get_representer(model_field):
+    """
+    Returns function representing values of the model field like DRF
+    field of ModelSerializer does, or None when values are left as is.
+    """
+    if isinstance(model_field, FileField):
+        storage = model_field.storage
+
+        def represent_file(name, context):
+            if not name:
+                return None
+
+            url = storage.url(name)
+            request = context.get("request")
+            return request.build_absolute_uri(url) if request else url
+
+        return represent_file
+
+    field_class = serializers.ModelSerializer.serializer_field_mapping.get(
+        type(model_field)
+    )
+
+    if field_class is serializers.DecimalField:
+        field = field_class(
+            max_digits=model_field.max_digits,
+            decimal_places=model_field.decimal_places,
+        )
+    elif field_class in (
+        serializers.DateTimeField,
+        serializers.DateField,
+        serializers.TimeField,
+        serializers.DurationField,
+        serializers.UUIDField,
+    ):
+        field = field_class()
+    else:
+        return None
+
+    return lambda value, context: field.to_representation(value)
+
+
+def _get_translated_value(descriptor, default):
+    """
+    Returns function picking value of a translated field from values of
+    its localized fields in resolution order, like its descriptor does.
+    """
+    undefined = descriptor.fallback_undefined
+
+    if undefined is NONE:
+        undefined = default
+
+    if ENABLE_FALLBACKS and descriptor.fallback_value is not NONE:
+        fallback = descriptor.fallback_value
+    else:
+        fallback = default
+
+    def get_value(*values):
+        for value in values:
+            if value is not None and value != undefined:
+                return value
+        return fallback
+
+    return get_value
+
+
+def _get_column(index, row, context):
+    return row[index]
+
+
+class _Compiler:
+    def __init__(self, language):
+        self.language = language
+        self.columns = []
+        self.annotations = {}
+
+    def add_column(self, lookup):
+        self.columns.append(lookup)
+        return len(self.columns) - 1
+
+    def add_annotation(self, expression):
+        alias = "_values_%s" % len(self.annotations)
+        self.annotations[alias] = expression
+        return self.add_column(alias)
+
+    def compile_lookup(self, model, prefix, lookup, represent=True):
+        """
+        Returns getter of the value of `lookup` from a row.
+        """
+        *relations, name = lookup.split(LOOKUP_SEP)
+
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+
+        attribute = model.__dict__.get(name)
+        path = prefix + LOOKUP_SEP.join(relations + [""])
+
+        if isinstance(attribute, TranslationFieldDescriptor):
+            model_field = attribute.field
+            languages = resolution_order(self.language, attribute.fallback_languages)
+            indexes = [
+                self.add_column(path + build_localized_fieldname(name, language))
+                for language in languages
+            ]
+            get_value = _get_translated_value(attribute, model_field.get_default())
+
+            def getter(row, context):
+                return get_value(*[row[index] for index in indexes])
+
+        else:
+            model_field = (
+                model._meta.pk if name == "pk" else model._meta.get_field(name)
+            )
+            index = self.add_column(path + model_field.attname)
+
+            def getter(row, context):
+                return row[index]
+
+        represent = represent and _get_representer(model_field)
+
+        if not represent:
+            return getter
+
+        def represent_getter(row, context):
+            value = getter(row, context)
+            return None if value is None else represent(value, context)
+
+        return represent_getter
+
+    def compile_serializer(self, serializer, prefix=""):
+        """
+        Returns function building representation of `serializer` from a row.
+        """
+        model = serializer.Meta.model
+        getters = []
+
+        for name in serializer.Meta.fields:
+            field = serializer._declared_fields.get(name)
+
+            if field is None:
+                getter = self.compile_lookup(model, prefix, name)
+            elif isinstance(field, ValuesField):
+                getter = self.compile_lookup(model, prefix, field.source)
+            elif isinstance(field, ExpressionField):
+                index = self.add_annotation(field.build(lambda lookup: prefix + lookup))
+                getter = functools.partial(_get_column, index)
+            elif isinstance(field, ComputedField):
+                getter = self._compile_computed(model, prefix, field)
+            elif isinstance(field, ValuesSerializer):
+                source = field.source or name
+                getter = self._compile_nested(type(field), prefix + source + LOOKUP_SEP)
+            else:
+                raise TypeError(
+                    "%s.%s is not supported by values serializers"
+                    % (serializer.__name__, name)
+                )
+
+            getters.append((name, getter))
+
+        def build(row, context):
+            return {name: getter(row, context) for name, getter in getters}
+
+        return build
+
+    def _compile_computed(self, model, prefix, field):
+        source_getters = [
+            self.compile_lookup(model, prefix, source, represent=False)
+            for source in field.sources
+        ]
+
+        def getter(row, context):
+            return field.function(*[get(row, context) for get in source_getters])
+
+        return getter
+
+    def _compile_nested(self, serializer, prefix):
+        pk_index = self.add_column(prefix + "pk")
+        build = self.compile_serializer(serializer, prefix)
+
+        def getter(row, context):
+            return None if row[pk_index] is None else build(row, context)
+
+        return getter
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        return self.child.represent(data)
+
+
+class ValuesSerializer(serializers.Serializer):
+    """
+    Read-only serializer producing plain dicts from a `values_list()`
+    query. See module docstring for declaring output.
+    """
+
+    class Meta:
+        model = None
+        fields = []
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("read_only", True)
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {
+            key: value
+            for key, value in kwargs.items()
+            if key in serializers.LIST_SERIALIZER_KWARGS
+        }
+        return ValuesListSerializer(*args, child=cls(*args, **kwargs), **list_kwargs)
+
+    @classmethod
+    def compile(cls, language):
+        """
+        Returns (columns, annotations, build) of the query and rows.
+        """
+        if "_compiled" not in cls.__dict__:
+            cls._compiled = {}
+
+        if language not in cls._compiled:
+            compiler = _Compiler(language)
+            build = compiler.compile_serializer(cls)
+            cls._compiled[language] = (compiler.columns, compiler.annotations, build)
+
+        return cls._compiled[language]
+
+    def represent(self, data):
+        """
+        Returns representations of a queryset, instances or an instance.
+        """
+        columns, annotations, build = self.compile(get_language())
+        context = self.context
+
+        if isinstance(data, QuerySet):
+            queryset, pks = data, None
+        else:
+            instances = [data] if isinstance(data, Model) else data
+            pks = [instance.pk for instance in instances]
+            queryset = self.Meta.model._default_manager.filter(pk__in=pks)
+            columns = columns + ["pk"]
+
+        if hasattr(queryset, "rewrite"):
+            # Localized columns are selected explicitly
+            queryset = queryset.rewrite(False)
+
+        rows = (
+            queryset.prefetch_related(None)
+            .annotate(**annotations)
+            .values_list(*columns)
+        )
+
+        if pks is None:
+            return [build(row, context) for row in rows]
+
+        # Keeps order of instances
+        rows_by_pk = {row[-1]: row for row in rows}
+        return [build(rows_by_pk[pk], context) for pk in pks if pk in rows_by_pk]
+
+    def to_representation(self, instance):
+        representation = self.represent(instance)
+        return representation[0] if representation else None
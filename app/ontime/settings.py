@@ -53,7 +53,7 @@ INSTALLED_APPS = [
     "customer.apps.CustomerConfig",  # signals don't work otherwise :(
     "core",
     "fulfillment.apps.FulfillmentConfig",
-    "content",
+    "content.apps.ContentConfig",
 ]
 
 MIDDLEWARE = [
@@ -65,6 +65,8 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     # "django.middleware.csrf.CsrfViewMiddleware",
     "domain.middleware.country_timezone_middleware",
+    "domain.middleware.balance_resolver_middleware",
+    "domain.middleware.identity_map_middleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "defender.middleware.FailedLoginMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -127,11 +129,11 @@ AUTH_PASSWORD_VALIDATORS = [
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 24,
-    "DEFAULT_AUTHENTICATION_CLASSES": ("knox.auth.TokenAuthentication",),
-    "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
-    "DEFAULT_RENDERER_CLASSES": (
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
+    "DEFAULT_AUTHENTICATION_CLASSES": (
+        "customer.authentication.CachedTokenAuthentication",
     ),
+    "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_RENDERER_CLASSES": ("ontime.renderers.CamelCaseJSONRenderer",),
     "DEFAULT_PARSER_CLASSES": (
         "djangorestframework_camel_case.parser.CamelCaseFormParser",
         "djangorestframework_camel_case.parser.CamelCaseMultiPartParser",
@@ -246,6 +248,7 @@ else:
     ]
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_HEADERS = list(default_headers) + ["accept-language"]
+CORS_EXPOSE_HEADERS = ["X-Last-Event-Id"]
 
 GRAPPELLI_ADMIN_TITLE = "Ontime"
 CKEDITOR_UPLOAD_PATH = "ckeditor/uploads/"
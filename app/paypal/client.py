@@ -13,7 +13,7 @@ from paypalhttp.http_error import HttpError
 
 from ontime import messages as msg
 from domain.conf import Configuration
-from domain.services import complete_payments
+from domain.utils.payment_callbacks import ingest_payment_callback
 from domain.exceptions.payment import PaymentError
 from paypal.exceptions import PayPalError
 from core.converter import Converter
@@ -174,6 +174,20 @@ class PayPalClient:
             payment_service_response_json__order_id=order_id,
         ).first()
 
+        if (
+            transaction
+            and "capture_response" in transaction.payment_service_response_json
+        ):
+            # Already captured (e.g. page reloaded), payment is completed
+            # from the callback received at that time
+            ingest_payment_callback(
+                Transaction.PAYPAL_SERVICE,
+                order_id,
+                transaction.payment_service_response_json,
+                transaction=transaction,
+            )
+            return transaction
+
         if transaction:
             request = OrdersCaptureRequest(order_id)
             error_occured = False
@@ -200,7 +214,12 @@ class PayPalClient:
                     "payment_service_responsed_at",
                 ]
             )
-            complete_payments([transaction], unmake_partial=False)
+            ingest_payment_callback(
+                Transaction.PAYPAL_SERVICE,
+                order_id,
+                transaction.payment_service_response_json,
+                transaction=transaction,
+            )
             return transaction
 
         raise PaymentError(human=msg.PAYMENT_NOT_FOUND)
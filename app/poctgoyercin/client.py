@@ -20,8 +20,10 @@ class PoctGoyercinClient:
         return self.normalize_phone_number(customer.full_phone_number)
 
     def normalize_phone_number(self, phone_number):
+        from domain.utils.identity_map import get_identity_map
+
         try:
-            country = Country.objects.get(code="AZ")
+            country = get_identity_map().get(Country, code="AZ")
         except Country.DoesNotExist:
             raise CantGetCustomerPhoneError
 
@@ -3,6 +3,7 @@ from datetime import datetime
 import pytest
 from pytest_factoryboy import register
 from django.core.management import call_command
+from django.db import transaction as db_transaction
 from django.contrib.contenttypes.models import ContentType
 
 from customer.models import User, Role
@@ -41,6 +42,22 @@ def django_db_setup(django_db_setup, django_db_blocker):
             pass
 
 
+@pytest.fixture
+def run_on_commit_callbacks(db):
+    """
+    Runs on_commit callbacks registered so far, test transactions
+    are never committed.
+    """
+
+    def run():
+        connection = db_transaction.get_connection()
+        callbacks, connection.run_on_commit = connection.run_on_commit, []
+        for sids, func in callbacks:
+            func()
+
+    return run
+
+
 @pytest.fixture
 def api_client():
     from rest_framework.test import APIClient
@@ -112,3 +129,17 @@ def customer_monitor(db):
         warehouse=factories.WarehouseFactory(),
     )
     return monitor
+
+
+@pytest.fixture
+def queue_monitor(db):
+    user = User.objects.create_staff_user(full_phone_number="qmtr", password="123")
+    user.role = Role.objects.get(type=Role.MONITOR)
+    user.save()
+    monitor = Monitor.objects.create(
+        auth=user,
+        code="QMTR1",
+        type=Monitor.FOR_QUEUE,
+        warehouse=factories.WarehouseFactory(),
+    )
+    return monitor
@@ -0,0 +1,56 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from content.cache import (
+    CONTENT_WARM_UP_DELAY,
+    CONTENT_WARM_UP_KEY,
+    warm_up_content_cache,
+    get_content_cache_stats,
+)
+from content.models import FAQCategory
+from content.tasks import warm_up_content_cache_task
+
+
+@pytest.mark.django_db
+def test_content_payloads_are_cached_and_rebuilt_on_change(
+    api_client, monkeypatch, django_assert_num_queries, run_on_commit_callbacks
+):
+    scheduled = []
+    monkeypatch.setattr(
+        warm_up_content_cache_task,
+        "apply_async",
+        lambda countdown: scheduled.append(countdown),
+    )
+    cache.delete(CONTENT_WARM_UP_KEY)
+    url = reverse("faq-category-list")
+
+    category = FAQCategory.objects.create(
+        name_az="Çatdırılma", name_ru="Доставка", name_en="Delivery"
+    )
+    run_on_commit_callbacks()  # payloads of previous test runs are invalidated
+    assert warm_up_content_cache(["http://testserver"])
+
+    stats = get_content_cache_stats()
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_ACCEPT_LANGUAGE="en")
+
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Delivery"
+    assert get_content_cache_stats()["hits"] == stats["hits"] + 1
+
+    category.name_en = "Shipping"
+    category.save()
+    category.name_ru = "Отправка"
+    category.save()
+    run_on_commit_callbacks()
+
+    # Changes are rebuilt by the warm-up that is still pending
+    assert scheduled == [CONTENT_WARM_UP_DELAY]
+    assert warm_up_content_cache_task()
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_ACCEPT_LANGUAGE="en")
+
+    assert response.json()[0]["name"] == "Shipping"
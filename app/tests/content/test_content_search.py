@@ -0,0 +1,28 @@
+import pytest
+
+from content.cache import _reverse_client_url
+from content.models import FAQ
+
+
+@pytest.mark.django_db
+def test_faq_search_results_are_ranked_and_highlighted(api_client):
+    answered = FAQ.objects.create(
+        question_en="How long does it take?",
+        answer_en="<p>Delivery from warehouses takes about a week.</p>",
+    )
+    asked = FAQ.objects.create(
+        question_en="How much does delivery cost?",
+        answer_en="<p>It depends on the weight of packages.</p>",
+    )
+    FAQ.objects.create(question_en="How to pay?", answer_en="<p>Using cards.</p>")
+
+    response = api_client.get(
+        _reverse_client_url("faq-list"), {"search": "deliv"}, HTTP_ACCEPT_LANGUAGE="en"
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    # Matches in questions rank higher than in answers
+    assert [faq["id"] for faq in results] == [asked.id, answered.id]
+    assert "<mark>Delivery</mark> from warehouses" in results[1]["headline"]
+    assert "<p>" not in results[1]["headline"]
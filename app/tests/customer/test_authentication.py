@@ -0,0 +1,106 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from knox.auth import TokenAuthentication
+from knox.models import AuthToken
+
+from customer.authentication import local_cache
+
+
+@pytest.fixture
+def customer(simple_customer):
+    simple_customer.is_active = True
+    simple_customer.save(update_fields=["is_active"])
+    return simple_customer
+
+
+def get_notification_data(api_client, token):
+    api_client.credentials(HTTP_AUTHORIZATION="Token %s" % token)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse("notification-data"))
+
+    token_queries = [query for query in queries if "knox_authtoken" in query["sql"]]
+    return response, token_queries
+
+
+@pytest.mark.django_db
+def test_verified_token_is_cached(api_client, customer):
+    _, token = AuthToken.objects.create(customer)
+
+    response, token_queries = get_notification_data(api_client, token)
+    assert response.status_code == 200
+    assert token_queries
+
+    response, token_queries = get_notification_data(api_client, token)
+    assert response.status_code == 200
+    assert not token_queries
+
+    # Redis entry is used by other processes
+    local_cache.clear()
+    response, token_queries = get_notification_data(api_client, token)
+    assert response.status_code == 200
+    assert not token_queries
+
+
+@pytest.mark.django_db
+def test_cached_token_checks_whole_token(api_client, customer):
+    _, token = AuthToken.objects.create(customer)
+    get_notification_data(api_client, token)
+
+    response, _ = get_notification_data(api_client, token[:-1] + "x")
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ["logout", "logout-all"])
+def test_cached_token_is_revoked_on_logout(api_client, customer, url_name):
+    _, token = AuthToken.objects.create(customer)
+    _, other_token = AuthToken.objects.create(customer)
+    get_notification_data(api_client, token)
+    get_notification_data(api_client, other_token)
+
+    api_client.credentials(HTTP_AUTHORIZATION="Token %s" % token)
+    assert api_client.post(reverse(url_name)).status_code == 204
+
+    response, _ = get_notification_data(api_client, token)
+    assert response.status_code == 401
+
+    response, _ = get_notification_data(api_client, other_token)
+    assert response.status_code == (200 if url_name == "logout" else 401)
+
+
+@pytest.mark.django_db
+def test_token_revoked_during_verification_is_not_cached(api_client, customer):
+    auth_token, token = AuthToken.objects.create(customer)
+    verify = TokenAuthentication.authenticate_credentials
+
+    def verify_and_logout(self, token):
+        credentials = verify(self, token)
+        # Logout request completes before the token is cached
+        auth_token.delete()
+        return credentials
+
+    with mock.patch.object(
+        TokenAuthentication, "authenticate_credentials", verify_and_logout
+    ):
+        response, _ = get_notification_data(api_client, token)
+    assert response.status_code == 200
+
+    response, _ = get_notification_data(api_client, token)
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_cached_token_of_inactive_user_is_rejected(api_client, customer):
+    _, token = AuthToken.objects.create(customer)
+    get_notification_data(api_client, token)
+
+    customer.is_active = False
+    customer.save(update_fields=["is_active"])
+
+    response, _ = get_notification_data(api_client, token)
+    assert response.status_code == 401
@@ -0,0 +1,38 @@
+import pytest
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+def test_catalogue_responses_are_cached_until_models_change(
+    api_client, product_type_factory, django_assert_num_queries, run_on_commit_callbacks
+):
+    product_type = product_type_factory(name="Shoes", is_active=True)
+    url = reverse("product-types-list", args=[product_type.category_id])
+
+    # Responses of previous test runs may still be cached
+    product_type.save()
+    run_on_commit_callbacks()
+
+    response = api_client.get(url)
+    assert response.status_code == 200
+    etag = response["ETag"]
+
+    with django_assert_num_queries(0):
+        cached_response = api_client.get(url)
+
+    assert cached_response.content == response.content
+    assert cached_response["ETag"] == etag
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+    product_type.name = "Boots"
+    product_type.save()
+    run_on_commit_callbacks()
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert response.json()[0]["name"] == "Boots"
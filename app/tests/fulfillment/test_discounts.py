@@ -1,13 +1,15 @@
 from decimal import Decimal
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from domain.services import (
     add_discounts,
     create_uncomplete_transactions_for_orders,
     revoke_discounts,
 )
-from fulfillment.models import Discount
+from fulfillment.models import Discount, Order
 
 
 @pytest.mark.django_db
@@ -192,3 +194,33 @@ def test_overdiscount_with_multiple_discounts(
     assert order.discounted_total_price == Decimal("0")
     assert order.discounted_total_price_currency == order.total_price_currency
     assert order.discounted_total_price_currency_id == order.total_price_currency_id
+
+
+@pytest.mark.django_db
+def test_discounted_totals_are_computed_with_one_query(
+    simple_customer, order_factory, currency_factory
+):
+    usd = currency_factory(code="USD")
+
+    for percentages in [[20], [20, 30], [], [33.33, 10]]:
+        order = order_factory(
+            user=simple_customer, total_price=Decimal("99.99"), total_price_currency=usd
+        )
+        add_discounts(
+            order,
+            [
+                Discount(percentage=percentage, reason=Discount.SIMPLE_DISCOUNT)
+                for percentage in percentages
+            ],
+        )
+
+    orders = Order.objects.filter(user=simple_customer).order_by("id")
+    expected = [order.discounted_total_price for order in orders]
+
+    with CaptureQueriesContext(connection) as queries:
+        prices = [
+            order.discounted_total_price for order in orders.with_discounted_total()
+        ]
+
+    assert len(queries) == 2
+    assert prices == expected
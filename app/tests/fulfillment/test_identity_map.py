@@ -0,0 +1,92 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.converter import Converter
+from core.models import Currency
+from domain.middleware import identity_map_middleware
+from domain.utils.identity_map import get_identity_map, identity_map_scope
+from ontime.celery import app
+
+
+@app.task
+def load_currency_twice(code):
+    identity_map = get_identity_map()
+    identity_map.get(Currency, code=code)
+    identity_map.get(Currency, code=code)
+    return identity_map is get_identity_map(), identity_map.stats["core.Currency"]
+
+
+@pytest.mark.django_db
+def test_reference_rows_are_loaded_once_per_scope(
+    currency_factory, django_assert_num_queries
+):
+    eur = currency_factory(code="EUR")
+
+    with identity_map_scope() as identity_map:
+        with django_assert_num_queries(2):  # currency and base currency
+            for _ in range(10):
+                assert Converter.convert(10, "EUR", "EUR") == 10
+
+        with django_assert_num_queries(0):
+            assert get_identity_map().get(Currency, id=eur.id) is identity_map.get(
+                Currency, code="EUR"
+            )
+
+        with pytest.raises(Currency.DoesNotExist):
+            identity_map.get(Currency, code="XXX")
+
+        assert identity_map.stats["core.Currency"] == {"hits": 30, "misses": 3}
+
+    with django_assert_num_queries(1):
+        get_identity_map().get(Currency, code="EUR")
+
+
+@pytest.mark.django_db
+def test_saved_reference_rows_are_loaded_again(currency_factory):
+    currency_factory(code="EUR", rate=2)
+
+    with identity_map_scope() as identity_map:
+        eur = identity_map.get(Currency, code="EUR")
+
+        Currency.objects.filter(pk=eur.pk).first().save()
+        reloaded_eur = identity_map.get(Currency, code="EUR")
+
+        assert reloaded_eur is not eur
+        assert identity_map.get(Currency, pk=eur.pk) is reloaded_eur
+
+
+@pytest.mark.django_db
+def test_identity_map_stats_are_reported_in_debug_mode(settings, currency_factory):
+    currency_factory(code="EUR")
+
+    def get_response(request):
+        get_identity_map().get(Currency, code="EUR")
+        get_identity_map().get(Currency, code="EUR")
+        return HttpResponse()
+
+    middleware = identity_map_middleware(get_response)
+
+    settings.DEBUG = False
+    assert "X-Identity-Map" not in middleware(RequestFactory().get("/"))
+
+    settings.DEBUG = True
+    response = middleware(RequestFactory().get("/"))
+    assert response["X-Identity-Map"] == "core.Currency hits=1 misses=1"
+
+
+@pytest.mark.django_db
+def test_tasks_keep_loaded_rows_until_they_finish(currency_factory):
+    currency_factory(code="EUR")
+
+    is_scoped, stats = load_currency_twice.apply(args=["EUR"]).get()
+
+    assert is_scoped
+    assert stats == {"hits": 1, "misses": 1}
+    # Scope of the task is exited
+    assert get_identity_map() is not get_identity_map()
+
+    with identity_map_scope() as identity_map:
+        load_currency_twice.apply(args=["EUR"])
+        # Tasks run eagerly inside a scope share its identity map
+        assert identity_map.stats["core.Currency"] == {"hits": 1, "misses": 1}
@@ -1,14 +1,19 @@
 from decimal import Decimal
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from domain.services import (
     generate_promo_code,
     can_get_promo_code_cashbacks,
     complete_payments,
     get_consumers_for_promo_code,
+    settle_invite_friend_cashbacks,
 )
+from domain.utils.balance import get_balance_resolver
 from domain.exceptions.customer import InvalidPromoCode
+from customer.models import User, Balance
 from fulfillment.models import PromoCode, Transaction
 from fulfillment.tasks import apply_cashbacks_to_promo_code_owner_task
 
@@ -517,3 +522,57 @@ def test_non_invite_friend_cashback_updated_after_changing_transaction_amount(
     cb_trans.refresh_from_db()
 
     assert cb_trans.amount == Decimal("20")
+
+
+@pytest.mark.django_db
+def test_cashbacks_of_many_consumers_are_settled_in_bulk(
+    shipment_factory, usd, dummy_conf, transaction_factory, promo_code_factory
+):
+    promo_code = promo_code_factory()
+    owner = promo_code.user
+    old_balance = owner.active_balance.amount
+
+    def pay(count):
+        cashbacks = []
+
+        for _ in range(count):
+            consumer = User.objects.create_user(
+                full_phone_number="+9945500%05d" % User.objects.count(),
+                password="123",
+            )
+            Balance.objects.create(user=consumer, currency=usd, amount=1000)
+            promo_code.register(consumer)
+            shipment = shipment_factory(user=consumer, is_paid=False)
+            transaction = transaction_factory(
+                currency=usd,
+                amount=100,
+                related_object=shipment,
+                completed=False,
+                user=consumer,
+            )
+            transaction = complete_payments(
+                [transaction], override_type=Transaction.BALANCE
+            )
+            cashbacks += transaction.cashbacks.filter(
+                completed=True, extra__invite_friend_cashback=True
+            ).select_related("currency", "user__registered_promo_code__user")
+
+        with CaptureQueriesContext(connection) as queries:
+            settled = settle_invite_friend_cashbacks(cashbacks)
+
+        assert len(settled) == count
+        return len(queries)
+
+    assert pay(2) == pay(5)
+
+    cashback = Decimal("100") * dummy_conf.invite_friend_cashback_percentage / 100
+    assert (
+        owner.transactions.filter(
+            purpose=Transaction.CASHBACK, cashback_to__isnull=True
+        ).count()
+        == 7
+    )
+    assert get_balance_resolver().get_balance(owner, usd).amount == (
+        old_balance + 7 * cashback
+    )
+    assert not promo_code.used_benefits.filter(used_by_owner=False).exists()
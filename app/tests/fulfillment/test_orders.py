@@ -3,8 +3,17 @@ from decimal import Decimal
 import pytest
 from django.urls import reverse
 
-from fulfillment.models import Transaction, Order, Status, Discount
+from customer.models import User
+from fulfillment.models import (
+    Transaction,
+    Order,
+    Status,
+    Discount,
+    Assignment,
+    ShoppingAssistantProfile,
+)
 from domain.services import (
+    assign_orders_to_assistants_in_batch,
     set_remainder_price,
     approve_remainder_price,
     create_uncomplete_transactions_for_orders,
@@ -103,7 +112,7 @@ def test_payments_view_after_adding_remainder_transaction(
 
     data = response.data
 
-    assert data["count"] == 2, "Two transactions must be created"
+    assert len(data["results"]) == 2, "Two transactions must be created"
     assert (
         Decimal(data["results"][0]["amount"]) == 10
     ), "Remainder transaction must be latest and 10 USD"
@@ -402,3 +411,33 @@ def test_preventing_real_price_updating_when_paid_order_updated(
 
     assert order.real_product_price == 100
     assert order.real_cargo_price == 50
+
+
+@pytest.mark.django_db
+def test_batch_assignment_balances_assistants_workload(
+    simple_customer, order_factory, country_factory
+):
+    country = country_factory()
+    busy_assistant, free_assistant = [
+        ShoppingAssistantProfile.objects.create(
+            user=User.objects.create_staff_user(full_phone_number=phone, password="123")
+        )
+        for phone in ["assistant1", "assistant2"]
+    ]
+    for assistant in [busy_assistant, free_assistant]:
+        assistant.countries.add(country)
+
+    Assignment.objects.create(
+        assistant_profile=busy_assistant,
+        order=order_factory(source_country=country, user=simple_customer),
+    )
+    orders = [
+        order_factory(source_country=country, user=simple_customer) for _ in range(5)
+    ]
+
+    assignments = assign_orders_to_assistants_in_batch(orders)
+
+    assert len(assignments) == 5
+    assert busy_assistant.assignments.count() == 3
+    assert free_assistant.assignments.count() == 3
+    assert assignments[0].assistant_profile_id == free_assistant.id
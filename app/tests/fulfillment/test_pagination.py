@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from fulfillment.models import Notification
+
+
+@pytest.fixture
+def notifications(simple_customer):
+    now = timezone.now()
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(
+                user=simple_customer,
+                type=Notification.OTHER,
+                is_seen=index % 3 == 0,
+            )
+            for index in range(12)
+        ]
+    )
+    # Pairs of notifications are created at the same time
+    for index, notification in enumerate(notifications):
+        Notification.objects.filter(pk=notification.pk).update(
+            created_at=now - timedelta(minutes=index // 2)
+        )
+
+    return list(
+        Notification.objects.filter(user=simple_customer).order_by(
+            "is_seen", "-created_at", "-id"
+        )
+    )
+
+
+def get_ids(response):
+    return [notification["id"] for notification in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_walks_pages_both_ways(
+    api_client, simple_customer, notifications
+):
+    api_client.force_authenticate(simple_customer)
+    url = reverse("notification-list") + "?limit=5"
+    expected_ids = [notification.id for notification in notifications]
+    pages = []
+
+    while url:
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url)
+
+        assert response.status_code == 200
+        assert response.data["count"] is None
+        assert not any("COUNT(" in query["sql"] for query in queries)
+        pages.append(get_ids(response))
+        url = response.data["next"]
+
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert sum(pages, []) == expected_ids
+
+    url = response.data["previous"]
+    previous_pages = []
+
+    while url:
+        response = api_client.get(url)
+        previous_pages.append(get_ids(response))
+        url = response.data["previous"]
+
+    assert previous_pages == pages[-2::-1]
+    assert response.data["next"] is not None
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_returns_estimated_count(
+    api_client, simple_customer, notifications
+):
+    api_client.force_authenticate(simple_customer)
+    response = api_client.get(reverse("notification-list"), {"count": "", "limit": 5})
+
+    assert response.status_code == 200
+    assert isinstance(response.data["count"], int)
+    assert "count" not in response.data["next"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cursor", ["invalid", "W3RydWUsIFtdXQ=="])
+def test_keyset_pagination_rejects_invalid_cursor(
+    api_client, simple_customer, notifications, cursor
+):
+    api_client.force_authenticate(simple_customer)
+    response = api_client.get(reverse("notification-list"), {"cursor": cursor})
+
+    assert response.status_code == 404
@@ -1,14 +1,41 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
 import pytest
+from django.urls import reverse
+from django.db import connection
+from django.db import transaction as db_transaction
+from django.contrib.admin.models import LogEntry
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from domain.services import (
+    roll_up_balances,
+    get_balance_amount_at,
     create_uncomplete_transactions_for_orders,
     complete_payments,
     merge_transactions,
+    get_transaction_descendants,
     transactions_are_mergable,
     make_objects_paid,
+    remove_from_parents,
 )
+from cybersource.secure_acceptance import SecureAcceptanceClient
 from domain.exceptions.payment import PaymentError
-from fulfillment.models import Notification, Transaction, Status
+from domain.utils.balance import balance_resolver_scope, get_balance_resolver
+from domain.utils.invoice_cache import INVOICE_VERSION_KEY
+from domain.utils.income import roll_up_income, get_income_report
+from domain.utils.payment_callbacks import (
+    ingest_payment_callback,
+    process_payment_callback,
+)
+from core.models import Configuration, CurrencyRateLog
+from customer.models import Balance, BalanceEntry
+from fulfillment.models import Notification, Transaction, Status, PaymentCallback
 
 
 @pytest.mark.django_db
@@ -496,6 +523,50 @@ def test_remerge_children_of_merged_transaction(
     assert child2.parent_id == new_parent.id
 
 
+@pytest.mark.django_db
+def test_invoices_are_invalidated_by_bulk_transaction_changes(
+    rich_customer,
+    shipment_factory,
+    transaction_factory,
+    currency_factory,
+    run_on_commit_callbacks,
+):
+    usd = currency_factory(code="USD")
+    shipments = [shipment_factory(user=rich_customer, is_paid=False) for _ in range(2)]
+    children = [
+        transaction_factory(
+            user=rich_customer,
+            currency=usd,
+            amount=25,
+            completed=False,
+            related_object=shipment,
+        )
+        for shipment in shipments
+    ]
+
+    def get_versions():
+        run_on_commit_callbacks()
+        return [
+            cache.get(INVOICE_VERSION_KEY % ("fulfillment.shipment", shipment.pk), 0)
+            for shipment in shipments
+        ]
+
+    versions = get_versions()
+
+    _merge_transactions(children)
+    assert all(new > old for new, old in zip(get_versions(), versions))
+    versions = get_versions()
+
+    for child in children:
+        child.refresh_from_db()
+    remove_from_parents(children[:1])
+    assert all(new > old for new, old in zip(get_versions(), versions))
+    versions = get_versions()
+
+    make_objects_paid(shipments)
+    assert all(new > old for new, old in zip(get_versions(), versions))
+
+
 @pytest.mark.django_db
 def test_pay_child_transaction_along_with_its_parent(
     rich_customer, transaction_factory, currency_factory
@@ -634,6 +705,32 @@ def test_make_single_object_paid_with_multiple_transactions(
     assert tr2.completed_manually == True
 
 
+@pytest.mark.django_db
+def test_make_objects_paid_runs_fixed_number_of_queries(
+    shipment_factory, order_factory, transaction_factory, simple_customer
+):
+    def make_paid(count):
+        instances = []
+
+        for _ in range(count):
+            shipment = shipment_factory(is_paid=False, user=simple_customer)
+            order = order_factory(is_paid=False, user=simple_customer)
+            for instance in [shipment, order]:
+                transaction_factory(
+                    user=simple_customer, related_object=instance, completed=False
+                )
+            instances += [shipment, order]
+
+        with CaptureQueriesContext(connection) as queries:
+            make_objects_paid(instances, user_id=simple_customer.id)
+
+        return len(queries)
+
+    assert make_paid(2) == make_paid(5)
+    assert not Transaction.objects.filter(completed=False).exists()
+    assert LogEntry.objects.filter(user=simple_customer).count() == 14
+
+
 @pytest.mark.django_db
 def test_balance_addition_using_transaction(
     simple_customer, transaction_factory, currency_factory
@@ -653,3 +750,349 @@ def test_balance_addition_using_transaction(
     new_balance = simple_customer.active_balance.amount
 
     assert new_balance == old_balance + 100
+
+
+@pytest.mark.django_db
+def test_balance_is_resolved_once_per_scope(rich_customer, django_assert_num_queries):
+    with balance_resolver_scope():
+        with django_assert_num_queries(2):  # currency and balance
+            balance = rich_customer.active_balance
+            for _ in range(10):
+                assert rich_customer.active_balance is balance
+
+        get_balance_resolver().change_amount(balance, -100)
+
+        assert rich_customer.active_balance is balance
+        assert balance.amount == 9900
+
+    with django_assert_num_queries(2):
+        assert rich_customer.active_balance.amount == 9900
+
+
+@pytest.mark.django_db
+def test_balance_changed_in_rolled_back_savepoint_is_loaded_again(rich_customer):
+    with balance_resolver_scope():
+        balance = rich_customer.active_balance
+
+        with db_transaction.atomic():
+            get_balance_resolver().change_amount(balance, -100)
+
+        try:
+            with db_transaction.atomic():
+                get_balance_resolver().change_amount(balance, -200)
+                raise ValueError
+        except ValueError:
+            pass
+
+        reloaded_balance = rich_customer.active_balance
+        assert reloaded_balance is not balance
+        assert reloaded_balance.amount == 9900
+        assert rich_customer.active_balance is reloaded_balance
+
+
+@pytest.mark.django_db
+def test_balance_ledger_roll_up(rich_customer):
+    balance = rich_customer.active_balance
+    resolver = get_balance_resolver()
+    resolver.change_amount(balance, -100)
+    resolver.change_amounts([(balance, 50, None), (balance, 25, None)])
+
+    # Materialized amount is not touched until roll-up
+    assert Balance.objects.get(id=balance.id).amount == 10000
+    balance.refresh_from_db()
+    assert balance.amount == 9975
+
+    before_roll_up = timezone.now()
+    assert roll_up_balances() == 3
+    assert roll_up_balances() == 0
+
+    assert Balance.objects.get(id=balance.id).amount == 9975
+    assert not BalanceEntry.objects.filter(snapshot__isnull=True).exists()
+
+    resolver.change_amount(balance, -975)
+    assert rich_customer.active_balance.amount == 9000
+    assert get_balance_amount_at(balance, before_roll_up) == 9975
+    assert get_balance_amount_at(balance, timezone.now()) == 9000
+
+
+@pytest.mark.django_db
+def test_saving_balance_keeps_entries_rolled_up_after_loading(rich_customer):
+    balance = rich_customer.active_balance
+    get_balance_resolver().change_amount(balance, -100)
+    balance.refresh_from_db()
+    assert balance.amount == 9900
+
+    roll_up_balances()
+    balance.save()
+
+    assert Balance.objects.get(id=balance.id).amount == 9900
+    balance.refresh_from_db()
+    assert balance.amount == 9900
+
+
+@pytest.mark.django_db
+def test_transaction_tree_is_loaded_with_one_query(
+    rich_customer, transaction_factory, currency_factory, django_assert_num_queries
+):
+    usd = currency_factory(code="USD")
+    root = transaction_factory(
+        user=rich_customer, purpose=Transaction.MERGED, currency=usd, completed=False
+    )
+    child = transaction_factory(
+        user=rich_customer, parent=root, currency=usd, completed=False
+    )
+    nested = transaction_factory(
+        user=rich_customer, parent=child, currency=usd, completed=False
+    )
+    deeply_nested = transaction_factory(
+        user=rich_customer, parent=nested, currency=usd, completed=False
+    )
+    sibling = transaction_factory(
+        user=rich_customer, parent=root, currency=usd, completed=False
+    )
+
+    with django_assert_num_queries(1):
+        descendants = get_transaction_descendants([root])
+
+    assert [t.id for t in descendants] == [
+        child.id,
+        nested.id,
+        deeply_nested.id,
+        sibling.id,
+    ]
+
+
+@pytest.mark.django_db
+def test_merged_payment_completes_in_constant_number_of_queries(
+    rich_customer, transaction_factory, currency_factory
+):
+    usd = currency_factory(code="USD")
+
+    def pay_merged(count):
+        transactions = [
+            transaction_factory(
+                user=rich_customer, amount=1, currency=usd, completed=False
+            )
+            for _ in range(count)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            complete_payments(transactions, override_type=Transaction.BALANCE)
+
+        for transaction in transactions:
+            transaction.refresh_from_db()
+            assert transaction.completed
+
+        return len(queries)
+
+    assert pay_merged(3) == pay_merged(30)
+
+
+@pytest.mark.django_db
+def test_payment_list_runs_fixed_number_of_queries(
+    api_client, rich_customer, shipment_factory, order_factory, transaction_factory
+):
+    api_client.force_authenticate(rich_customer)
+
+    def create_payments(count):
+        for _ in range(count):
+            shipment = shipment_factory(user=rich_customer)
+            transaction_factory(
+                user=rich_customer,
+                purpose=Transaction.SHIPMENT_PAYMENT,
+                related_object=shipment,
+            )
+            order = order_factory(user=rich_customer)
+            transaction_factory(
+                user=rich_customer,
+                purpose=Transaction.ORDER_PAYMENT,
+                related_object=order,
+            )
+
+    def list_payments():
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse("payment-list"))
+
+        assert all(payment["object"] for payment in response.data["results"])
+        return len(queries)
+
+    create_payments(1)
+    queries_count = list_payments()
+
+    create_payments(4)
+    assert list_payments() == queries_count
+
+
+@pytest.mark.django_db
+def test_income_is_rolled_up_per_service_and_currency(
+    simple_customer, transaction_factory, currency_factory
+):
+    usd = currency_factory(code="USD", rate=1)
+    lira = currency_factory(code="TRY", rate=Decimal("0.5"))
+    # Rate at the moment of payment must be used, not the current one
+    CurrencyRateLog.objects.create(currency=lira, rate=Decimal("0.2"))
+
+    def pay(payment_service, response, **kwargs):
+        kwargs.setdefault("amount", 100)
+        transaction_factory(
+            user=simple_customer,
+            currency=usd,
+            type=Transaction.CARD,
+            payment_service=payment_service,
+            payment_service_response_json=response,
+            completed_at=timezone.now(),
+            **kwargs,
+        )
+
+    pay(
+        Transaction.PAYPAL_SERVICE,
+        {
+            "capture_response": {
+                "purchase_units": [
+                    {
+                        "payments": {
+                            "captures": [
+                                {"amount": {"value": "10.00", "currency_code": "USD"}},
+                                {"amount": {"value": "5.00", "currency_code": "USD"}},
+                            ]
+                        }
+                    }
+                ]
+            }
+        },
+    )
+    pay(Transaction.CYBERSOURCE_SERVICE, {"req_amount": "20", "req_currency": "USD"})
+    pay(Transaction.PAYTR_SERVICE, {"payment_amount": "5000"})
+    # Card part of the transaction is used when response has no amount
+    pay(
+        Transaction.PAYTR_SERVICE,
+        {},
+        amount=30,
+        is_partial=True,
+        from_balance_amount=10,
+        from_balance_currency=usd,
+    )
+
+    today = timezone.localdate()
+    assert roll_up_income(today) == 4
+
+    report = {
+        (row.payment_service, row.currency_id): row
+        for row in get_income_report(today, today, period="month")
+    }
+
+    assert report[(Transaction.PAYPAL_SERVICE, usd.id)].amount == 15
+    assert report[(Transaction.CYBERSOURCE_SERVICE, usd.id)].amount == 20
+    assert report[(Transaction.PAYTR_SERVICE, lira.id)].amount == 50
+    assert report[(Transaction.PAYTR_SERVICE, lira.id)].base_amount == 10
+    assert report[(Transaction.PAYTR_SERVICE, usd.id)].amount == 20
+    assert sum(row.transactions_count for row in report.values()) == 4
+
+
+@pytest.mark.django_db
+def test_income_of_past_dates_is_backfilled(
+    simple_customer, transaction_factory, currency_factory
+):
+    usd = currency_factory(code="USD", rate=1)
+    paid_at = timezone.now() - timedelta(days=400)
+    transaction_factory(
+        user=simple_customer,
+        currency=usd,
+        amount=100,
+        type=Transaction.CARD,
+        completed_at=paid_at,
+    )
+    out = StringIO()
+
+    call_command("backfill_income_summary", stdout=out)
+
+    paid_on = timezone.localtime(paid_at).date()
+    (row,) = get_income_report(paid_on, paid_on)
+    assert row.amount == 100
+    assert row.transactions_count == 1
+    # Rolled up month by month
+    assert out.getvalue().count("Rolled up") >= 13
+
+
+@pytest.mark.django_db
+def test_payment_callbacks_are_deduplicated_and_processed_once(
+    rich_customer, transaction_factory, currency_factory
+):
+    usd = currency_factory(code="USD")
+    currency_factory(code="TRY")
+    transaction = transaction_factory(
+        user=rich_customer,
+        type=Transaction.CARD,
+        payment_service=Transaction.PAYTR_SERVICE,
+        amount=100,
+        currency=usd,
+        completed=False,
+    )
+
+    def ingest(status):
+        return ingest_payment_callback(
+            Transaction.PAYTR_SERVICE,
+            "%s:%s" % (transaction.id, status),
+            {
+                "merchant_oid": str(transaction.id),
+                "status": status,
+                "payment_amount": "10000",
+            },
+            transaction=transaction,
+        )
+
+    failed, created = ingest("failed")
+    assert created
+    callback, created = ingest("success")
+    assert created
+    # Retry of the same callback by the payment service
+    retried, created = ingest("success")
+    assert not created and retried == callback
+
+    assert process_payment_callback(failed.id).status == PaymentCallback.DECLINED
+    transaction.refresh_from_db()
+    assert not transaction.completed
+    assert transaction.payment_service_response_json["status"] == "failed"
+
+    assert process_payment_callback(callback.id).status == PaymentCallback.COMPLETED
+    transaction.refresh_from_db()
+    assert transaction.completed
+    assert transaction.payment_service_response_json["status"] == "success"
+
+    # Already processed callbacks are skipped
+    assert process_payment_callback(callback.id) is None
+    callback.refresh_from_db()
+    assert callback.attempts == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("decision", ["ACCEPT", "DECLINE", "CANCEL"])
+def test_only_accepted_cybersource_payments_are_completed(
+    api_client, rich_customer, transaction_factory, currency_factory, decision
+):
+    transaction = transaction_factory(
+        user=rich_customer,
+        type=Transaction.CARD,
+        payment_service=Transaction.CYBERSOURCE_SERVICE,
+        amount=100,
+        currency=currency_factory(code="USD"),
+        completed=False,
+    )
+    data = {
+        "decision": decision,
+        "transaction_id": "cs-%s" % transaction.id,
+        "req_reference_number": str(transaction.id),
+        "req_transaction_uuid": transaction.invoice_number,
+    }
+    Configuration.objects.update(cybersource_redirect_url="https://ontime.test/")
+
+    with mock.patch.object(
+        SecureAcceptanceClient, "is_response_valid", return_value=True
+    ):
+        response = api_client.post(reverse("cybersource-result"), data)
+
+    accepted = decision == "ACCEPT"
+    assert response.status_code == 302
+    assert ("status=%d" % accepted) in response.url
+    assert PaymentCallback.objects.filter(transaction=transaction).exists() == accepted
+    transaction.refresh_from_db()
+    assert transaction.payment_service_response_json["decision"] == decision
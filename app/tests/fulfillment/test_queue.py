@@ -1,7 +1,24 @@
+import asyncio
+from datetime import timedelta
+from unittest import mock
+
 import pytest
+from asgiref.sync import async_to_sync
 from django.urls import reverse
+from django.utils import timezone
+from knox.models import AuthToken
 
-from fulfillment.models import QueuedItem, Queue
+from ontime.events import (
+    EVENTS_PATH,
+    SUBSCRIBER_QUEUE_SIZE,
+    TICKET_KEY,
+    Subscriber,
+    events_application,
+    reader,
+)
+from customer.models import User, Role
+from domain.utils import QueueClient
+from fulfillment.models import QueuedItem, Queue, WarehousemanProfile
 
 
 @pytest.mark.django_db
@@ -13,3 +30,278 @@ def test_customer_service_reservation(customer_monitor, api_client):
     assert response.status_code == 200
 
     assert QueuedItem.objects.count() == 1, "One queued item must be created"
+
+
+@pytest.mark.django_db
+def test_queue_events_are_sent_after_commit_in_one_pipeline(
+    warehouse_factory, run_on_commit_callbacks
+):
+    redis_client = mock.MagicMock()
+    client = QueueClient(redis_client=redis_client)
+    item = QueuedItem.objects.create(warehouse=warehouse_factory(), code="001")
+
+    with client.batch():
+        client.publish_assignable_item(item)
+        client.publish_assigned_item(item, to_monitor=True, to_dashboard=False)
+
+    redis_client.pipeline.assert_not_called()
+
+    run_on_commit_callbacks()
+
+    redis_client.pipeline.assert_called_once()
+    pipeline = redis_client.pipeline.return_value
+    assert pipeline.publish.call_count == 2
+    pipeline.execute.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_queue_events_are_dropped_when_batch_fails(
+    warehouse_factory, run_on_commit_callbacks
+):
+    redis_client = mock.MagicMock()
+    client = QueueClient(redis_client=redis_client)
+    item = QueuedItem.objects.create(warehouse=warehouse_factory(), code="001")
+
+    with pytest.raises(ValueError):
+        with client.batch():
+            client.publish_assignable_item(item)
+            raise ValueError
+
+    run_on_commit_callbacks()
+
+    redis_client.pipeline.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_queue_events_of_outer_batch_are_kept_when_nested_batch_fails(
+    warehouse_factory, run_on_commit_callbacks
+):
+    redis_client = mock.MagicMock()
+    client = QueueClient(redis_client=redis_client)
+    item = QueuedItem.objects.create(warehouse=warehouse_factory(), code="001")
+
+    with client.batch():
+        client.publish_assignable_item(item)
+
+        try:
+            with client.batch():
+                client.publish_assigned_item(item, to_monitor=True, to_dashboard=False)
+                raise ValueError
+        except ValueError:
+            pass
+
+    run_on_commit_callbacks()
+
+    pipeline = redis_client.pipeline.return_value
+    assert pipeline.publish.call_count == 1
+
+
+@pytest.mark.django_db
+def test_monitor_lists_only_todays_items_of_its_warehouse(
+    queue_monitor, warehouse_factory, api_client
+):
+    api_client.force_authenticate(queue_monitor.auth)
+    todays_item = QueuedItem.objects.create(
+        warehouse=queue_monitor.warehouse, code="001"
+    )
+    old_item = QueuedItem.objects.create(warehouse=queue_monitor.warehouse, code="002")
+    QueuedItem.objects.filter(id=old_item.id).update(
+        created_at=timezone.now() - timedelta(days=2)
+    )
+    QueuedItem.objects.create(warehouse=warehouse_factory(), code="003")
+
+    response = api_client.get(reverse("monitor-item-list"))
+
+    assert response.status_code == 200
+    assert response.data["reset"] is False
+    assert [item["id"] for item in response.data["items"]] == [todays_item.id]
+    assert response["X-Last-Event-Id"] == (response.data["last_event_id"] or "")
+
+
+@pytest.mark.django_db
+def test_monitor_receives_only_events_since_last_seen_one(
+    queue_monitor, api_client, run_on_commit_callbacks
+):
+    api_client.force_authenticate(queue_monitor.auth)
+    warehouse = queue_monitor.warehouse
+    client = QueueClient()
+    client.redis_client.delete(QueueClient.EVENT_STREAM % warehouse.id)
+
+    first_item = QueuedItem.objects.create(warehouse=warehouse, code="001")
+    client.publish_assigned_item(first_item, to_dashboard=False)
+    run_on_commit_callbacks()
+    since = client.get_last_event_id(warehouse.id)
+
+    second_item = QueuedItem.objects.create(warehouse=warehouse, code="002")
+    client.publish_assigned_item(second_item, to_dashboard=False)
+    run_on_commit_callbacks()
+
+    response = api_client.get(reverse("monitor-item-list"), {"since": since})
+
+    assert response.status_code == 200
+    assert response.data["reset"] is False
+    assert [event["item"]["id"] for event in response.data["events"]] == [
+        second_item.id
+    ]
+    assert response.data["last_event_id"] == client.get_last_event_id(warehouse.id)
+
+
+@pytest.mark.django_db
+def test_monitor_reloads_items_when_events_are_trimmed(
+    queue_monitor, api_client, run_on_commit_callbacks
+):
+    api_client.force_authenticate(queue_monitor.auth)
+    warehouse = queue_monitor.warehouse
+    client = QueueClient()
+    client.redis_client.delete(QueueClient.EVENT_STREAM % warehouse.id)
+
+    item = QueuedItem.objects.create(warehouse=warehouse, code="001")
+    client.publish_assigned_item(item, to_dashboard=False)
+    run_on_commit_callbacks()
+
+    response = api_client.get(reverse("monitor-item-list"), {"since": "1-0"})
+
+    assert response.status_code == 200
+    assert response.data["reset"] is True
+    assert [i["id"] for i in response.data["items"]] == [item.id]
+
+
+def connect_to_events_gateway(query_string, headers=(), events_count=1):
+    messages = []
+
+    async def receive():
+        while len(messages) < events_count + 1:
+            await asyncio.sleep(0.01)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    async def connect():
+        scope = {
+            "type": "http",
+            "path": EVENTS_PATH,
+            "query_string": query_string.encode(),
+            "headers": list(headers),
+        }
+        await events_application(scope, receive, send)
+        if reader._task:
+            await reader._task
+
+    # Test database connection must stay open, like in Django test client
+    with mock.patch("ontime.events.close_old_connections"):
+        async_to_sync(connect)()
+
+    return messages
+
+
+@pytest.fixture
+def warehouseman(warehouse_factory):
+    warehouse = warehouse_factory()
+    user = User.objects.create_staff_user(full_phone_number="whman", password="123")
+    user.role = Role.objects.get(type=Role.WAREHOUSEMAN)
+    user.save()
+    WarehousemanProfile.objects.create(user=user, warehouse=warehouse)
+    return user
+
+
+@pytest.mark.django_db
+def test_events_gateway_replays_missed_events_of_users_role(
+    warehouseman, api_client, run_on_commit_callbacks
+):
+    warehouse = warehouseman.warehouseman_profile.warehouse
+    api_client.force_authenticate(warehouseman)
+    response = api_client.post(reverse("staff-events-ticket"))
+    ticket = response.data["ticket"]
+
+    client = QueueClient()
+    client.redis_client.delete(QueueClient.EVENT_STREAM % warehouse.id)
+    seen_item = QueuedItem.objects.create(
+        warehouse=warehouse, code="001", user=warehouseman
+    )
+    client.publish_assignable_item(seen_item)
+    run_on_commit_callbacks()
+    since = client.get_last_event_id(warehouse.id)
+
+    missed_item = QueuedItem.objects.create(
+        warehouse=warehouse, code="002", user=warehouseman
+    )
+    with client.batch():
+        client.publish_assigned_item(missed_item, to_dashboard=False)
+        client.publish_assignable_item(missed_item)
+    run_on_commit_callbacks()
+
+    messages = connect_to_events_gateway(
+        "ticket=%s" % ticket, [(b"last-event-id", since.encode())]
+    )
+    start, body = messages
+
+    assert start["status"] == 200
+    # Monitor event is not sent to warehouseman
+    assert body["body"].startswith(
+        (
+            "id: %s\nevent: warehouseman_notification\n"
+            % client.get_last_event_id(warehouse.id)
+        ).encode()
+    )
+
+
+@pytest.mark.django_db
+def test_events_gateway_accepts_reconnects_with_the_same_ticket(
+    warehouseman, api_client, run_on_commit_callbacks
+):
+    warehouse = warehouseman.warehouseman_profile.warehouse
+    api_client.force_authenticate(warehouseman)
+    ticket = api_client.post(reverse("staff-events-ticket")).data["ticket"]
+
+    client = QueueClient()
+    client.redis_client.delete(QueueClient.EVENT_STREAM % warehouse.id)
+    item = QueuedItem.objects.create(warehouse=warehouse, code="001", user=warehouseman)
+    client.publish_assignable_item(item)
+    run_on_commit_callbacks()
+    since = client.get_last_event_id(warehouse.id)
+
+    start, *_ = connect_to_events_gateway("ticket=%s" % ticket, events_count=0)
+    assert start["status"] == 200
+
+    client.publish_assignable_item(item)
+    run_on_commit_callbacks()
+
+    # EventSource reconnects with the same url and id of the last event
+    start, body = connect_to_events_gateway(
+        "ticket=%s" % ticket, [(b"last-event-id", since.encode())]
+    )
+    assert start["status"] == 200
+    assert body["body"].startswith(
+        ("id: %s\n" % client.get_last_event_id(warehouse.id)).encode()
+    )
+    assert client.redis_client.ttl(TICKET_KEY % ticket) > 0
+
+    client.redis_client.delete(TICKET_KEY % ticket)
+    start, *_ = connect_to_events_gateway("ticket=%s" % ticket, events_count=0)
+    assert start["status"] == 403
+
+
+def test_events_gateway_subscriber_is_closed_when_queue_overflows():
+    subscriber = Subscriber(1, None)
+
+    for i in range(SUBSCRIBER_QUEUE_SIZE):
+        assert subscriber.push(("%s-0" % i, "channel", "{}"))
+
+    assert not subscriber.push(("overflow-0", "channel", "{}"))
+    assert subscriber.overflowed
+    assert subscriber.queue.qsize() == 1
+    assert subscriber.queue.get_nowait() is None
+
+
+@pytest.mark.django_db
+def test_events_gateway_authenticates_by_header_not_query_token(warehouseman):
+    _, token = AuthToken.objects.create(warehouseman)
+
+    start, *_ = connect_to_events_gateway("token=%s" % token, events_count=0)
+    assert start["status"] == 403
+
+    start, *_ = connect_to_events_gateway(
+        "", [(b"authorization", ("Token %s" % token).encode())]
+    )
+    assert start["status"] == 200
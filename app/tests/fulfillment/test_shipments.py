@@ -1,15 +1,26 @@
 from pprint import pprint
-from datetime import datetime
+from unittest import mock
+from datetime import datetime, timedelta
+from decimal import Decimal
 
 import pytest
 from django.urls import reverse
 from django import utils
+from django.db import transaction as db_transaction
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
 
 from domain.services import (
     create_uncomplete_transaction_for_shipment,
     confirm_shipment_properties,
+    promote_status_bulk,
+    get_serialized_invoice,
+    calculate_monthly_spendings_in_bulk,
 )
-from fulfillment.models import Transaction
+from domain.utils.monthly_spendings import get_monthly_spendings_key
+from core.models import Configuration
+from customer.models import Recipient
+from fulfillment.models import Transaction, Status, StatusEvent, Discount, Product
 
 
 @pytest.mark.django_db
@@ -94,3 +105,306 @@ def test_updating_status_update_time_when_confirming(
     confirm_shipment_properties(shipment)
     new_time = shipment.status_last_update_time
     assert new_time > old_time
+
+
+@pytest.mark.django_db
+def test_promote_shipment_statuses_in_bulk(
+    simple_customer, shipment_factory, django_assert_max_num_queries
+):
+    processing = Status.objects.get(type=Status.SHIPMENT_TYPE, codename="processing")
+    ontheway = Status.objects.get(type=Status.SHIPMENT_TYPE, codename="ontheway")
+    shipments = [
+        shipment_factory(user=simple_customer, status=processing, is_paid=True)
+        for _ in range(5)
+    ]
+    source_warehouse = shipments[0].source_warehouse
+    for shipment in shipments[1:]:
+        shipment.source_warehouse = source_warehouse
+        shipment.save(update_fields=["source_warehouse"])
+
+    with django_assert_max_num_queries(12):
+        promoted, skipped = promote_status_bulk(shipments, to_status=ontheway)
+
+    assert len(promoted) == 5
+    assert skipped == []
+    for shipment in shipments:
+        shipment.refresh_from_db()
+        assert shipment.status_id == ontheway.id
+
+        event = StatusEvent.objects.get(shipment=shipment)
+        assert event.from_status_id == processing.id
+        assert event.to_status_id == ontheway.id
+        assert source_warehouse.city.name in event.message_en
+        assert source_warehouse.city.name in event.message_az
+
+
+@pytest.mark.django_db
+def test_promote_shipment_statuses_in_bulk_skips_unpaid_final(
+    simple_customer, shipment_factory
+):
+    received = Status.objects.get(type=Status.SHIPMENT_TYPE, codename="received")
+    done = Status.objects.get(type=Status.SHIPMENT_TYPE, codename="done")
+    paid_shipment = shipment_factory(
+        user=simple_customer, status=received, is_paid=True
+    )
+    unpaid_shipment = shipment_factory(
+        user=simple_customer, status=received, is_paid=False
+    )
+
+    promoted, skipped = promote_status_bulk(
+        [paid_shipment, unpaid_shipment], to_status=done
+    )
+
+    assert promoted == [paid_shipment]
+    assert skipped == [unpaid_shipment]
+    paid_shipment.refresh_from_db()
+    unpaid_shipment.refresh_from_db()
+    assert paid_shipment.status_id == done.id
+    assert unpaid_shipment.status_id == received.id
+    assert not StatusEvent.objects.filter(shipment=unpaid_shipment).exists()
+
+
+@pytest.mark.django_db
+def test_promote_shipment_statuses_in_bulk_commits_to_customs_in_one_query(
+    simple_customer,
+    shipment_factory,
+    package_factory,
+    city_factory,
+    run_on_commit_callbacks,
+):
+    tobeshipped = Status.objects.get(type=Status.SHIPMENT_TYPE, codename="tobeshipped")
+    processing = Status.objects.get(type=Status.SHIPMENT_TYPE, codename="processing")
+    recipient = Recipient.objects.create(
+        user=simple_customer,
+        title="Home",
+        first_name="John",
+        last_name="Doe",
+        gender=Recipient.MALE,
+        phone_number="+994500000000",
+        id_pin="PIN1",
+        city=city_factory(),
+        address="Baku",
+    ).freeze()
+
+    def create_shipments(count, with_packages=True):
+        shipments = []
+        for _ in range(count):
+            shipment = shipment_factory(
+                user=simple_customer, status=tobeshipped, recipient=recipient
+            )
+            if with_packages:
+                package_factory(user=simple_customer, shipment=shipment, weight=1)
+            shipments.append(shipment)
+        return shipments
+
+    def promote(shipments):
+        with mock.patch("domain.services.commit_to_customs") as commit_to_customs:
+            with CaptureQueriesContext(db_transaction.get_connection()) as queries:
+                promote_status_bulk(shipments, to_status=processing)
+            run_on_commit_callbacks()
+        return len(queries), commit_to_customs
+
+    queries_count, _ = promote(create_shipments(2))
+
+    shipments = create_shipments(4)
+    empty_shipment = create_shipments(1, with_packages=False)[0]
+    count, commit_to_customs = promote(shipments + [empty_shipment])
+
+    assert count == queries_count
+    commit_to_customs.delay.assert_called_once_with([s.id for s in shipments])
+
+
+@pytest.mark.django_db
+def test_shipment_invoice_is_served_from_snapshot_cache(
+    simple_customer,
+    shipment_factory,
+    currency_factory,
+    django_assert_num_queries,
+    run_on_commit_callbacks,
+):
+    usd = currency_factory(code="USD")
+    shipment = shipment_factory(
+        user=simple_customer, total_price=10, total_price_currency=usd
+    )
+
+    invoice = get_serialized_invoice(shipment)
+    assert not invoice["discount"]["reasons"]
+
+    with django_assert_num_queries(2):  # active balance
+        assert get_serialized_invoice(shipment) == invoice
+
+    Discount.objects.create(related_object=shipment, percentage=10)
+    run_on_commit_callbacks()
+
+    invoice = get_serialized_invoice(shipment)
+    assert invoice["discount"]["reasons"][0]["percentage"] == "10.00"
+
+
+@pytest.mark.django_db
+def test_customer_shipment_list_runs_fixed_number_of_queries(
+    api_client,
+    simple_customer,
+    shipment_factory,
+    package_factory,
+    product_type_factory,
+    currency_factory,
+):
+    usd = currency_factory(code="USD")
+    api_client.force_authenticate(user=simple_customer)
+    url = reverse("shipment-list")
+
+    def create_shipments(count):
+        for _ in range(count):
+            shipment = shipment_factory(
+                user=simple_customer, total_price=10, total_price_currency=usd
+            )
+            Discount.objects.create(related_object=shipment, percentage=10)
+
+            for weight in [1, 2]:
+                package = package_factory(
+                    user=simple_customer, shipment=shipment, weight=weight
+                )
+                product_type = product_type_factory(
+                    name_en="Shoes", category__name_en="Clothes"
+                )
+                Product.objects.create(
+                    package=package,
+                    category=product_type.category,
+                    type=product_type,
+                    price_currency=usd,
+                )
+
+    def count_queries():
+        with CaptureQueriesContext(db_transaction.get_connection()) as queries:
+            response = api_client.get(url)
+        assert response.status_code == 200
+        return len(queries), response.data
+
+    create_shipments(2)
+    queries_count, data = count_queries()
+
+    create_shipments(3)
+    assert count_queries()[0] == queries_count
+
+    assert data["results"][0]["total_weight"] == 3
+
+
+@pytest.mark.django_db
+def test_monthly_spendings_of_recipients_are_calculated_in_bulk(
+    simple_customer,
+    shipment_factory,
+    currency_factory,
+    city_factory,
+    django_assert_num_queries,
+):
+    usd = currency_factory(code="USD")
+    azn = currency_factory(code="AZN")
+    azn.rate = Decimal("0.5")
+    azn.save(update_fields=["rate"])
+    Configuration.objects.update(monthly_spendings_treshold_currency=usd)
+    city = city_factory()
+    now = utils.timezone.now()
+
+    recipients = []
+    for index in range(1, 4):
+        recipient = Recipient.objects.create(
+            user=simple_customer,
+            title="Home",
+            first_name="John",
+            last_name="Doe",
+            gender=Recipient.MALE,
+            phone_number="+994500000000",
+            id_pin="PIN%d" % index,
+            city=city,
+            address="Baku",
+        )
+        frozen_recipient = recipient.freeze()
+        recipients.append(recipient)
+        cache.delete(get_monthly_spendings_key(simple_customer.id, recipient.id_pin))
+
+        for price, currency in [(10, usd), (20, azn)]:
+            shipment_factory(
+                user=simple_customer,
+                recipient=frozen_recipient,
+                declared_price=price * index,
+                declared_price_currency=currency,
+                declared_at=now,
+                total_price=0,
+                total_price_currency=usd,
+            )
+
+    shipment_factory(
+        user=simple_customer,
+        recipient=frozen_recipient,
+        declared_price=100,
+        declared_price_currency=usd,
+        declared_at=now - timedelta(days=40),
+        total_price=0,
+        total_price_currency=usd,
+    )
+
+    with django_assert_num_queries(3):  # configuration, its currency, spendings
+        spendings = calculate_monthly_spendings_in_bulk(recipients)
+
+    assert [spendings[r].amount for r in recipients] == [20, 40, 60]
+    assert all(spendings[r].currency == usd for r in recipients)
+
+    with django_assert_num_queries(2):  # served from cache
+        assert calculate_monthly_spendings_in_bulk(recipients) == spendings
+
+
+@pytest.mark.django_db
+def test_monthly_spendings_are_invalidated_for_previous_recipient_and_rates(
+    simple_customer,
+    shipment_factory,
+    currency_factory,
+    city_factory,
+    run_on_commit_callbacks,
+):
+    usd = currency_factory(code="USD")
+    azn = currency_factory(code="AZN")
+    azn.rate = Decimal("0.5")
+    azn.save(update_fields=["rate"])
+    Configuration.objects.update(monthly_spendings_treshold_currency=usd)
+    city = city_factory()
+
+    recipients = []
+    for id_pin in ["PIN1", "PIN2"]:
+        recipients.append(
+            Recipient.objects.create(
+                user=simple_customer,
+                title="Home",
+                first_name="John",
+                last_name="Doe",
+                gender=Recipient.MALE,
+                phone_number="+994500000000",
+                id_pin=id_pin,
+                city=city,
+                address="Baku",
+            )
+        )
+    first, second = recipients
+    shipment = shipment_factory(
+        user=simple_customer,
+        recipient=first.freeze(),
+        declared_price=20,
+        declared_price_currency=azn,
+        declared_at=utils.timezone.now(),
+        total_price=0,
+        total_price_currency=usd,
+    )
+
+    def get_amounts():
+        run_on_commit_callbacks()
+        spendings = calculate_monthly_spendings_in_bulk(recipients)
+        return [spendings[r].amount for r in recipients]
+
+    assert get_amounts() == [10, 0]
+
+    shipment.recipient = second.freeze()
+    shipment.save()
+    assert get_amounts() == [0, 10]
+
+    azn.rate = Decimal("0.25")
+    azn.save(update_fields=["rate"])
+    assert get_amounts() == [0, 5]
@@ -0,0 +1,36 @@
+import uuid
+import datetime
+from decimal import Decimal
+
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from djangorestframework_camel_case.render import (
+    CamelCaseJSONRenderer as LibraryCamelCaseJSONRenderer,
+)
+
+from ontime.renderers import CamelCaseJSONRenderer
+
+
+def test_camel_case_renderer_output_matches_library_renderer():
+    data = {
+        "count": 2,
+        "next_page": None,
+        "results": [
+            {
+                "id": 1,
+                "tracking_code": "TC1",
+                "declared_price": Decimal("12.50"),
+                "created_at": timezone.now(),
+                "arrival_date": datetime.date(2021, 2, 16),
+                "uuid": uuid.uuid4(),
+                "status": {"display_name": gettext_lazy("Received")},
+                "packages": ({"is_serialized": True, "product_type_2": "x"},),
+                "tags": {"a_b"},
+            }
+        ],
+        gettext_lazy("lazy_key"): "value_1",
+    }
+
+    assert CamelCaseJSONRenderer().render(
+        data
+    ) == LibraryCamelCaseJSONRenderer().render(data)
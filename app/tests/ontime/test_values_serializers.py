@@ -0,0 +1,105 @@
+import json
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.test import RequestFactory
+from django.utils import timezone, translation
+
+from ontime.renderers import CamelCaseJSONRenderer
+from core.models import City, Country
+from core.serializers.client import CountrySerializer, CountryValuesSerializer
+from fulfillment.models import Shipment, Status
+from fulfillment.serializers.common import StatusSerializer, StatusValuesSerializer
+from fulfillment.serializers.customer import (
+    ShipmentCompactSerializer,
+    ShipmentCompactValuesSerializer,
+)
+from fulfillment.serializers.admin.warehouseman import (
+    TransportationCitySerializer,
+    TransportationCityValuesSerializer,
+)
+
+# (values serializer, serializer it replaces, queryset)
+SERIALIZERS = [
+    (StatusValuesSerializer, StatusSerializer, lambda: Status.objects.all()),
+    (CountryValuesSerializer, CountrySerializer, lambda: Country.objects.all()),
+    (
+        ShipmentCompactValuesSerializer,
+        ShipmentCompactSerializer,
+        lambda: Shipment.objects.order_by("-pk"),
+    ),
+    (
+        TransportationCityValuesSerializer,
+        TransportationCitySerializer,
+        lambda: City.objects.annotate(
+            is_default=ExpressionWrapper(Q(code="AZ1000"), output_field=BooleanField())
+        ),
+    ),
+]
+
+
+def render(data):
+    return json.loads(CamelCaseJSONRenderer().render(data))
+
+
+@pytest.fixture
+def shipments(simple_customer, shipment_factory, city_factory, warehouse_factory):
+    city = city_factory(name_az="Bakı", name_en="Baku", name_ru=None, code="AZ1000")
+    warehouse = warehouse_factory(city=city, is_consolidation_enabled=True)
+
+    country = city.country
+    country.description_en = "Country"
+    country.flag_image = "country-flags/%s/flag.png" % country.code
+    country.timezone = "Asia/Baku"
+    country.save()
+
+    return [
+        shipment_factory(
+            user=simple_customer,
+            source_country=country,
+            destination_warehouse=warehouse,
+            total_price="12.5",
+            total_price_currency=country.currency,
+        ),
+        shipment_factory(user=simple_customer, is_paid=True),
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("language", ["az", "en", "ru"])
+@pytest.mark.parametrize("values_serializer, serializer, get_queryset", SERIALIZERS)
+def test_values_serializers_represent_data_as_serializers_they_replace(
+    shipments, language, values_serializer, serializer, get_queryset
+):
+    context = {"request": RequestFactory().get("/")}
+    # Local time of countries must not change between the renders
+    now = timezone.make_aware(datetime(2021, 2, 16, 14, 57))
+
+    with translation.override(language), mock.patch(
+        "core.models.get_local_datetime", return_value=now
+    ):
+        expected = render(serializer(get_queryset(), many=True, context=context).data)
+        data = values_serializer(get_queryset(), many=True, context=context).data
+
+    assert expected
+    assert render(data) == expected
+
+
+@pytest.mark.django_db
+def test_values_serializers_build_representations_in_one_query(
+    shipments, django_assert_num_queries
+):
+    queryset = Shipment.objects.filter(pk__in=[s.pk for s in shipments]).order_by("pk")
+
+    with django_assert_num_queries(1):
+        data = ShipmentCompactValuesSerializer(queryset, many=True).data
+
+    assert [shipment["identifier"] for shipment in data] == [
+        shipment.number for shipment in shipments
+    ]
+    # Instances are loaded again, in the same order
+    assert (
+        ShipmentCompactValuesSerializer(shipments[::-1], many=True).data == data[::-1]
+    )